@@ -0,0 +1,89 @@
+"""Backfill histórico retomável de jurisprudência dos tribunais
+
+Uso:
+    python backfill.py criar --inicio 2020-01-01 [--fim 2024-12-31] [--tribunais STF,STJ] [--janela 30] [--executar]
+    python backfill.py executar <id> [--workers-por-tribunal 1]
+    python backfill.py status [<id>]
+
+Ctrl+C interrompe o backfill gravando o cursor de cada janela; `executar <id>`
+retoma exatamente de onde parou.
+"""
+import sys
+import argparse
+import threading
+from datetime import date
+from src.app_factory import create_app
+from src.models.database import db
+from src.services.backfill_service import BackfillService
+from src.services.scheduler_service import SchedulerService
+
+def formatar_progresso(status):
+    throughput = status['throughput'] or {}
+    eta = status['eta_seconds']
+    eta_texto = f"{eta // 3600}h{(eta % 3600) // 60:02d}m" if eta is not None else '-'
+    return (
+        f"[backfill {status['id']}] {status['status']}: "
+        f"{status['done_windows']}/{status['total_windows']} janelas ({status['progress_pct']}%), "
+        f"{status['pages']} páginas, {status['decisions']} decisões, {status['inserted']} inseridas | "
+        f"{throughput.get('pages_per_minute', 0)} páginas/min, "
+        f"{throughput.get('decisions_per_minute', 0)} decisões/min | ETA {eta_texto}"
+    )
+
+def executar(service, backfill_id, workers_por_tribunal):
+    try:
+        status = service.run(
+            backfill_id,
+            workers_per_tribunal=workers_por_tribunal,
+            report_every=10,
+            on_progress=lambda s: print(formatar_progresso(s), flush=True)
+        )
+    except KeyboardInterrupt:
+        print("Interrompido; os cursores das janelas foram gravados.")
+        return 1
+    
+    return 0 if status['status'] == 'finished' else 1
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill histórico de jurisprudência')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+    
+    criar = subparsers.add_parser('criar', help='Cria um backfill dividido em janelas')
+    criar.add_argument('--inicio', required=True, type=date.fromisoformat)
+    criar.add_argument('--fim', type=date.fromisoformat, default=date.today())
+    criar.add_argument('--tribunais', default='STF,STJ,TJSP')
+    criar.add_argument('--janela', type=int, default=None, help='tamanho da janela em dias')
+    criar.add_argument('--executar', action='store_true', help='executa logo após criar')
+    criar.add_argument('--workers-por-tribunal', type=int, default=None)
+    
+    executar_parser = subparsers.add_parser('executar', help='Executa ou retoma um backfill')
+    executar_parser.add_argument('id', type=int)
+    executar_parser.add_argument('--workers-por-tribunal', type=int, default=None)
+    
+    status_parser = subparsers.add_parser('status', help='Mostra progresso, vazão e ETA')
+    status_parser.add_argument('id', type=int, nargs='?')
+    
+    args = parser.parse_args()
+    
+    # Sem o SchedulerService: este processo não disputa a liderança nem roda os jobs agendados
+    app = create_app(scheduler=False)
+    with app.app_context():
+        engine = db.engine
+    service = BackfillService(app, engine, crawl_slots=threading.BoundedSemaphore(SchedulerService.MAX_CONCURRENT_CRAWLS))
+    
+    if args.comando == 'criar':
+        backfill_id = service.create(args.tribunais.split(','), args.inicio, args.fim, args.janela)
+        print(formatar_progresso(service.status(backfill_id)))
+        if args.executar:
+            return executar(service, backfill_id, args.workers_por_tribunal)
+        return 0
+    
+    if args.comando == 'executar':
+        return executar(service, args.id, args.workers_por_tribunal)
+    
+    statuses = [service.status(args.id)] if args.id else service.list_backfills()
+    for status in statuses:
+        print(formatar_progresso(status) if status else 'Backfill não encontrado')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Simulação do agendamento adaptativo: número de coletas e atraso até a captura vs. agendamento fixo
+
+Gera publicações sintéticas por fonte (dias úteis, horário comercial) e compara o
+agendamento fixo atual (diário às 9h; semanal para enunciados) com o modo
+adaptativo nos limites de SchedulerService.ADAPTIVE_BOUNDS. Não acessa a rede.
+
+Uso:
+    python benchmarks/bench_adaptive_polling.py [--dias 180] [--seed 1]
+"""
+import os
+import sys
+import bisect
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.adaptive_polling import AdaptivePollingPolicy
+from src.services.scheduler_service import SchedulerService
+
+DIA = 1440  # minutos
+
+# Fonte -> (decisões por dia útil, período do agendamento fixo em minutos)
+FONTES = {
+    'TJSP': (300, DIA),
+    'STJ': (60, DIA),
+    'STF': (10, DIA),
+    'ENUNCIADOS': (None, 7 * DIA)
+}
+
+# Enunciados saem em poucas reuniões por ano
+ENUNCIADOS_POR_ANO = 6
+
+def gerar_publicacoes(por_dia, dias, rng):
+    """Retorna os instantes (em minutos) das publicações"""
+    publicacoes = []
+    for dia in range(dias):
+        if por_dia is None:
+            if rng.random() < ENUNCIADOS_POR_ANO / 365:
+                publicacoes.append(dia * DIA + rng.uniform(600, 1080))
+            continue
+        if dia % 7 in (5, 6):
+            continue  # Fim de semana
+        quantidade = sum(1 for _ in range(por_dia * 3) if rng.random() < 1 / 3)
+        publicacoes += [dia * DIA + rng.uniform(480, 1200) for _ in range(quantidade)]
+    return sorted(publicacoes)
+
+def coletas_fixas(dias, periodo, inicio=540):
+    return [inicio + i * periodo for i in range(int(dias * DIA / periodo))]
+
+def coletas_adaptativas(publicacoes, dias, min_minutes, max_minutes):
+    """Reproduz o _adapt_schedule: cada coleta recalcula o intervalo pelo número de itens novos"""
+    policy = AdaptivePollingPolicy(min_minutes, max_minutes)
+    coletas, agora, intervalo, anterior = [], 0, min_minutes, 0
+    while agora < dias * DIA:
+        agora += intervalo
+        coletas.append(agora)
+        novos = bisect.bisect_right(publicacoes, agora) - bisect.bisect_right(publicacoes, anterior)
+        intervalo = policy.next_interval(intervalo, novos)
+        anterior = agora
+    return coletas
+
+def avaliar(publicacoes, coletas):
+    """Retorna (coletas, atraso médio em horas, atraso máximo em horas) até a captura de cada publicação"""
+    atrasos = []
+    for publicacao in publicacoes:
+        i = bisect.bisect_left(coletas, publicacao)
+        if i < len(coletas):
+            atrasos.append((coletas[i] - publicacao) / 60)
+    return {
+        'coletas': len(coletas),
+        'atraso_medio': statistics.mean(atrasos) if atrasos else 0.0,
+        'atraso_max': max(atrasos) if atrasos else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--dias', type=int, default=180)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    totais = {'fixo': 0, 'adaptativo': 0}
+    
+    print(f"{'fonte':<12}{'modo':<12}{'coletas':>9}{'atraso médio (h)':>18}{'atraso máx (h)':>16}")
+    for fonte, (por_dia, periodo) in FONTES.items():
+        publicacoes = gerar_publicacoes(por_dia, args.dias, rng)
+        min_minutes, max_minutes = SchedulerService.ADAPTIVE_BOUNDS[fonte]
+        for modo, coletas in (
+            ('fixo', coletas_fixas(args.dias, periodo)),
+            ('adaptativo', coletas_adaptativas(publicacoes, args.dias, min_minutes, max_minutes))
+        ):
+            r = avaliar(publicacoes, coletas)
+            totais[modo] += r['coletas']
+            print(f"{fonte:<12}{modo:<12}{r['coletas']:>9}{r['atraso_medio']:>18.1f}{r['atraso_max']:>16.1f}")
+    
+    reducao = 1 - totais['adaptativo'] / totais['fixo']
+    print(f"\nTotal de coletas: fixo {totais['fixo']}, adaptativo {totais['adaptativo']} ({reducao:.0%} a menos)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark de ponta a ponta da coleta contra o servidor local de tribunais (sem rede)
+
+Sobe benchmarks/tribunal_server.py em outro processo, desvia para ele os hosts de
+todos os tribunais e do CNJ e executa JurisprudenciaService.collect_all_recent_jurisprudence
+num banco SQLite temporário, com índice de precedentes. Reporta, por fonte e no
+total, páginas/s e decisões/s (a partir de collection_runs), o tempo de CPU e o
+pico de memória (RSS) do processo coletor.
+
+Uso:
+    python benchmarks/bench_crawl_throughput.py [--paginas 3] [--resultados 20] [--latencia 20]
+                                                [--taxa-erros 0.0] [--delay 0] [--dias 7]
+"""
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import resource
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from tribunal_server import StandInConfig, StandInAdapter, stand_in_hosts, start_in_subprocess
+from src.models.database import db, init_db
+from src.models.jurisprudencia import CollectionRun
+from src.scrapers.http_pool import shared_adapters, HostAdapterPool
+from src.services.jurisprudencia_service import JurisprudenciaService, scraper_registry
+from src.services.precedent_index import PrecedentIndex
+
+def criar_app(diretorio):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(diretorio, 'bench.db')}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    init_db(app)
+    app.precedent_index = PrecedentIndex(os.path.join(diretorio, 'precedentes'))
+    return app
+
+def pico_rss_mb():
+    # ru_maxrss é em KB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--paginas', type=int, default=3, help='páginas de resultados por janela de busca')
+    parser.add_argument('--resultados', type=int, default=20, help='resultados por página')
+    parser.add_argument('--latencia', type=float, default=20.0, help='latência média do servidor (ms)')
+    parser.add_argument('--taxa-erros', type=float, default=0.0, help='fração de respostas 503')
+    parser.add_argument('--delay', type=float, default=0.0, help='delay aleatório máximo dos scrapers entre requisições (s)')
+    parser.add_argument('--dias', type=int, default=7)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.CRITICAL)
+    
+    processo, porta = start_in_subprocess(StandInConfig(args.paginas, args.resultados, args.latencia, args.taxa_erros))
+    for url in stand_in_hosts():
+        shared_adapters.override(url, StandInAdapter(porta, pool_connections=1, pool_maxsize=HostAdapterPool.POOL_MAXSIZE))
+    
+    diretorio = tempfile.mkdtemp(prefix='bench_coleta_')
+    try:
+        app = criar_app(diretorio)
+        with app.app_context():
+            db.create_all()
+            for nome in scraper_registry:
+                scraper_registry[nome].delay_range = (0, args.delay)
+            
+            rss_inicial = pico_rss_mb()
+            cpu_inicial = time.process_time()
+            inicio = time.perf_counter()
+            resultado = JurisprudenciaService().collect_all_recent_jurisprudence(days_back=args.dias)
+            duracao = time.perf_counter() - inicio
+            cpu = time.process_time() - cpu_inicial
+            
+            print(f"servidor: {args.paginas} páginas x {args.resultados} resultados, latência {args.latencia:.0f} ms, "
+                  f"{args.taxa_erros:.0%} de erros; delay dos scrapers até {args.delay}s\n")
+            print(f"{'fonte':<12}{'tempo (s)':>10}{'páginas':>9}{'itens':>7}{'inseridos':>11}{'erros':>7}{'pág/s':>9}{'dec/s':>9}")
+            for run in CollectionRun.query.order_by(CollectionRun.id):
+                print(f"{run.tribunal:<12}{run.duracao:>10.2f}{run.paginas:>9}{run.itens_parseados:>7}{run.inseridos:>11}"
+                      f"{run.erros:>7}{run.paginas / run.duracao:>9.1f}{run.inseridos / run.duracao:>9.1f}")
+            
+            paginas = db.session.query(db.func.sum(CollectionRun.paginas)).scalar() or 0
+            print(f"\n{'total':<12}{duracao:>10.2f}{paginas:>9}{'':>7}{resultado['total_collected']:>11}{len(resultado['errors']):>7}"
+                  f"{paginas / duracao:>9.1f}{resultado['total_collected'] / duracao:>9.1f}")
+            print(f"CPU do coletor: {cpu:.2f}s ({cpu / duracao:.0%} do tempo de parede)")
+            print(f"pico de RSS: {pico_rss_mb():.0f} MB (antes da coleta: {rss_inicial:.0f} MB)")
+            for erro in resultado['errors']:
+                print(f"erro: {erro}")
+    finally:
+        processo.terminate()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark por campo das especificações de extração (src/scrapers/specs/*.json)
+
+Para cada especificação, usa as páginas benchmarks/fixtures/<spec>_busca.html e
+<spec>_decisao.html e mede, campo a campo, a extração compilada (uma passagem pela
+árvore) contra a busca separada por campo com soup.select, como nos scrapers
+manuais. Campos que ficam vazios na página de exemplo são marcados, o que ajuda a
+validar uma especificação nova.
+
+Uso:
+    python benchmarks/bench_extraction_specs.py [--repeticoes 50] [--spec stf]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from src.scrapers.base_scraper import DEFAULT_HTML_PARSER
+from src.scrapers.extraction_spec import SpecExtractor, available_specs, load_spec
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+def medir(func, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+def extrair_com_select(rule, root):
+    """Extração de um campo com uma busca na árvore por seletor (comportamento anterior)"""
+    if not rule.selectors:
+        return rule.value([], root)
+    for selector in rule.selectors:
+        elements = root.select(selector) if rule.many else root.select(selector, limit=1)
+        if elements:
+            return rule.value(elements, root)
+    return rule.default
+
+def comparar(nome, extractor, roots, repeticoes):
+    """Imprime uma linha por campo e o total; roots são as árvores onde os campos são extraídos"""
+    total_compilado = medir(lambda: [extractor.extract(root) for root in roots], repeticoes)
+    total_select = 0.0
+    
+    for campo, rule in extractor.fields.items():
+        sozinho = SpecExtractor({campo: rule})
+        valores = [sozinho.extract(root)[campo] for root in roots]
+        esperado = [extrair_com_select(rule, root) for root in roots]
+        
+        compilado = medir(lambda: [sozinho.extract(root) for root in roots], repeticoes)
+        por_select = medir(lambda: [extrair_com_select(rule, root) for root in roots], repeticoes)
+        total_select += por_select
+        
+        aviso = ''
+        if not any(valores):
+            aviso = 'vazio'
+        elif valores != esperado:
+            aviso = 'difere'
+        print(f"{'':<6}{nome:<9}{campo:<18}{compilado:>11.3f}{por_select:>13.3f}  {aviso}")
+    
+    print(f"{'':<6}{nome:<9}{'(todos)':<18}{total_compilado:>11.3f}{total_select:>13.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeticoes', type=int, default=50)
+    parser.add_argument('--spec', choices=available_specs())
+    args = parser.parse_args()
+    
+    print(f"parser: {DEFAULT_HTML_PARSER}; tempos em ms (mediana), sem a análise do HTML\n")
+    print(f"{'spec':<6}{'página':<9}{'campo':<18}{'compilado':>11}{'select/campo':>13}")
+    for nome in [args.spec] if args.spec else available_specs():
+        spec = load_spec(nome)
+        paginas = {}
+        for pagina in ('busca', 'decisao'):
+            caminho = os.path.join(FIXTURES, f'{nome}_{pagina}.html')
+            if not os.path.exists(caminho):
+                print(f"{nome:<6}sem fixture {os.path.basename(caminho)}")
+                continue
+            with open(caminho, encoding='utf-8') as f:
+                paginas[pagina] = f.read()
+        
+        print(nome)
+        if 'busca' in paginas:
+            soup = BeautifulSoup(paginas['busca'], DEFAULT_HTML_PARSER, parse_only=spec.results_strainer)
+            itens = spec.results.matches(soup)['results']
+            print(f"{'':<6}{'busca':<9}{len(itens)} resultados")
+            comparar('busca', spec.result_fields, itens, args.repeticoes)
+        if 'decisao' in paginas:
+            soup = BeautifulSoup(paginas['decisao'], DEFAULT_HTML_PARSER, parse_only=spec.detail_strainer)
+            comparar('decisão', spec.detail_fields, [soup], args.repeticoes)
+
+if __name__ == '__main__':
+    main()
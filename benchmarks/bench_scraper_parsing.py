@@ -0,0 +1,86 @@
+"""Micro-benchmark da análise de HTML dos scrapers sobre as páginas de benchmarks/fixtures
+
+Compara, para cada scraper e página, a árvore completa com a análise restrita por
+SoupStrainer, com o html.parser e (se instalado) com o lxml. Também confere que
+todos os modos extraem exatamente os mesmos dados.
+
+Uso:
+    python benchmarks/bench_scraper_parsing.py [--repeticoes 50]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from src.scrapers.base_scraper import DEFAULT_HTML_PARSER
+from src.scrapers.stf_scraper import STFScraper
+from src.scrapers.stj_scraper import STJScraper
+from src.scrapers.tjsp_scraper import TJSPScraper
+from src.scrapers.enunciados_scraper import EnunciadosScraper
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# (nome, classe do scraper, página, extração)
+CENARIOS = [
+    ('STF busca', STFScraper, 'stf_busca.html', lambda s, html: s.parse_search_results(html)),
+    ('STF decisão', STFScraper, 'stf_decisao.html', lambda s, html: s.parse_decision_details(html, 'url')),
+    ('STJ busca', STJScraper, 'stj_busca.html', lambda s, html: s.parse_search_results(html)),
+    ('STJ decisão', STJScraper, 'stj_decisao.html', lambda s, html: s.parse_decision_details(html, 'url')),
+    ('TJSP busca', TJSPScraper, 'tjsp_busca.html', lambda s, html: s.parse_search_results(html)),
+    ('TJSP decisão', TJSPScraper, 'tjsp_decisao.html', lambda s, html: s.parse_decision_details(html, 'url')),
+    ('FONAJE', EnunciadosScraper, 'fonaje_civeis.html',
+     lambda s, html: s.parse_enunciados(html, s.FONAJE_ELEMENTS, 'FONAJE', 'civeis', 'url')),
+    ('CNJ', EnunciadosScraper, 'cnj_enunciados.html',
+     lambda s, html: s.parse_enunciados(html, s.CNJ_ELEMENTS, 'CNJ', 'GERAL', 'url'))
+]
+
+def criar_scraper(classe, parser, filtrar):
+    scraper = classe()
+    scraper.HTML_PARSER = parser
+    if not filtrar:
+        # Comportamento anterior: árvore completa da página
+        scraper.parse_html = lambda html_content, parse_only=None: BeautifulSoup(html_content, parser)
+    return scraper
+
+def medir(func, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeticoes', type=int, default=50)
+    args = parser.parse_args()
+    
+    modos = [('html.parser', 'html.parser', False), ('html.parser+filtro', 'html.parser', True)]
+    if DEFAULT_HTML_PARSER == 'lxml':
+        modos += [('lxml', 'lxml', False), ('lxml+filtro', 'lxml', True)]
+    else:
+        print('lxml não instalado: comparando apenas com o html.parser\n')
+    
+    print(f"{'página':<15}{'KB':>5}" + ''.join(f'{nome:>20}' for nome, _, _ in modos) + f"{'ganho':>8}")
+    for nome, classe, arquivo, extrair in CENARIOS:
+        with open(os.path.join(FIXTURES, arquivo), encoding='utf-8') as f:
+            html = f.read()
+        
+        medianas, resultados = [], []
+        for _, parser_name, filtrar in modos:
+            scraper = criar_scraper(classe, parser_name, filtrar)
+            resultados.append(extrair(scraper, html))
+            medianas.append(medir(lambda: extrair(scraper, html), args.repeticoes))
+        
+        if any(r != resultados[0] for r in resultados):
+            print(f"{nome}: os modos extraíram dados diferentes")
+        
+        print(f"{nome:<15}{len(html) // 1024:>5}" + ''.join(f'{m:>17.2f} ms' for m in medianas)
+              + f"{medianas[0] / medianas[-1]:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark do pipeline de coleta: lista completa vs. gerador busca -> detalhes
+
+Simula um tribunal com latência fixa por página de resultados e por página de
+detalhes (sem rede) e compara a coleta em duas fases (todas as páginas de
+resultados, depois os detalhes) com o iter_recent_jurisprudence do BaseScraper.
+Mede o tempo total, o tempo até a primeira decisão e o pico de memória.
+
+Uso:
+    python benchmarks/bench_scraper_pipeline.py [--paginas 20] [--por-pagina 20]
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scrapers.base_scraper import BaseScraper
+
+ACORDAO = 'Vistos, relatados e discutidos estes autos. ' * 400
+
+class TribunalSimulado(BaseScraper):
+    """Tribunal com `paginas` páginas de `por_pagina` resultados e latências fixas"""
+    
+    def __init__(self, paginas, por_pagina, latencia_busca, latencia_detalhe):
+        super().__init__(delay_range=(0, 0))
+        self.paginas = paginas
+        self.por_pagina = por_pagina
+        self.latencia_busca = latencia_busca
+        self.latencia_detalhe = latencia_detalhe
+    
+    def get_tribunal_name(self):
+        return 'SIM'
+    
+    def search_recent_decisions(self, days_back=7, since=None):
+        start_date, end_date = self.search_window(days_back, since)
+        return self.iter_search_results(start_date, end_date)
+    
+    def search_decisions(self, start_date, end_date, page=1):
+        time.sleep(self.latencia_busca)
+        if page > self.paginas:
+            return []
+        return [{'url': f'/decisao/{page}/{i}', 'tribunal': 'SIM'} for i in range(self.por_pagina)]
+    
+    def extract_decision_details(self, decision_url):
+        time.sleep(self.latencia_detalhe)
+        return {'tribunal': 'SIM', 'url_origem': decision_url, 'ementa': decision_url, 'acordao': ACORDAO + decision_url}
+
+def coleta_em_duas_fases(scraper):
+    """Comportamento anterior: materializa os resultados e depois todos os detalhes"""
+    resultados = list(scraper.search_recent_decisions())
+    decisoes = [scraper.extract_decision_details(resultado['url']) for resultado in resultados]
+    yield from decisoes
+
+def medir(gerador):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    primeira, total = None, 0
+    for _ in gerador:
+        if primeira is None:
+            primeira = time.perf_counter() - inicio
+        total += 1
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'total': total, 'duracao': duracao, 'primeira': primeira or 0.0, 'pico': pico / 1024 / 1024}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--paginas', type=int, default=20)
+    parser.add_argument('--por-pagina', type=int, default=20)
+    parser.add_argument('--latencia-busca', type=float, default=0.05)
+    parser.add_argument('--latencia-detalhe', type=float, default=0.002)
+    args = parser.parse_args()
+    
+    def novo_scraper():
+        return TribunalSimulado(args.paginas, args.por_pagina, args.latencia_busca, args.latencia_detalhe)
+    
+    print(f"{'modo':<14}{'decisões':>10}{'total (s)':>11}{'1ª decisão (s)':>16}{'pico (MB)':>11}")
+    for modo, gerador in (
+        ('duas fases', coleta_em_duas_fases(novo_scraper())),
+        ('pipeline', novo_scraper().iter_recent_jurisprudence())
+    ):
+        r = medir(gerador)
+        print(f"{modo:<14}{r['total']:>10}{r['duracao']:>11.2f}{r['primeira']:>16.3f}{r['pico']:>11.1f}")
+
+if __name__ == '__main__':
+    main()
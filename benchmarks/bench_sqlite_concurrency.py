@@ -0,0 +1,159 @@
+"""Concorrência no SQLite: inserções da coleta ao mesmo tempo que leituras da API
+
+Para cada configuração, cria um banco temporário com um acervo inicial e, durante
+`--duracao` segundos, roda escritores que gravam lotes de decisões com
+JurisprudenciaService._save_jurisprudencia (como a coleta) e leitores que chamam
+GET /api/jurisprudencia/recent e /search pelo cliente de teste do Flask, cada um
+no seu processo.
+
+    padrão    configuração anterior (journal de rollback, sem PRAGMAs, um pool só)
+    ajustado  init_db: WAL, PRAGMAs e pool de leitura separado para GET
+
+Reporta a vazão de escrita, as latências de leitura (p50/p95/p99/máx) e os erros
+("database is locked" nos commits ou respostas 500 nas leituras).
+
+Uso:
+    python benchmarks/bench_sqlite_concurrency.py [--duracao 10] [--leitores 4] [--escritores 1]
+                                                  [--lote 50] [--acervo 2000]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+import multiprocessing
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from bench_text_storage import gerar_acordao
+from src.models.database import db, init_db
+from src.routes.jurisprudencia import jurisprudencia_bp
+from src.services.jurisprudencia_service import JurisprudenciaService
+
+TRIBUNAIS = ['STF', 'STJ', 'TST', 'TJSP', 'TRF3']
+PALAVRAS = ('consumidor contrato indenização seguro plano saúde bancário tarifa juros aluguel despejo '
+            'servidor público aposentadoria tributo ICMS execução fiscal penhora salário trabalhista '
+            'horas extras vínculo empregatício dano moral negativação telefonia energia elétrica').split()
+
+def criar_app(diretorio, ajustado):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(diretorio, 'bench.db')}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    if ajustado:
+        init_db(app)
+    else:
+        db.init_app(app)
+    app.register_blueprint(jurisprudencia_bp, url_prefix='/api/jurisprudencia')
+    return app
+
+def gerar_decisoes(rng, quantidade, prefixo, acordaos):
+    return [{
+        'tribunal': rng.choice(TRIBUNAIS),
+        'numero_processo': f'{prefixo}-{i:07d}',
+        'relator': 'Relator Sintético',
+        'data_julgamento': '2024-03-01',
+        'ementa': ' '.join(rng.choice(PALAVRAS) for _ in range(40)) + f' ({prefixo}-{i})',
+        'acordao': rng.choice(acordaos),
+        'url_origem': f'https://example.invalid/{prefixo}/{i}'
+    } for i in range(quantidade)]
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+def escritor(diretorio, ajustado, args, indice, acordaos, inicio, fim, fila):
+    rng = random.Random(100 + indice)
+    resultado = {'inseridos': 0, 'commits': 0, 'commits_falhos': 0}
+    app = criar_app(diretorio, ajustado)
+    with app.app_context():
+        service = JurisprudenciaService()
+        time.sleep(max(0, inicio - time.time()))
+        while time.time() < fim:
+            decisoes = gerar_decisoes(rng, args.lote, f'coleta{indice}-{resultado["commits"]}', acordaos)
+            stats = service._empty_save_stats()
+            resultado['inseridos'] += service._save_jurisprudencia(decisoes, stats)
+            resultado['commits'] += 1
+            resultado['commits_falhos'] += stats['failed_commits']
+    fila.put(('escritor', resultado))
+
+def leitor(diretorio, ajustado, indice, inicio, fim, fila):
+    rng = random.Random(200 + indice)
+    resultado = {'latencias': [], 'erros_leitura': 0}
+    cliente = criar_app(diretorio, ajustado).test_client()
+    time.sleep(max(0, inicio - time.time()))
+    while time.time() < fim:
+        if rng.random() < 0.7:
+            url = f'/api/jurisprudencia/recent?limit=50&tribunal={rng.choice(TRIBUNAIS)}'
+        else:
+            url = f'/api/jurisprudencia/search?q={rng.choice(PALAVRAS)}&limit=20'
+        inicio = time.perf_counter()
+        resposta = cliente.get(url)
+        resultado['latencias'].append((time.perf_counter() - inicio) * 1000)
+        if resposta.status_code != 200:
+            resultado['erros_leitura'] += 1
+    fila.put(('leitor', resultado))
+
+def executar(nome, ajustado, args):
+    diretorio = tempfile.mkdtemp(prefix='bench_sqlite_')
+    try:
+        # Inteiros teores gerados antes da carga, para o tempo medido ser o do banco
+        rng = random.Random(0)
+        acordaos = [gerar_acordao(rng) for _ in range(200)]
+        
+        app = criar_app(diretorio, ajustado)
+        with app.app_context():
+            db.create_all()
+            JurisprudenciaService()._save_jurisprudencia(gerar_decisoes(rng, args.acervo, 'acervo', acordaos))
+            db.engine.dispose()
+        
+        # Um processo por escritor/leitor, como o scheduler e os workers da API em produção
+        fila = multiprocessing.Queue()
+        inicio = time.time() + 2  # Tempo para os processos subirem e criarem os engines
+        fim = inicio + args.duracao
+        processos = [multiprocessing.Process(target=escritor, args=(diretorio, ajustado, args, i, acordaos, inicio, fim, fila))
+                     for i in range(args.escritores)]
+        processos += [multiprocessing.Process(target=leitor, args=(diretorio, ajustado, i, inicio, fim, fila))
+                      for i in range(args.leitores)]
+        for processo in processos:
+            processo.start()
+        resultados = {'inseridos': 0, 'commits': 0, 'commits_falhos': 0, 'latencias': [], 'erros_leitura': 0}
+        for _ in processos:
+            _, parcial = fila.get()
+            for chave, valor in parcial.items():
+                resultados[chave] += valor
+        for processo in processos:
+            processo.join()
+        latencias = resultados['latencias']
+        print(f"{nome:<10}{resultados['inseridos'] / args.duracao:>11.0f}{resultados['commits_falhos']:>8}/{resultados['commits']:<5}"
+              f"{len(latencias) / args.duracao:>10.1f}{statistics.median(latencias) if latencias else 0:>9.1f}"
+              f"{percentil(latencias, 95):>9.1f}{percentil(latencias, 99):>9.1f}{max(latencias, default=0):>9.1f}"
+              f"{resultados['erros_leitura']:>8}")
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duracao', type=float, default=10.0, help='segundos de carga por configuração')
+    parser.add_argument('--leitores', type=int, default=4, help='threads fazendo GET na API')
+    parser.add_argument('--escritores', type=int, default=1, help='threads gravando lotes da coleta')
+    parser.add_argument('--lote', type=int, default=50, help='decisões por commit')
+    parser.add_argument('--acervo', type=int, default=2000, help='decisões gravadas antes da carga')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.CRITICAL)
+    
+    print(f"{args.escritores} escritor(es) com lotes de {args.lote}, {args.leitores} leitor(es), "
+          f"{args.duracao:.0f}s por configuração, acervo inicial de {args.acervo} decisões\n")
+    print(f"{'config':<10}{'ins/s':>11}{'commits falhos':>14}{'leit/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'máx ms':>9}{'erros':>8}")
+    for nome, ajustado in (('padrão', False), ('ajustado', True)):
+        executar(nome, ajustado, args)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark de latência do StyleAnalyzer: modo rápido vs. análise completa
+
+Uso:
+    python benchmarks/bench_style_analyzer.py [--repeticoes 200]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.style_analyzer import StyleAnalyzer
+
+FRASES = [
+    "O autor ajuizou a presente ação de indenização por danos morais em face da ré.",
+    "Regularmente citada, a ré apresentou contestação, alegando preliminarmente a ilegitimidade passiva.",
+    "Portanto, considerando o disposto no art. 6º da Lei nº 8.078/90, reconheço a relação de consumo.",
+    "A prova documental foi juntada aos autos e não houve requerimento de produção de outras provas.",
+    "Ante o exposto, julgo procedente o pedido e condeno a ré ao pagamento de R$ 5.000,00.",
+    "Ademais, a jurisprudência do egrégio Tribunal é pacífica quanto ao tema, conforme a súmula aplicável.",
+    "O pedido foi contestado de forma genérica, sendo certo que o ônus da prova incumbia à requerida.",
+    "Destarte, a responsabilidade do fornecedor é objetiva, uma vez que decorre do risco da atividade."
+]
+
+def gerar_texto(num_frases, seed=0):
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(FRASES) for _ in range(num_frases))
+
+def medir(func, texto, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func(texto)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        'p50': statistics.median(tempos),
+        'p95': tempos[int(len(tempos) * 0.95) - 1],
+        'max': tempos[-1]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeticoes', type=int, default=200)
+    args = parser.parse_args()
+
+    analyzer = StyleAnalyzer()
+    cenarios = [('parágrafo', 5), ('página', 40), ('sentença completa', 400)]
+
+    print(f"{'texto':<20}{'modo':<10}{'p50 (ms)':>10}{'p95 (ms)':>10}{'max (ms)':>10}")
+    for nome, num_frases in cenarios:
+        texto = gerar_texto(num_frases)
+        for modo, func in (
+            ('rápido', lambda t: analyzer.analyze_text_style(t, fast=True)),
+            ('completo', analyzer.analyze_text_style)
+        ):
+            repeticoes = args.repeticoes if modo == 'rápido' else max(args.repeticoes // 10, 5)
+            r = medir(func, texto, repeticoes)
+            print(f"{nome:<20}{modo:<10}{r['p50']:>10.2f}{r['p95']:>10.2f}{r['max']:>10.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""Tamanho do banco e latência de leitura com o inteiro teor em TEXT vs. comprimido
+
+Gera um corpus sintético de acórdãos (trechos padronizados de decisões judiciais
+com partes, valores e fundamentos variáveis) e grava o mesmo conteúdo em bancos
+SQLite com quatro layouts:
+
+    texto          coluna TEXT na própria tabela (layout anterior)
+    zlib           tabela textos_comprimidos, zlib sem dicionário
+    zlib+juridico  zlib com o dicionário juridico-v1 (padrão)
+    zlib+treinado  zlib com dicionário treinado em parte do corpus (train_dictionary)
+
+Para cada layout mede o tamanho do arquivo, a listagem das 50 decisões mais
+recentes sem o texto, a leitura do texto de decisões aleatórias e a busca por
+termo no inteiro teor (LIKE).
+
+Uso:
+    python benchmarks/bench_text_storage.py [--decisoes 2000] [--leituras 500]
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.compression import compress_text, decompress_text, text_hash, train_dictionary, DICTIONARIES
+
+PARTES = ['Banco Alfa S.A.', 'Telefonia Beta Ltda.', 'Município de Campinas', 'Estado de São Paulo',
+          'Construtora Gama Ltda.', 'Seguradora Delta S.A.', 'Instituto Nacional do Seguro Social - INSS']
+RELATORES = ['Ministro Paulo Mendes', 'Ministra Helena Costa', 'Desembargador Ricardo Alves',
+             'Desembargadora Marta Lins', 'Ministro Jorge Neves']
+TRECHOS = [
+    'Trata-se de {recurso} interposto por {parte} contra acórdão do Tribunal de origem que {resultado}.',
+    'Sustenta, em síntese, que houve violação do art. {artigo} do {codigo}, além de dissídio jurisprudencial.',
+    'Contrarrazões apresentadas às fls. {fls}. É o relatório. Decido.',
+    'A irresignação não merece prosperar. O Tribunal de origem, com base no conjunto fático-probatório dos autos, '
+    'concluiu pela {conclusao}, de modo que a revisão do julgado encontra óbice na Súmula 7/STJ.',
+    'Nesse sentido: AgInt no AREsp {numero}/SP, Rel. {relator}, julgado em {data}, DJe {data}.',
+    'Quanto ao valor da indenização por danos morais, fixado em R$ {valor},00, não se mostra irrisório nem '
+    'exorbitante, observados os princípios da razoabilidade e da proporcionalidade.',
+    'A correção monetária incide desde o arbitramento (Súmula 362/STJ) e os juros de mora a partir da citação.',
+    'Ante o exposto, {dispositivo}. Majoro os honorários advocatícios em {percentual}% sobre o valor da condenação, '
+    'nos termos do art. 85, § 11, do Código de Processo Civil.',
+    'Vistos, relatados e discutidos estes autos, ACORDAM os Ministros da {turma}, por unanimidade, {dispositivo}, '
+    'nos termos do voto do Relator.',
+    'Alega a parte recorrente, {parte}, que a decisão recorrida incorreu em cerceamento de defesa ao indeferir a '
+    'produção de prova pericial requerida às fls. {fls}.',
+]
+VARIAVEIS = {
+    'recurso': ['recurso especial', 'agravo interno', 'agravo em recurso especial', 'embargos de declaração'],
+    'resultado': ['negou provimento à apelação', 'deu parcial provimento ao recurso', 'manteve a sentença'],
+    'codigo': ['Código Civil', 'Código de Processo Civil', 'Código de Defesa do Consumidor'],
+    'conclusao': ['falha na prestação do serviço', 'ausência de nexo de causalidade', 'ocorrência de dano moral'],
+    'dispositivo': ['nego provimento ao recurso', 'dou parcial provimento ao recurso', 'não conheço do recurso'],
+    'turma': ['Primeira Turma', 'Segunda Turma', 'Terceira Turma', 'Quarta Turma'],
+}
+
+def gerar_acordao(rng):
+    valores = {chave: rng.choice(opcoes) for chave, opcoes in VARIAVEIS.items()}
+    valores.update(
+        parte=rng.choice(PARTES), relator=rng.choice(RELATORES), artigo=rng.randint(1, 1000),
+        fls=rng.randint(10, 900), numero=rng.randint(100000, 2999999), valor=rng.randint(1, 200) * 500,
+        percentual=rng.choice([10, 15, 20]), data=f'{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/20{rng.randint(15, 24)}'
+    )
+    paragrafos = [rng.choice(TRECHOS).format(**valores) for _ in range(rng.randint(60, 300))]
+    return '\n\n'.join(paragrafos)
+
+def criar_banco(caminho, layout, acordaos, dicionario):
+    conn = sqlite3.connect(caminho)
+    conn.create_function('texto_descomprimido', 2, lambda codec, dados: decompress_text(codec, dados, dicionario))
+    if layout == 'texto':
+        conn.execute('CREATE TABLE jurisprudencia (id INTEGER PRIMARY KEY, tribunal TEXT, numero_processo TEXT, '
+                     'ementa TEXT, acordao TEXT, data_coleta TEXT)')
+        conn.executemany('INSERT INTO jurisprudencia VALUES (?, ?, ?, ?, ?, ?)', [
+            (i, 'STJ', f'{i:07d}', texto[:600], texto, f'2024-01-01 {i % 24:02d}:00') for i, texto in enumerate(acordaos, 1)
+        ])
+    else:
+        codec = 'zlib' if layout == 'zlib' else 'zlib:dicionario'
+        conn.execute('CREATE TABLE textos_comprimidos (hash TEXT PRIMARY KEY, codec TEXT, dados BLOB, tamanho INTEGER)')
+        conn.execute('CREATE TABLE jurisprudencia (id INTEGER PRIMARY KEY, tribunal TEXT, numero_processo TEXT, '
+                     'ementa TEXT, acordao_hash TEXT REFERENCES textos_comprimidos(hash), data_coleta TEXT)')
+        for i, texto in enumerate(acordaos, 1):
+            chave = text_hash(texto)
+            dados = compress_text(texto, 'zlib', dicionario) if dicionario else compress_text(texto, 'zlib')
+            conn.execute('INSERT OR IGNORE INTO textos_comprimidos VALUES (?, ?, ?, ?)',
+                         (chave, codec, dados, len(texto.encode('utf-8'))))
+            conn.execute('INSERT INTO jurisprudencia VALUES (?, ?, ?, ?, ?, ?)',
+                         (i, 'STJ', f'{i:07d}', texto[:600], chave, f'2024-01-01 {i % 24:02d}:00'))
+    conn.execute('CREATE INDEX ix_data_coleta ON jurisprudencia (data_coleta)')
+    conn.commit()
+    conn.execute('VACUUM')
+    return conn
+
+def medir(func, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--decisoes', type=int, default=2000)
+    parser.add_argument('--leituras', type=int, default=500)
+    args = parser.parse_args()
+    
+    rng = random.Random(42)
+    acordaos = [gerar_acordao(rng) for _ in range(args.decisoes)]
+    bytes_texto = sum(len(t.encode('utf-8')) for t in acordaos)
+    print(f"{args.decisoes} acórdãos sintéticos, {bytes_texto / 1024 / 1024:.1f} MB de texto\n")
+    
+    treinado = train_dictionary(acordaos[:200])
+    layouts = [
+        ('texto', None),
+        ('zlib', None),
+        ('zlib+juridico', DICTIONARIES['juridico-v1']),
+        ('zlib+treinado', treinado),
+    ]
+    ids = [rng.randint(1, args.decisoes) for _ in range(args.leituras)]
+    
+    print(f"{'layout':<15}{'banco (MB)':>11}{'razão':>7}{'listagem (ms)':>15}{'leitura (ms)':>14}{'busca (ms)':>12}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        base = None
+        for nome, dicionario in layouts:
+            caminho = os.path.join(diretorio, f'{nome}.db')
+            conn = criar_banco(caminho, nome if nome in ('texto', 'zlib') else 'dicionario', acordaos, dicionario)
+            tamanho = os.path.getsize(caminho)
+            base = base or tamanho
+            
+            # Listagem no padrão do SELECT * do ORM: no layout anterior o texto vem junto
+            listagem = medir(lambda: conn.execute(
+                'SELECT * FROM jurisprudencia ORDER BY data_coleta DESC LIMIT 50').fetchall(), 20)
+            
+            if nome == 'texto':
+                ler = lambda: [conn.execute('SELECT acordao FROM jurisprudencia WHERE id = ?', (i,)).fetchone()[0] for i in ids]
+                buscar = lambda: conn.execute("SELECT id FROM jurisprudencia WHERE acordao LIKE '%cerceamento de defesa ao indeferir%'").fetchall()
+            else:
+                ler = lambda: [
+                    decompress_text(*conn.execute(
+                        'SELECT t.codec, t.dados FROM jurisprudencia j JOIN textos_comprimidos t ON t.hash = j.acordao_hash '
+                        'WHERE j.id = ?', (i,)).fetchone(), dicionario)
+                    for i in ids
+                ]
+                buscar = lambda: conn.execute(
+                    "SELECT j.id FROM jurisprudencia j WHERE (SELECT texto_descomprimido(t.codec, t.dados) "
+                    "FROM textos_comprimidos t WHERE t.hash = j.acordao_hash) LIKE '%cerceamento de defesa ao indeferir%'"
+                ).fetchall()
+            
+            leitura = medir(ler, 3) / len(ids)
+            busca = medir(buscar, 3)
+            print(f"{nome:<15}{tamanho / 1024 / 1024:>11.1f}{base / tamanho:>6.1f}x{listagem:>15.3f}{leitura:>14.4f}{busca:>12.1f}")
+            conn.close()
+    
+    print("\nleitura: tempo médio por decisão (consulta + descompressão); busca: LIKE em todo o inteiro teor")
+
+if __name__ == '__main__':
+    main()
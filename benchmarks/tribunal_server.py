@@ -0,0 +1,237 @@
+"""Servidor HTTP local que imita os sites dos tribunais e do CNJ, para benchmarks offline
+
+As páginas usam a marcação de cada tribunal: as de benchmarks/fixtures/ servem de
+modelo e, a cada requisição, recebem resultados, números de processo e ementas
+únicos (as decisões não são descartadas como duplicatas). O host original vai no
+cabeçalho Host; StandInAdapter desvia para cá as requisições dos scrapers.
+
+Configurável: páginas de resultados por janela de busca, resultados por página,
+latência (com variação) e taxa de respostas 503.
+
+Uso:
+    python benchmarks/tribunal_server.py [--porta 8765] [--paginas 3] [--resultados 20]
+                                         [--latencia 20] [--taxa-erros 0.0]
+"""
+import os
+import re
+import sys
+import time
+import random
+import hashlib
+import argparse
+import threading
+import multiprocessing
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, urlunparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from src.scrapers.http_pool import KeepAliveAdapter
+from src.scrapers.extraction_spec import available_specs, load_spec
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+DETAIL_PREFIX = '/__stand_in__/decisao/'
+
+# Páginas de enunciados (host do CNJ): caminho -> fixture
+ENUNCIADOS_HOST = 'www.cnj.jus.br'
+ENUNCIADOS_PAGES = {
+    '/programas-e-acoes/juizados-especiais/enunciados-fonaje/enunciados-civeis/': 'fonaje_civeis.html',
+    '/programas-e-acoes/juizados-especiais/enunciados-fonaje/enunciados-criminais/': 'fonaje_civeis.html',
+    '/programas-e-acoes/juizados-especiais/enunciados-fonaje/enunciados-fazenda-publica/': 'fonaje_civeis.html',
+    '/enunciados/': 'cnj_enunciados.html'
+}
+
+PALAVRAS = (
+    'direito processo recurso tribunal decisão relator acórdão ementa consumidor responsabilidade civil '
+    'dano moral material contrato prova sentença apelação agravo embargos tese repercussão geral lei '
+    'artigo prescrição competência nulidade tutela urgência honorários custas execução penhora citação '
+    'intimação prazo preclusão legitimidade interesse mérito cautelar liminar súmula vinculante'
+).split()
+
+def _read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+def _rng(key):
+    return random.Random(hashlib.md5(key.encode()).digest())
+
+def _renumber(value, rng):
+    """Mesmo formato do número original, com outros dígitos"""
+    return re.sub(r'\d', lambda _: str(rng.randrange(10)), value)
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(PALAVRAS) for _ in range(words)).capitalize() + '.'
+
+class TribunalPages:
+    """Modelos de páginas de busca e de detalhes de uma especificação, a partir dos fixtures"""
+    
+    def __init__(self, spec_name):
+        self.spec = load_spec(spec_name)
+        self.host = urlparse(self.spec.base_url).netloc
+        self.search_path = urlparse(self.spec.search_url).path
+        self._build_search_template(_read_fixture(f'{spec_name}_busca.html'))
+        self._build_detail_template(_read_fixture(f'{spec_name}_decisao.html'))
+    
+    def _build_search_template(self, html):
+        soup = BeautifulSoup(html, 'html.parser')
+        items = self.spec.results.matches(soup)['results']
+        item = items[0]
+        
+        link = self.spec.result_fields.matches(item)['url'][0]
+        self.search_processo = self.spec.result_fields.extract(item)['numero_processo']
+        link[self.spec.result_fields.fields['url'].attr] = '@@HREF@@'
+        self.item_template = str(item)
+        
+        for other in items[1:]:
+            other.decompose()
+        item.replace_with('@@RESULTS@@')
+        self.search_head, self.search_tail = str(soup).split('@@RESULTS@@')
+    
+    def _build_detail_template(self, html):
+        values = self.spec.detail_fields.extract(BeautifulSoup(html, 'html.parser'))
+        self.detail_template = html
+        # Só são trocados os valores que aparecem literalmente na página
+        self.detail_processo = values['numero_processo'] if values['numero_processo'] in html else None
+        self.detail_ementa = values['ementa'] if values['ementa'] and values['ementa'] in html else None
+    
+    def search_page(self, query, pages, results_per_page):
+        page = int(query.get(self.spec.page_param, ['1'])[0])
+        if page > pages:
+            return self.search_head + self.search_tail
+        
+        window = query.get(self.spec.start_param, [''])[0].replace('/', '')
+        items = []
+        for i in range(results_per_page):
+            key = f'{window}-{page}-{i}'
+            item = self.item_template.replace('@@HREF@@', f'{DETAIL_PREFIX}{key}')
+            if self.search_processo:
+                item = item.replace(self.search_processo, _renumber(self.search_processo, _rng(key)))
+            items.append(item)
+        return self.search_head + ''.join(items) + self.search_tail
+    
+    def detail_page(self, key):
+        html = self.detail_template
+        if self.detail_processo:
+            html = html.replace(self.detail_processo, _renumber(self.detail_processo, _rng(key)))
+        if self.detail_ementa:
+            html = html.replace(self.detail_ementa, _sentence(_rng(key + 'ementa'), 150))
+        return html
+
+class StandInConfig:
+    def __init__(self, pages=3, results_per_page=20, latency_ms=20.0, error_rate=0.0):
+        self.pages = pages
+        self.results_per_page = results_per_page
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        server = self.server
+        config = server.config
+        
+        # Latência com variação de ±50% em torno da média
+        if config.latency_ms:
+            time.sleep(random.uniform(0.5, 1.5) * config.latency_ms / 1000)
+        
+        if random.random() < config.error_rate:
+            return self._send(503, 'Serviço indisponível')
+        
+        host = (self.headers.get('Host') or '').split(':')[0]
+        url = urlparse(self.path)
+        
+        if host == ENUNCIADOS_HOST and url.path in ENUNCIADOS_PAGES:
+            return self._send(200, server.enunciados[url.path])
+        
+        tribunal = server.tribunals.get(host)
+        if tribunal is None:
+            return self._send(404, 'Host desconhecido')
+        if url.path == tribunal.search_path:
+            return self._send(200, tribunal.search_page(parse_qs(url.query), config.pages, config.results_per_page))
+        if url.path.startswith(DETAIL_PREFIX):
+            return self._send(200, tribunal.detail_page(url.path[len(DETAIL_PREFIX):]))
+        return self._send(404, 'Página não encontrada')
+    
+    def _send(self, status, body):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format, *args):
+        pass
+
+class StandInServer(ThreadingHTTPServer):
+    """Servidor com os modelos de todos os tribunais com especificação e das páginas de enunciados"""
+    
+    daemon_threads = True
+    
+    def __init__(self, address, config):
+        super().__init__(address, StandInHandler)
+        self.config = config
+        self.tribunals = {}
+        for name in available_specs():
+            pages = TribunalPages(name)
+            self.tribunals[pages.host] = pages
+        self.enunciados = {path: _read_fixture(fixture) for path, fixture in ENUNCIADOS_PAGES.items()}
+
+class StandInAdapter(KeepAliveAdapter):
+    """Adaptador que envia as requisições de um host real ao servidor local, mantendo o Host original"""
+    
+    def __init__(self, port, **kwargs):
+        self.port = port
+        super().__init__(**kwargs)
+    
+    def send(self, request, **kwargs):
+        url = urlparse(request.url)
+        request.headers['Host'] = url.netloc
+        request.url = urlunparse(url._replace(scheme='http', netloc=f'127.0.0.1:{self.port}'))
+        return super().send(request, **kwargs)
+
+def stand_in_hosts():
+    """URLs base de todos os hosts servidos (tribunais e CNJ)"""
+    return [load_spec(name).base_url for name in available_specs()] + [f'https://{ENUNCIADOS_HOST}/']
+
+def _serve(config, port, ready):
+    server = StandInServer(('127.0.0.1', port), config)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+def start_in_subprocess(config, port=0):
+    """Sobe o servidor em outro processo (CPU e memória não entram na medição do coletor); retorna (processo, porta)"""
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(config, port, ready), daemon=True)
+    process.start()
+    return process, ready.get(timeout=30)
+
+def start_in_thread(config, port=0):
+    """Sobe o servidor numa thread deste processo; retorna (servidor, porta)"""
+    server = StandInServer(('127.0.0.1', port), config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address[1]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--paginas', type=int, default=3, help='páginas de resultados por janela de busca')
+    parser.add_argument('--resultados', type=int, default=20, help='resultados por página')
+    parser.add_argument('--latencia', type=float, default=20.0, help='latência média por resposta (ms)')
+    parser.add_argument('--taxa-erros', type=float, default=0.0, help='fração de respostas 503')
+    args = parser.parse_args()
+    
+    config = StandInConfig(args.paginas, args.resultados, args.latencia, args.taxa_erros)
+    server = StandInServer(('127.0.0.1', args.porta), config)
+    print(f"Servindo {', '.join(sorted(server.tribunals))} e {ENUNCIADOS_HOST} em http://127.0.0.1:{args.porta}")
+    print("(o host do tribunal vai no cabeçalho Host)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
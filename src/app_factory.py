@@ -0,0 +1,81 @@
+import os
+from flask import Flask, send_from_directory
+from flask_cors import CORS
+from src.models.database import db, init_db
+from src.models.jurisprudencia import Jurisprudencia, Enunciado, SentencaUsuario
+from src.routes.user import user_bp
+from src.routes.jurisprudencia import jurisprudencia_bp
+from src.routes.sentences import sentences_bp
+from src.routes.scheduler import scheduler_bp
+from src.services.scheduler_service import SchedulerService
+from src.services.paragraph_index import ParagraphIndex
+from src.services.precedent_index import PrecedentIndex
+from src.services.ingestion_log import IngestionLog
+from src.services.query_cache import QueryCache
+from src.routes.json_output import FastJSONProvider, compress_response
+
+BASE_DIR = os.path.dirname(__file__)
+
+def create_app(scheduler=True):
+    """Cria a aplicação com banco, índices, log de ingestão e cache de consultas
+    
+    Com scheduler=False o processo não participa da eleição de líder nem executa
+    jobs agendados (ex.: ferramentas de linha de comando como backfill.py).
+    """
+    app = Flask(__name__, static_folder=os.path.join(BASE_DIR, 'static'))
+    app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+    
+    # JSON com orjson e respostas comprimidas (brotli/gzip) conforme o Accept-Encoding do cliente
+    app.json = FastJSONProvider(app)
+    app.after_request(compress_response)
+    
+    # Habilita CORS para todas as rotas
+    CORS(app, origins=['https://assistente-juiz-frontend-9xsux8kme-vitorcorddevs-projects.vercel.app'])
+    
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(jurisprudencia_bp, url_prefix='/api/jurisprudencia')
+    app.register_blueprint(sentences_bp, url_prefix='/api/sentences')
+    app.register_blueprint(scheduler_bp, url_prefix='/api/scheduler')
+    
+    # Configuração e inicialização do banco de dados
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(BASE_DIR, 'database', 'app.db')}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    
+    # Banco único de todos os modelos: pool dimensionado, WAL e pool de leitura separado para as requisições GET
+    init_db(app)
+    
+    # Abre (memory-map) o índice de parágrafos das sentenças do usuário
+    app.paragraph_index = ParagraphIndex(os.path.join(BASE_DIR, 'database', 'indexes', 'paragrafos'))
+    
+    # Índice de similaridade de ementas e enunciados, atualizado a cada coleta
+    app.precedent_index = PrecedentIndex(os.path.join(BASE_DIR, 'database', 'indexes', 'precedentes'))
+    
+    # Log de ingestão: os registros coletados são gravados aqui antes de irem para o banco
+    app.ingestion_log = IngestionLog(os.path.join(BASE_DIR, 'database', 'ingestao'))
+    
+    # Cache dos resultados de /recent, /search e /enunciados, invalidado a cada commit de dados novos.
+    # Com vários processos (workers da API e o líder do scheduler), QUERY_CACHE_PATH aponta para
+    # um arquivo compartilhado que guarda os resultados e a geração atual.
+    app.query_cache = QueryCache(disk_path=os.environ.get('QUERY_CACHE_PATH'))
+    
+    # Inicializa o scheduler
+    if scheduler:
+        app.scheduler_service = SchedulerService(app)
+    
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        static_folder_path = app.static_folder
+        if static_folder_path is None:
+            return "Static folder not configured", 404
+        
+        if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
+            return send_from_directory(static_folder_path, path)
+        else:
+            index_path = os.path.join(static_folder_path, 'index.html')
+            if os.path.exists(index_path):
+                return send_from_directory(static_folder_path, 'index.html')
+            else:
+                return "index.html not found", 404
+    
+    return app
@@ -3,55 +3,13 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
-from flask_cors import CORS
-from src.models.user import db
-from src.models.jurisprudencia import Jurisprudencia, Enunciado, SentencaUsuario
-from src.routes.user import user_bp
-from src.routes.jurisprudencia import jurisprudencia_bp
-from src.routes.sentences import sentences_bp
-from src.routes.scheduler import scheduler_bp
-from src.services.scheduler_service import SchedulerService
+from src.models.database import db
+from src.app_factory import create_app
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
-
-# Habilita CORS para todas as rotas
-CORS(app, origins=['https://assistente-juiz-frontend-9xsux8kme-vitorcorddevs-projects.vercel.app'])
-
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(jurisprudencia_bp, url_prefix='/api/jurisprudencia')
-app.register_blueprint(sentences_bp, url_prefix='/api/sentences')
-app.register_blueprint(scheduler_bp, url_prefix='/api/scheduler')
-
-# Configuração e inicialização do banco de dados
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-
-# Inicializa o scheduler
-app.scheduler_service = SchedulerService(app)
-
-@app.route('/', defaults={'path': ''}) 
-@app.route('/<path:path>')
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-            return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
-            return "index.html not found", 404
+app = create_app()
 
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
     port = int(os.environ.get('PORT', 5000))
-app.run(host='0.0.0.0', port=port, debug=False)
-
-
+    app.run(host='0.0.0.0', port=port, debug=False)
@@ -0,0 +1,126 @@
+import zlib
+import hashlib
+from collections import Counter
+
+# Dicionário pré-definido do zlib: trechos que se repetem em acórdãos e sentenças.
+# Os mais frequentes ficam no fim (mais perto do início do texto, dentro da janela
+# de 32 KB do deflate). Um dicionário novo entra com outro nome; o antigo continua
+# aqui enquanto houver textos gravados com ele.
+JURIDICO_V1 = ' '.join([
+    'Poder Judiciário', 'Tribunal de Justiça do Estado de São Paulo', 'Superior Tribunal de Justiça',
+    'Supremo Tribunal Federal', 'Tribunal Superior do Trabalho', 'Tribunal Superior Eleitoral',
+    'Superior Tribunal Militar', 'Diário da Justiça Eletrônico', 'Registro: ', 'Comarca de',
+    'Vara Cível', 'Juizado Especial Cível', 'Turma Recursal', 'Câmara de Direito Privado',
+    'Câmara de Direito Público', 'Seção de Direito Privado', 'Órgão Especial', 'Plenário',
+    'Primeira Turma', 'Segunda Turma', 'Terceira Turma', 'Quarta Turma', 'Quinta Turma', 'Sexta Turma',
+    'Apelante:', 'Apelado:', 'Agravante:', 'Agravado:', 'Recorrente:', 'Recorrido:', 'Embargante:',
+    'Embargado:', 'Impetrante:', 'Impetrado:', 'Autor:', 'Réu:', 'Requerente:', 'Requerido:',
+    'Advogado:', 'Advogada:', 'Procurador:', 'Defensoria Pública', 'Ministério Público',
+    'Relator:', 'Relatora:', 'Revisor:', 'Ministro', 'Ministra', 'Desembargador', 'Desembargadora',
+    'Juiz de Direito', 'Juíza de Direito', 'Código Civil', 'Código de Processo Civil',
+    'Código de Defesa do Consumidor', 'Código Penal', 'Código de Processo Penal',
+    'Consolidação das Leis do Trabalho', 'Constituição Federal', 'Lei nº', 'art.', 'inciso', 'parágrafo único',
+    'alínea', 'Súmula', 'Tema', 'repercussão geral', 'recurso repetitivo', 'recurso especial',
+    'recurso extraordinário', 'agravo interno', 'agravo regimental', 'agravo de instrumento',
+    'embargos de declaração', 'embargos de divergência', 'apelação cível', 'mandado de segurança',
+    'habeas corpus', 'ação civil pública', 'ação rescisória', 'reclamação', 'conflito de competência',
+    'tutela de urgência', 'tutela provisória', 'antecipação dos efeitos da tutela', 'liminar',
+    'dano moral', 'danos morais', 'dano material', 'danos materiais', 'lucros cessantes',
+    'responsabilidade civil', 'responsabilidade objetiva', 'nexo de causalidade', 'inversão do ônus da prova',
+    'relação de consumo', 'falha na prestação do serviço', 'inexigibilidade do débito',
+    'cadastro de inadimplentes', 'indenização', 'quantum indenizatório', 'razoabilidade e proporcionalidade',
+    'honorários advocatícios', 'honorários sucumbenciais', 'custas e despesas processuais',
+    'correção monetária', 'juros de mora', 'a partir da citação', 'desde o arbitramento',
+    'litigância de má-fé', 'gratuidade da justiça', 'assistência judiciária gratuita',
+    'cerceamento de defesa', 'julgamento antecipado da lide', 'preliminar', 'nulidade',
+    'prescrição', 'decadência', 'ilegitimidade passiva', 'ilegitimidade ativa', 'interesse de agir',
+    'coisa julgada', 'litispendência', 'preclusão', 'trânsito em julgado', 'cumprimento de sentença',
+    'execução de título extrajudicial', 'penhora', 'impenhorabilidade', 'prequestionamento',
+    'reexame de matéria fático-probatória', 'incidência da Súmula 7/STJ', 'dissídio jurisprudencial',
+    'violação de dispositivo de lei federal', 'ofensa reflexa', 'ausência de impugnação específica',
+    'fundamentação deficiente', 'entendimento consolidado', 'jurisprudência desta Corte',
+    'precedentes', 'Precedentes.', 'Nesse sentido:', 'Confira-se:', 'Ante o exposto,',
+    'Diante do exposto,', 'Pelo exposto,', 'Isso posto,', 'Em face do exposto,',
+    'nego provimento ao recurso', 'dou provimento ao recurso', 'dou parcial provimento ao recurso',
+    'conheço do recurso', 'não conheço do recurso', 'julgo procedente o pedido',
+    'julgo improcedente o pedido', 'julgo parcialmente procedentes os pedidos',
+    'extingo o processo com resolução do mérito', 'extingo o processo sem resolução do mérito',
+    'nos termos do art. 487, inciso I, do Código de Processo Civil',
+    'nos termos do art. 485 do Código de Processo Civil', 'majoro os honorários',
+    'Publique-se. Registre-se. Intimem-se.', 'P.R.I.', 'Cumpra-se.', 'Int.',
+    'É o relatório.', 'É o relatório. Decido.', 'Passo a decidir.', 'Decido.', 'Fundamento e decido.',
+    'RELATÓRIO', 'VOTO', 'EMENTA', 'ACÓRDÃO', 'DECISÃO', 'SENTENÇA', 'DISPOSITIVO', 'FUNDAMENTAÇÃO',
+    'Trata-se de', 'Cuida-se de', 'Sustenta, em síntese, que', 'Alega o recorrente que',
+    'Contrarrazões apresentadas', 'Parecer do Ministério Público', 'Sem contrarrazões.',
+    'Vistos, relatados e discutidos estes autos',
+    'ACORDAM, em sessão permanente e virtual da', 'ACORDAM os Ministros da',
+    'ACORDAM, em', 'por unanimidade, negar provimento ao recurso', 'por maioria',
+    'por unanimidade', 'nos termos do voto do Relator', 'nos termos do voto da Relatora',
+    'de conformidade com o voto do Relator, que integra este acórdão',
+    'O julgamento teve a participação dos',
+    'Assinatura Eletrônica', 'documento assinado digitalmente',
+    'o que se faz com fundamento no', 'sob pena de', 'no prazo de 15 (quinze) dias',
+    'no prazo de 5 (cinco) dias', 'em observância ao disposto no', 'não merece reparo',
+    'não merece prosperar', 'merece reforma', 'a sentença deve ser mantida',
+    'a r. sentença', 'o v. acórdão', 'o Tribunal de origem', 'a Corte de origem', 'o acórdão recorrido',
+    'da parte autora', 'da parte ré', 'do réu', 'do autor', 'da ré', 'da autora', 'dos autos',
+    'nos autos', 'que', 'não', 'para', 'com', 'uma', 'pela', 'pelo', 'como', 'mais', 'processo', 'recurso',
+])
+
+DICTIONARIES = {
+    'juridico-v1': JURIDICO_V1.encode('utf-8'),
+}
+
+# Codec dos textos novos: 'zlib' ou 'zlib:<dicionário>'
+DEFAULT_CODEC = 'zlib:juridico-v1'
+
+COMPRESSION_LEVEL = 6
+
+def _dictionary(codec):
+    _, _, name = codec.partition(':')
+    return DICTIONARIES[name] if name else None
+
+def compress_text(text, codec=DEFAULT_CODEC, dictionary=None):
+    """Comprime o texto (UTF-8) com o codec; `dictionary` substitui o dicionário do codec"""
+    zdict = dictionary if dictionary is not None else _dictionary(codec)
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=zdict) if zdict else zlib.compressobj(COMPRESSION_LEVEL)
+    return compressor.compress(text.encode('utf-8')) + compressor.flush()
+
+def decompress_text(codec, data, dictionary=None):
+    if data is None:
+        return None
+    zdict = dictionary if dictionary is not None else _dictionary(codec)
+    decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    return (decompressor.decompress(data) + decompressor.flush()).decode('utf-8')
+
+def text_hash(text):
+    """Chave de conteúdo do texto (textos iguais são gravados uma única vez)"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def train_dictionary(samples, size=32 * 1024, min_words=3, max_words=8):
+    """Monta um dicionário zlib com as sequências de palavras mais repetidas nas amostras
+    
+    As sequências são ordenadas pelo ganho estimado (ocorrências x tamanho), com as
+    melhores no fim do dicionário, onde o deflate as alcança com distâncias menores.
+    """
+    counts = Counter()
+    for sample in samples:
+        words = sample.split()
+        for n in range(min_words, max_words + 1):
+            counts.update(' '.join(words[i:i + n]) for i in range(len(words) - n + 1))
+    
+    ranked = sorted(
+        ((count * len(ngram), ngram) for ngram, count in counts.items() if count > 1),
+        reverse=True
+    )
+    chosen, total = [], 0
+    for _, ngram in ranked:
+        encoded = ngram.encode('utf-8') + b' '
+        if total + len(encoded) > size:
+            break
+        if any(ngram in other for other in chosen[-200:]):
+            continue  # Já coberta por uma sequência maior
+        chosen.append(ngram)
+        total += len(encoded)
+    
+    return ' '.join(reversed(chosen)).encode('utf-8')
@@ -0,0 +1,35 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.engine import make_url
+from src.models.sqlite_config import RoutingSession, configure_sqlite
+
+# Instância única da aplicação: um metadata com todas as tabelas, um engine e um
+# registro de sessões (por contexto da aplicação). Modelos e serviços importam daqui.
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Pool do engine principal (escritas e leituras fora de requisições GET). Cada coleta
+# em andamento (executor do scheduler, backfill) segura uma conexão durante o lote;
+# o restante atende requisições POST e as threads de manutenção.
+POOL_SIZE = 10
+POOL_OVERFLOW = 10
+POOL_TIMEOUT = 30  # s esperando uma conexão livre antes de erro
+
+def _uses_static_pool(uri):
+    """SQLite em memória usa StaticPool (uma conexão só), que não aceita dimensionamento"""
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+def init_db(app):
+    """Registra o banco na aplicação: engine com pool dimensionado, PRAGMAs do SQLite e pool de leitura
+    
+    O tamanho do pool pode ser ajustado com DB_POOL_SIZE, DB_POOL_OVERFLOW e
+    DB_POOL_TIMEOUT na configuração da aplicação.
+    """
+    options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    if not _uses_static_pool(app.config['SQLALCHEMY_DATABASE_URI']):
+        options.setdefault('pool_size', app.config.get('DB_POOL_SIZE', POOL_SIZE))
+        options.setdefault('max_overflow', app.config.get('DB_POOL_OVERFLOW', POOL_OVERFLOW))
+        options.setdefault('pool_timeout', app.config.get('DB_POOL_TIMEOUT', POOL_TIMEOUT))
+    
+    db.init_app(app)
+    configure_sqlite(app, db)
+    return db
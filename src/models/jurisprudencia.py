@@ -1,10 +1,91 @@
-from flask_sqlalchemy import SQLAlchemy
+import sqlite3
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.hybrid import hybrid_property
 from datetime import datetime
+from src.models.database import db
+from src.models.compression import DEFAULT_CODEC, compress_text, decompress_text, text_hash
 
-db = SQLAlchemy()
+@event.listens_for(Engine, 'connect')
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    """Permite filtrar textos comprimidos em SQL (ex.: Jurisprudencia.acordao.contains(...)) no SQLite"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function('texto_descomprimido', 2, decompress_text, deterministic=True)
+
+class TextoComprimido(db.Model):
+    """Texto grande (inteiro teor, texto de sentença) comprimido e endereçado pelo conteúdo
+    
+    Fica fora das tabelas principais: consultas que não usam o texto não o leem do
+    disco, e textos idênticos são gravados uma única vez.
+    """
+    __tablename__ = 'textos_comprimidos'
+    
+    hash = db.Column(db.String(64), primary_key=True)  # sha256 do texto
+    codec = db.Column(db.String(40), nullable=False)  # 'zlib' ou 'zlib:<dicionário>' (ver compression.py)
+    dados = db.Column(db.LargeBinary, nullable=False)
+    tamanho = db.Column(db.Integer, nullable=False)  # bytes do texto sem compressão
+    
+    def __repr__(self):
+        return f'<TextoComprimido {self.hash[:12]} {self.tamanho} bytes>'
+    
+    @property
+    def texto(self):
+        """Texto descomprimido no primeiro acesso"""
+        if getattr(self, '_texto', None) is None:
+            self._texto = decompress_text(self.codec, self.dados)
+        return self._texto
+    
+    @classmethod
+    def for_text(cls, texto):
+        """Blob do texto, gravado na transação atual da sessão se ainda não existir
+        
+        O INSERT OR IGNORE não falha quando outra transação grava o mesmo texto ao
+        mesmo tempo, e garante o blob dentro da transação de quem o referencia (uma
+        limpeza de órfãos concorrente não o remove antes do commit).
+        """
+        if texto is None:
+            return None
+        
+        key = text_hash(texto)
+        db.session.execute(
+            sqlite_insert(cls.__table__)
+            .values(hash=key, codec=DEFAULT_CODEC, dados=compress_text(texto), tamanho=len(texto.encode('utf-8')))
+            .on_conflict_do_nothing(index_elements=['hash'])
+        )
+        blob = db.session.get(cls, key)
+        if getattr(blob, '_texto', None) is None:
+            blob._texto = texto
+        return blob
+    
+    @classmethod
+    def delete_orphans(cls, hashes=None):
+        """Remove os blobs que nenhuma decisão ou sentença referencia (só entre `hashes`, se informado)
+        
+        Executa na transação atual da sessão (o commit fica com quem chama) e retorna
+        quantos blobs foram removidos.
+        """
+        statement = db.delete(cls).where(
+            cls.hash.not_in(db.select(Jurisprudencia.acordao_hash).where(Jurisprudencia.acordao_hash.is_not(None))),
+            cls.hash.not_in(db.select(SentencaUsuario.texto_extraido_hash))
+        )
+        if hashes is not None:
+            statement = statement.where(cls.hash.in_([key for key in hashes if key]))
+        return db.session.execute(statement.execution_options(synchronize_session=False)).rowcount
+    
+    @classmethod
+    def text_expression(cls, hash_column):
+        """Texto descomprimido como expressão SQL (subconsulta por hash)"""
+        return (
+            db.select(db.func.texto_descomprimido(cls.codec, cls.dados))
+            .where(cls.hash == hash_column)
+            .scalar_subquery()
+        )
 
 class Jurisprudencia(db.Model):
     __tablename__ = 'jurisprudencia'
+    # Consulta de URLs já coletadas antes de baixar os detalhes (ver JurisprudenciaService)
+    __table_args__ = (db.Index('ix_jurisprudencia_tribunal_url', 'tribunal', 'url_origem'),)
     
     id = db.Column(db.Integer, primary_key=True)
     tribunal = db.Column(db.String(10), nullable=False)  # STF, STJ, TST, TSE, STM, TJSP
@@ -13,10 +94,29 @@ class Jurisprudencia(db.Model):
     data_julgamento = db.Column(db.Date)
     data_publicacao = db.Column(db.Date)
     ementa = db.Column(db.Text)
-    acordao = db.Column(db.Text)
+    acordao_hash = db.Column(db.String(64), db.ForeignKey('textos_comprimidos.hash'))  # inteiro teor comprimido
     tags = db.Column(db.Text)  # palavras-chave separadas por vírgula
     url_origem = db.Column(db.String(500))
     data_coleta = db.Column(db.DateTime, default=datetime.utcnow)
+    duplicata_de = db.Column(db.Integer, db.ForeignKey('jurisprudencia.id'), index=True)  # decisão canônica do cluster de quase-duplicatas
+    
+    acordao_texto = db.relationship(TextoComprimido, foreign_keys=[acordao_hash])
+    
+    @hybrid_property
+    def acordao(self):
+        return self.acordao_texto.texto if self.acordao_texto else None
+    
+    @acordao.setter
+    def acordao(self, value):
+        self.acordao_texto = TextoComprimido.for_text(value)
+    
+    @acordao.expression
+    def acordao(cls):
+        return TextoComprimido.text_expression(cls.acordao_hash)
+    
+    @property
+    def cluster_id(self):
+        return self.duplicata_de or self.id
     
     def __repr__(self):
         return f'<Jurisprudencia {self.tribunal} - {self.numero_processo}>'
@@ -33,7 +133,8 @@ class Jurisprudencia(db.Model):
             'acordao': self.acordao,
             'tags': self.tags,
             'url_origem': self.url_origem,
-            'data_coleta': self.data_coleta.isoformat() if self.data_coleta else None
+            'data_coleta': self.data_coleta.isoformat() if self.data_coleta else None,
+            'duplicata_de': self.duplicata_de
         }
 
 class Enunciado(db.Model):
@@ -70,10 +171,24 @@ class SentencaUsuario(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     nome_arquivo = db.Column(db.String(200), nullable=False)
-    texto_extraido = db.Column(db.Text, nullable=False)
+    texto_extraido_hash = db.Column(db.String(64), db.ForeignKey('textos_comprimidos.hash'), nullable=False)
     caracteristicas_estilo = db.Column(db.Text)  # JSON com características do estilo
     data_upload = db.Column(db.DateTime, default=datetime.utcnow)
     
+    texto_extraido_texto = db.relationship(TextoComprimido, foreign_keys=[texto_extraido_hash])
+    
+    @hybrid_property
+    def texto_extraido(self):
+        return self.texto_extraido_texto.texto if self.texto_extraido_texto else None
+    
+    @texto_extraido.setter
+    def texto_extraido(self, value):
+        self.texto_extraido_texto = TextoComprimido.for_text(value)
+    
+    @texto_extraido.expression
+    def texto_extraido(cls):
+        return TextoComprimido.text_expression(cls.texto_extraido_hash)
+    
     def __repr__(self):
         return f'<SentencaUsuario {self.nome_arquivo}>'
     
@@ -86,3 +201,225 @@ class SentencaUsuario(db.Model):
             'data_upload': self.data_upload.isoformat() if self.data_upload else None
         }
 
+class AssinaturaEmenta(db.Model):
+    __tablename__ = 'assinaturas_ementa'
+    
+    jurisprudencia_id = db.Column(db.Integer, db.ForeignKey('jurisprudencia.id'), primary_key=True)
+    assinatura = db.Column(db.LargeBinary, nullable=False)  # MinHash da ementa (uint32 x num_perm)
+    
+    def __repr__(self):
+        return f'<AssinaturaEmenta {self.jurisprudencia_id}>'
+
+class BucketLSH(db.Model):
+    __tablename__ = 'lsh_buckets'
+    __table_args__ = (db.Index('ix_lsh_buckets_banda_hash', 'banda', 'hash_bucket'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    banda = db.Column(db.Integer, nullable=False)
+    hash_bucket = db.Column(db.BigInteger, nullable=False)
+    jurisprudencia_id = db.Column(db.Integer, db.ForeignKey('jurisprudencia.id'), nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<BucketLSH {self.banda}:{self.hash_bucket} -> {self.jurisprudencia_id}>'
+
+class Citacao(db.Model):
+    __tablename__ = 'citacoes'
+    __table_args__ = (
+        db.UniqueConstraint('chave', 'jurisprudencia_id', name='uq_citacoes_chave_jurisprudencia'),
+        db.Index('ix_citacoes_tipo_data_coleta', 'tipo', 'data_coleta'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    chave = db.Column(db.String(100), nullable=False)  # ex.: LEI-8078-1990:ART-6
+    tipo = db.Column(db.String(10), nullable=False)  # lei, artigo
+    jurisprudencia_id = db.Column(db.Integer, db.ForeignKey('jurisprudencia.id'), nullable=False, index=True)
+    ocorrencias = db.Column(db.Integer, nullable=False, default=1)
+    data_coleta = db.Column(db.DateTime, default=datetime.utcnow)  # cópia de Jurisprudencia.data_coleta
+    
+    def __repr__(self):
+        return f'<Citacao {self.chave} -> {self.jurisprudencia_id}>'
+    
+    def to_dict(self):
+        return {
+            'chave': self.chave,
+            'tipo': self.tipo,
+            'jurisprudencia_id': self.jurisprudencia_id,
+            'ocorrencias': self.ocorrencias
+        }
+
+class CollectionRun(db.Model):
+    __tablename__ = 'collection_runs'
+    __table_args__ = (db.Index('ix_collection_runs_tribunal_inicio', 'tribunal', 'inicio'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    execucao_id = db.Column(db.String(32), nullable=False, index=True)  # agrupa as fontes de uma mesma coleta
+    tribunal = db.Column(db.String(20), nullable=False)  # STF, STJ, TJSP, ENUNCIADOS
+    inicio = db.Column(db.DateTime, nullable=False, index=True)
+    fim = db.Column(db.DateTime)
+    duracao = db.Column(db.Float)  # segundos
+    paginas = db.Column(db.Integer, default=0)
+    bytes_baixados = db.Column(db.Integer, default=0)
+    itens_parseados = db.Column(db.Integer, default=0)
+    duplicatas = db.Column(db.Integer, default=0)
+    inseridos = db.Column(db.Integer, default=0)
+    erros = db.Column(db.Integer, default=0)
+    status = db.Column(db.String(20))  # success, error
+    mensagem_erro = db.Column(db.Text)
+    
+    def __repr__(self):
+        return f'<CollectionRun {self.tribunal} - {self.inicio}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'execucao_id': self.execucao_id,
+            'tribunal': self.tribunal,
+            'inicio': self.inicio.isoformat() if self.inicio else None,
+            'fim': self.fim.isoformat() if self.fim else None,
+            'duracao': round(self.duracao, 3) if self.duracao is not None else None,
+            'paginas': self.paginas,
+            'bytes_baixados': self.bytes_baixados,
+            'itens_parseados': self.itens_parseados,
+            'duplicatas': self.duplicatas,
+            'inseridos': self.inseridos,
+            'erros': self.erros,
+            'status': self.status,
+            'mensagem_erro': self.mensagem_erro
+        }
+
+class ColetaWatermark(db.Model):
+    __tablename__ = 'collection_watermarks'
+    
+    tribunal = db.Column(db.String(20), primary_key=True)
+    data_referencia = db.Column(db.Date, nullable=False)  # data de julgamento/publicação mais recente já ingerida
+    execucao_id = db.Column(db.String(32))  # execução que avançou a marca
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ColetaWatermark {self.tribunal} - {self.data_referencia}>'
+    
+    def to_dict(self):
+        return {
+            'tribunal': self.tribunal,
+            'data_referencia': self.data_referencia.isoformat() if self.data_referencia else None,
+            'execucao_id': self.execucao_id,
+            'atualizado_em': self.atualizado_em.isoformat() if self.atualizado_em else None
+        }
+
+class VersaoDados(db.Model):
+    """Versão dos dados de uma tabela, incrementada a cada commit que muda o resultado das consultas
+    
+    Fica no banco, então é a mesma para todos os processos (workers da API e líder
+    do scheduler); é a base do ETag e do Last-Modified das rotas de leitura.
+    """
+    __tablename__ = 'data_versions'
+    
+    tabela = db.Column(db.String(50), primary_key=True)  # jurisprudencia, enunciados, sentencas
+    versao = db.Column(db.Integer, nullable=False, default=0)
+    atualizado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    @classmethod
+    def bump(cls, tabela):
+        """Incrementa a versão da tabela na transação atual da sessão (o commit fica com quem chama)"""
+        now = datetime.utcnow()
+        statement = sqlite_insert(cls.__table__).values(tabela=tabela, versao=1, atualizado_em=now)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['tabela'], set_={'versao': cls.__table__.c.versao + 1, 'atualizado_em': now}
+        ))
+    
+    def __repr__(self):
+        return f'<VersaoDados {self.tabela} {self.versao}>'
+
+class IngestaoOffset(db.Model):
+    __tablename__ = 'ingestion_offsets'
+    
+    fonte = db.Column(db.String(20), primary_key=True)
+    segmento = db.Column(db.Integer, nullable=False, default=0)  # segmento do log de ingestão em aplicação
+    registro = db.Column(db.Integer, nullable=False, default=0)  # registros do segmento já aplicados ao banco
+    posicao = db.Column(db.BigInteger, nullable=False, default=0)  # byte do próximo membro gzip do segmento a aplicar
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<IngestaoOffset {self.fonte} {self.segmento}:{self.registro}>'
+    
+    def to_dict(self):
+        return {
+            'fonte': self.fonte,
+            'segmento': self.segmento,
+            'registro': self.registro,
+            'posicao': self.posicao,
+            'atualizado_em': self.atualizado_em.isoformat() if self.atualizado_em else None
+        }
+
+class Backfill(db.Model):
+    __tablename__ = 'backfills'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    tribunais = db.Column(db.String(100), nullable=False)  # separados por vírgula
+    data_inicio = db.Column(db.Date, nullable=False)
+    data_fim = db.Column(db.Date, nullable=False)
+    janela_dias = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, running, stopped, finished, error
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    iniciado_em = db.Column(db.DateTime)  # início da execução atual (base da vazão e do ETA)
+    finalizado_em = db.Column(db.DateTime)
+    
+    # Contadores no início da execução atual, para medir a vazão só desta execução
+    janelas_no_inicio = db.Column(db.Integer, default=0)
+    paginas_no_inicio = db.Column(db.Integer, default=0)
+    decisoes_no_inicio = db.Column(db.Integer, default=0)
+    
+    def __repr__(self):
+        return f'<Backfill {self.id} {self.data_inicio} - {self.data_fim}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tribunais': self.tribunais.split(','),
+            'data_inicio': self.data_inicio.isoformat(),
+            'data_fim': self.data_fim.isoformat(),
+            'janela_dias': self.janela_dias,
+            'status': self.status,
+            'criado_em': self.criado_em.isoformat() if self.criado_em else None,
+            'iniciado_em': self.iniciado_em.isoformat() if self.iniciado_em else None,
+            'finalizado_em': self.finalizado_em.isoformat() if self.finalizado_em else None
+        }
+
+class BackfillJanela(db.Model):
+    __tablename__ = 'backfill_janelas'
+    __table_args__ = (
+        db.UniqueConstraint('backfill_id', 'tribunal', 'data_inicio', name='uq_backfill_janelas_tribunal_inicio'),
+        db.Index('ix_backfill_janelas_backfill_status', 'backfill_id', 'status'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    backfill_id = db.Column(db.Integer, db.ForeignKey('backfills.id'), nullable=False)
+    tribunal = db.Column(db.String(20), nullable=False)
+    data_inicio = db.Column(db.Date, nullable=False)
+    data_fim = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, running, done, error
+    proxima_pagina = db.Column(db.Integer, nullable=False, default=1)  # cursor de páginas de resultado
+    paginas = db.Column(db.Integer, default=0)
+    decisoes = db.Column(db.Integer, default=0)
+    inseridos = db.Column(db.Integer, default=0)
+    tentativas = db.Column(db.Integer, default=0)
+    erro = db.Column(db.Text)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<BackfillJanela {self.tribunal} {self.data_inicio} - {self.data_fim}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tribunal': self.tribunal,
+            'data_inicio': self.data_inicio.isoformat(),
+            'data_fim': self.data_fim.isoformat(),
+            'status': self.status,
+            'proxima_pagina': self.proxima_pagina,
+            'paginas': self.paginas,
+            'decisoes': self.decisoes,
+            'inseridos': self.inseridos,
+            'tentativas': self.tentativas,
+            'erro': self.erro
+        }
@@ -0,0 +1,57 @@
+from src.models.database import db
+
+class SchedulerLock(db.Model):
+    __tablename__ = 'scheduler_locks'
+    
+    nome = db.Column(db.String(100), primary_key=True)
+    dono = db.Column(db.String(200), nullable=False)  # host:pid:id do processo líder
+    expira_em = db.Column(db.DateTime, nullable=False)
+    atualizado_em = db.Column(db.DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f'<SchedulerLock {self.nome} - {self.dono}>'
+    
+    def to_dict(self):
+        return {
+            'nome': self.nome,
+            'dono': self.dono,
+            'expira_em': self.expira_em.isoformat() if self.expira_em else None,
+            'atualizado_em': self.atualizado_em.isoformat() if self.atualizado_em else None
+        }
+
+class SourceState(db.Model):
+    __tablename__ = 'source_states'
+    
+    fonte = db.Column(db.String(20), primary_key=True)  # STF, STJ, TJSP, ENUNCIADOS
+    ultimo_inicio = db.Column(db.DateTime)
+    ultimo_fim = db.Column(db.DateTime)
+    ultima_duracao = db.Column(db.Float)  # segundos
+    ultimo_status = db.Column(db.String(20))  # success, error
+    ultimos_coletados = db.Column(db.Integer)
+    ultimo_erro = db.Column(db.Text)
+    
+    # Modo adaptativo: o intervalo se ajusta ao rendimento de cada execução
+    modo = db.Column(db.String(20), default='fixed')  # fixed, adaptive
+    intervalo_atual = db.Column(db.Float)  # minutos
+    intervalo_min = db.Column(db.Float)
+    intervalo_max = db.Column(db.Float)
+    execucoes_vazias = db.Column(db.Integer, default=0)  # execuções seguidas sem itens novos
+    
+    def __repr__(self):
+        return f'<SourceState {self.fonte}>'
+    
+    def to_dict(self):
+        return {
+            'fonte': self.fonte,
+            'ultimo_inicio': self.ultimo_inicio.isoformat() if self.ultimo_inicio else None,
+            'ultimo_fim': self.ultimo_fim.isoformat() if self.ultimo_fim else None,
+            'ultima_duracao': round(self.ultima_duracao, 2) if self.ultima_duracao is not None else None,
+            'ultimo_status': self.ultimo_status,
+            'ultimos_coletados': self.ultimos_coletados,
+            'ultimo_erro': self.ultimo_erro,
+            'modo': self.modo or 'fixed',
+            'intervalo_atual': self.intervalo_atual,
+            'intervalo_min': self.intervalo_min,
+            'intervalo_max': self.intervalo_max,
+            'execucoes_vazias': self.execucoes_vazias or 0
+        }
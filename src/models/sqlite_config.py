@@ -0,0 +1,140 @@
+import sqlite3
+import logging
+from flask import request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.sql.expression import Select, CompoundSelect
+
+logger = logging.getLogger(__name__)
+
+# PRAGMAs aplicados a toda conexão nova. Com WAL, leitores não bloqueiam o escritor
+# (nem o contrário) e synchronous=NORMAL só faz fsync nos checkpoints; uma queda de
+# energia pode perder os últimos commits, mas não corrompe o banco (e os registros
+# coletados continuam no log de ingestão). Sobrescreva com app.config['SQLITE_PRAGMAS'].
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 30000,  # ms esperando o lock de escrita antes de "database is locked" (um lote da coleta inteiro)
+    'cache_size': -16384,  # KiB por conexão (16 MB)
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Conexões do pool de leitura (somente leitura, PRAGMA query_only)
+READ_POOL_SIZE = 8
+READ_POOL_OVERFLOW = 8
+
+# Requisições atendidas pelo pool de leitura
+READ_METHODS = ('GET', 'HEAD')
+
+class RoutingSession(Session):
+    """Sessão que envia os SELECTs ao pool de leitura quando `info['read_engine']` está definido
+    
+    Escritas (flush, UPDATE/DELETE em lote) vão sempre para o engine principal; a
+    partir da primeira escrita a sessão fica no engine principal até o fim, para
+    enxergar os próprios dados ainda não confirmados.
+    """
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        read_engine = self.info.get('read_engine')
+        if bind is None and read_engine is not None and not self.info.get('wrote'):
+            if isinstance(clause, (Select, CompoundSelect)) and not self._flushing:
+                return read_engine
+            self.info['wrote'] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def begin_write(session):
+    """Abre a transação da sessão já com o lock de escrita do SQLite (BEGIN IMMEDIATE)
+    
+    O pysqlite só emite BEGIN antes do primeiro INSERT/UPDATE/DELETE; um SAVEPOINT
+    (session.begin_nested) antes disso abre uma transação adiada que o RELEASE
+    confirma sozinho, e leituras dentro dela seguidas de escrita falham com
+    "database is locked" sem esperar o busy_timeout se outro processo gravou no
+    meio. BEGIN IMMEDIATE espera o lock pelo busy_timeout e mantém os savepoints
+    dentro de uma única transação, confirmada pelo commit da sessão. Sem efeito se
+    a transação já estiver aberta ou o banco não for SQLite.
+    """
+    connection = session.connection()
+    dbapi_connection = connection.connection.driver_connection
+    if isinstance(dbapi_connection, sqlite3.Connection) and not dbapi_connection.in_transaction:
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+def _is_file_database(url):
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+def _pragma_listener(pragmas, read_only=False):
+    def apply_pragmas(dbapi_connection, connection_record):
+        if not isinstance(dbapi_connection, sqlite3.Connection):
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                if read_only and name == 'journal_mode':
+                    continue  # Persistente no arquivo; quem define é o engine principal
+                cursor.execute(f'PRAGMA {name}={value}')
+            if read_only:
+                cursor.execute('PRAGMA query_only=ON')
+        finally:
+            cursor.close()
+    return apply_pragmas
+
+def configure_sqlite(app, db):
+    """Aplica os PRAGMAs ao engine do `db` e cria o pool de leitura usado nas requisições GET/HEAD
+    
+    Deve ser chamado depois de db.init_app(app). Bancos em memória recebem os
+    PRAGMAs, mas não o pool de leitura (cada conexão veria um banco diferente).
+    Retorna o engine de leitura, ou None.
+    """
+    pragmas = {**SQLITE_PRAGMAS, **app.config.get('SQLITE_PRAGMAS', {})}
+    
+    with app.app_context():
+        engine = db.engine
+    if engine.url.get_backend_name() != 'sqlite':
+        return None
+    
+    event.listen(engine, 'connect', _pragma_listener(pragmas))
+    if not _is_file_database(engine.url):
+        return None
+    
+    # Conexões já abertas não passaram pelo listener; a próxima já abre em WAL
+    engine.dispose()
+    with engine.connect():
+        pass
+    
+    read_engine = create_engine(
+        engine.url,
+        pool_size=app.config.get('SQLITE_READ_POOL_SIZE', READ_POOL_SIZE),
+        max_overflow=app.config.get('SQLITE_READ_POOL_OVERFLOW', READ_POOL_OVERFLOW)
+    )
+    event.listen(read_engine, 'connect', _pragma_listener(pragmas, read_only=True))
+    app.extensions.setdefault('sqlite_read_engines', {})[id(db)] = read_engine
+    
+    @app.before_request
+    def _use_read_pool():
+        if request.method in READ_METHODS:
+            db.session.info['read_engine'] = read_engine
+    
+    logger.info(f"SQLite configurado ({engine.url.database}): "
+                f"{', '.join(f'{name}={value}' for name, value in pragmas.items())}; pool de leitura com {read_engine.pool.size()} conexões")
+    return read_engine
+
+def _engine_status(engine):
+    with engine.connect() as connection:
+        pragmas = {
+            name: connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+            for name in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size', 'query_only')
+        }
+    return {'pragmas': pragmas, 'pool': engine.pool.status()}
+
+def database_status(app, db):
+    """PRAGMAs efetivos e estado dos pools de escrita e de leitura do `db`"""
+    with app.app_context():
+        engine = db.engine
+    if engine.url.get_backend_name() != 'sqlite':
+        return {'backend': engine.url.get_backend_name()}
+    read_engine = app.extensions.get('sqlite_read_engines', {}).get(id(db))
+    return {
+        'backend': 'sqlite',
+        'write': _engine_status(engine),
+        'read': _engine_status(read_engine) if read_engine is not None else None
+    }
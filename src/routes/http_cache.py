@@ -0,0 +1,59 @@
+import logging
+from datetime import timezone
+from functools import wraps
+from flask import request, make_response
+
+logger = logging.getLogger(__name__)
+
+# Cache-Control por tipo de endpoint. Listas de jurisprudência mudam a cada coleta:
+# o navegador pode reaproveitar por um minuto e depois revalida (304 sem corpo).
+# Enunciados mudam raramente. Status e perfil de estilo são sempre revalidados.
+CACHE_LIST = 'public, max-age=60, must-revalidate'
+CACHE_STABLE = 'public, max-age=600, must-revalidate'
+CACHE_REVALIDATE = 'no-cache'
+CACHE_PRIVATE = 'private, no-cache'
+
+def _not_modified(etag, last_modified):
+    """Aplica as regras de requisição condicional: If-None-Match tem precedência sobre If-Modified-Since"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+def _set_validators(response, etag, last_modified, cache_control):
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def conditional_get(version, cache_control=CACHE_REVALIDATE):
+    """Responde 304 a GETs condicionais sem executar a view, a partir dos validadores de `version()`
+    
+    `version` devolve {'etag', 'last_modified'} com uma consulta barata; a view só
+    roda (consulta e serialização) quando o cliente não tem a versão atual. Apenas
+    respostas 200 recebem ETag, Last-Modified e o Cache-Control informado.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                validators = version()
+                etag = validators['etag']
+                last_modified = validators.get('last_modified')
+                if last_modified is not None and last_modified.tzinfo is None:
+                    last_modified = last_modified.replace(tzinfo=timezone.utc)  # data_coleta é gravada em UTC
+            except Exception as e:
+                logger.error(f"Erro ao calcular validadores de {request.path}: {e}")
+                return view(*args, **kwargs)
+            
+            if _not_modified(etag, last_modified):
+                return _set_validators(make_response('', 304), etag, last_modified, cache_control)
+            
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                _set_validators(response, etag, last_modified, cache_control)
+            return response
+        return wrapper
+    return decorator
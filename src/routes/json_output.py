@@ -0,0 +1,160 @@
+import json
+import zlib
+from flask import request, Response
+from flask.json.provider import DefaultJSONProvider, _default
+
+# orjson serializa bem mais rápido que o json da biblioteca padrão; sem ele instalado,
+# as mesmas funções usam o json nativo
+try:
+    import orjson
+    ORJSON_OPTIONS = (
+        orjson.OPT_PASSTHROUGH_DATETIME  # datas no mesmo formato do jsonify (ver _default do Flask)
+        | orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_SERIALIZE_NUMPY
+    )
+except ImportError:
+    orjson = None
+
+# Brotli comprime texto jurídico melhor que gzip; só é oferecido se o módulo estiver instalado
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Respostas menores que isso não compensam a compressão
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_MIMETYPES = ('application/json', 'application/x-ndjson')
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Listas com pelo menos STREAM_MIN_ITEMS itens vão em streaming (chunked), em blocos de
+# STREAM_CHUNK_ITEMS, sem montar o corpo codificado inteiro na memória
+STREAM_MIN_ITEMS = 200
+STREAM_CHUNK_ITEMS = 50
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+def dumps(obj, sort_keys=False):
+    """Serializa para JSON em bytes (UTF-8)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS | (orjson.OPT_SORT_KEYS if sort_keys else 0))
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':'), sort_keys=sort_keys).encode('utf-8')
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Provedor JSON do Flask (jsonify, request.get_json) com orjson quando disponível"""
+    
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs.get('indent'):
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, sort_keys=kwargs.get('sort_keys', self.sort_keys)).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        if orjson is None or (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj, sort_keys=self.sort_keys) + b'\n', mimetype=self.mimetype)
+
+def negotiate_encoding():
+    """Codificação aceita pelo cliente: 'br' (se instalado), 'gzip' ou None"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted.quality('br') > 0:
+        return 'br'
+    if accepted.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+class _StreamCompressor:
+    def __init__(self, encoding):
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._compress, self._finish = self._compressor.process, self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31: formato gzip
+            self._compress, self._finish = self._compressor.compress, self._compressor.flush
+    
+    def compress(self, data):
+        return self._compress(data)
+    
+    def finish(self):
+        return self._finish()
+
+def _compress(data, encoding):
+    compressor = _StreamCompressor(encoding)
+    return compressor.compress(data) + compressor.finish()
+
+def _add_vary(response):
+    response.vary.add('Accept-Encoding')
+
+def compress_response(response):
+    """after_request: comprime respostas JSON acima de COMPRESS_MIN_BYTES com a codificação negociada"""
+    if (response.direct_passthrough or response.is_streamed or response.status_code != 200
+            or response.mimetype not in COMPRESS_MIMETYPES or 'Content-Encoding' in response.headers):
+        return response
+    
+    _add_vary(response)
+    data = response.get_data()
+    encoding = negotiate_encoding()
+    if encoding is None or len(data) < COMPRESS_MIN_BYTES:
+        return response
+    
+    response.set_data(_compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def _wants_ndjson():
+    if request.args.get('format') == 'ndjson':
+        return True
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+def _stream(chunks, encoding):
+    if encoding is None:
+        yield from chunks
+        return
+    compressor = _StreamCompressor(encoding)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.finish()
+
+def _json_chunks(items, header):
+    # {"success":true,...,"data":[ ... ]}: o cabeçalho é serializado sem o "}" final
+    yield dumps(header)[:-1] + b',"data":['
+    for start in range(0, len(items), STREAM_CHUNK_ITEMS):
+        chunk = b','.join(dumps(item) for item in items[start:start + STREAM_CHUNK_ITEMS])
+        yield (b',' + chunk) if start else chunk
+    yield b']}\n'
+
+def _ndjson_chunks(items):
+    for start in range(0, len(items), STREAM_CHUNK_ITEMS):
+        yield b''.join(dumps(item) + b'\n' for item in items[start:start + STREAM_CHUNK_ITEMS])
+
+def list_response(items, **extra):
+    """Resposta de lista no formato {'success', 'data', 'count', ...extra}
+    
+    Listas pequenas viram um corpo único (comprimido por compress_response). A partir
+    de STREAM_MIN_ITEMS, ou quando o cliente pede NDJSON (?format=ndjson ou Accept),
+    os itens são serializados e comprimidos em blocos durante o envio.
+    """
+    header = {'success': True, 'count': len(items), **extra}
+    ndjson = _wants_ndjson()
+    
+    if not ndjson and len(items) < STREAM_MIN_ITEMS:
+        response = Response(dumps({**header, 'data': items}) + b'\n', mimetype='application/json')
+        response.vary.add('Accept')  # O formato (JSON ou NDJSON) depende do Accept
+        return response
+    
+    encoding = negotiate_encoding()
+    chunks = _ndjson_chunks(items) if ndjson else _json_chunks(items, header)
+    response = Response(_stream(chunks, encoding), mimetype=NDJSON_MIMETYPE if ndjson else 'application/json')
+    response.headers['X-Total-Count'] = str(len(items))
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept')
+    _add_vary(response)
+    return response
@@ -1,25 +1,28 @@
 from flask import Blueprint, request, jsonify
 from src.services.jurisprudencia_service import JurisprudenciaService
+from src.services.jurisprudencia_query_service import JurisprudenciaQueryService
+from src.routes.http_cache import conditional_get, CACHE_LIST, CACHE_STABLE, CACHE_REVALIDATE
+from src.routes.json_output import list_response
 import logging
 
 jurisprudencia_bp = Blueprint('jurisprudencia', __name__)
 logger = logging.getLogger(__name__)
 
+def _is_true(value):
+    return str(value).lower() in ('1', 'true', 'sim', 'yes')
+
+def _data_version(*tables):
+    return lambda: JurisprudenciaQueryService().get_data_version(*tables)
+
 @jurisprudencia_bp.route('/collect', methods=['POST'])
 def collect_jurisprudence():
-    """Endpoint para coletar jurisprudência recente"""
+    """Endpoint para coletar jurisprudência recente (enfileira e retorna o id da execução)"""
     try:
         data = request.get_json() or {}
         days_back = data.get('days_back', 7)
         
-        service = JurisprudenciaService()
-        results = service.collect_all_recent_jurisprudence(days_back)
-        
-        return jsonify({
-            'success': True,
-            'message': f'Coleta finalizada. {results["total_collected"]} itens coletados.',
-            'results': results
-        }), 200
+        from src.routes.scheduler import enqueue_collection
+        return enqueue_collection(days_back, data.get('sources'))
         
     except Exception as e:
         logger.error(f"Erro na coleta de jurisprudência: {e}")
@@ -29,20 +32,18 @@ def collect_jurisprudence():
         }), 500
 
 @jurisprudencia_bp.route('/recent', methods=['GET'])
+@conditional_get(_data_version('jurisprudencia'), CACHE_LIST)
 def get_recent_jurisprudence():
     """Endpoint para buscar jurisprudência recente"""
     try:
         tribunal = request.args.get('tribunal')
         limit = int(request.args.get('limit', 50))
+        collapse = _is_true(request.args.get('collapse'))
         
-        service = JurisprudenciaService()
-        jurisprudencia = service.get_recent_jurisprudence(tribunal, limit)
+        service = JurisprudenciaQueryService()
+        jurisprudencia = service.get_recent_jurisprudence(tribunal, limit, collapse)
         
-        return jsonify({
-            'success': True,
-            'data': jurisprudencia,
-            'count': len(jurisprudencia)
-        }), 200
+        return list_response(jurisprudencia)
         
     except Exception as e:
         logger.error(f"Erro ao buscar jurisprudência: {e}")
@@ -52,12 +53,14 @@ def get_recent_jurisprudence():
         }), 500
 
 @jurisprudencia_bp.route('/search', methods=['GET'])
+@conditional_get(_data_version('jurisprudencia'), CACHE_LIST)
 def search_jurisprudence():
     """Endpoint para buscar jurisprudência por termo"""
     try:
         search_term = request.args.get('q', '')
         tribunal = request.args.get('tribunal')
         limit = int(request.args.get('limit', 50))
+        collapse = _is_true(request.args.get('collapse'))
         
         if not search_term:
             return jsonify({
@@ -65,15 +68,10 @@ def search_jurisprudence():
                 'message': 'Termo de busca é obrigatório'
             }), 400
         
-        service = JurisprudenciaService()
-        jurisprudencia = service.search_jurisprudence(search_term, tribunal, limit)
+        service = JurisprudenciaQueryService()
+        jurisprudencia = service.search_jurisprudence(search_term, tribunal, limit, collapse)
         
-        return jsonify({
-            'success': True,
-            'data': jurisprudencia,
-            'count': len(jurisprudencia),
-            'search_term': search_term
-        }), 200
+        return list_response(jurisprudencia, search_term=search_term)
         
     except Exception as e:
         logger.error(f"Erro na busca de jurisprudência: {e}")
@@ -83,6 +81,7 @@ def search_jurisprudence():
         }), 500
 
 @jurisprudencia_bp.route('/enunciados', methods=['GET'])
+@conditional_get(_data_version('enunciados'), CACHE_STABLE)
 def get_enunciados():
     """Endpoint para buscar enunciados"""
     try:
@@ -90,14 +89,10 @@ def get_enunciados():
         tipo = request.args.get('tipo')    # CIVEL, CRIMINAL, FAZENDA_PUBLICA
         limit = int(request.args.get('limit', 100))
         
-        service = JurisprudenciaService()
+        service = JurisprudenciaQueryService()
         enunciados = service.get_enunciados(orgao, tipo, limit)
         
-        return jsonify({
-            'success': True,
-            'data': enunciados,
-            'count': len(enunciados)
-        }), 200
+        return list_response(enunciados)
         
     except Exception as e:
         logger.error(f"Erro ao buscar enunciados: {e}")
@@ -107,24 +102,22 @@ def get_enunciados():
         }), 500
 
 @jurisprudencia_bp.route('/status', methods=['GET'])
+@conditional_get(_data_version('jurisprudencia', 'enunciados'), CACHE_REVALIDATE)
 def get_status():
     """Endpoint para verificar status do sistema"""
     try:
-        service = JurisprudenciaService()
-        
-        # Conta registros por tribunal
-        status = {}
-        for tribunal in ['STF', 'STJ', 'TST', 'TSE', 'STM', 'TJSP']:
-            jurisprudencia = service.get_recent_jurisprudence(tribunal, 1000)
-            status[tribunal] = len(jurisprudencia)
+        service = JurisprudenciaQueryService()
         
-        # Conta enunciados
-        enunciados_fonaje = service.get_enunciados('FONAJE', None, 1000)
-        enunciados_cnj = service.get_enunciados('CNJ', None, 1000)
+        # Conta registros por tribunal e enunciados por órgão
+        counts = service.count_by_source()
+        status = {
+            tribunal: counts['jurisprudencia'].get(tribunal, 0)
+            for tribunal in ['STF', 'STJ', 'TST', 'TSE', 'STM', 'TJSP']
+        }
         
         status['ENUNCIADOS'] = {
-            'FONAJE': len(enunciados_fonaje),
-            'CNJ': len(enunciados_cnj)
+            'FONAJE': counts['enunciados'].get('FONAJE', 0),
+            'CNJ': counts['enunciados'].get('CNJ', 0)
         }
         
         return jsonify({
@@ -139,3 +132,381 @@ def get_status():
             'message': f'Erro ao verificar status: {str(e)}'
         }), 500
 
+@jurisprudencia_bp.route('/related', methods=['POST'])
+def get_related():
+    """Endpoint para buscar precedentes e enunciados relacionados a um texto ou sentença"""
+    try:
+        data = request.get_json() or {}
+        text = data.get('text')
+        sentenca_id = data.get('sentenca_id')
+        try:
+            top_k = max(1, min(int(data.get('top_k', 10)), 50))
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'message': 'top_k deve ser um número inteiro'
+            }), 400
+        
+        if not text and sentenca_id is None:
+            return jsonify({
+                'success': False,
+                'message': 'Informe o texto ou o sentenca_id'
+            }), 400
+        
+        service = JurisprudenciaQueryService()
+        related = service.find_related(text, sentenca_id, top_k)
+        
+        return jsonify({
+            'success': True,
+            'data': related,
+            'count': {name: len(items) for name, items in related.items()}
+        }), 200
+    
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    
+    except Exception as e:
+        logger.error(f"Erro ao buscar precedentes relacionados: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro na busca: {str(e)}'
+        }), 500
+
+@jurisprudencia_bp.route('/related/rebuild', methods=['POST'])
+def rebuild_related_index():
+    """Endpoint para reconstruir o índice de precedentes e enunciados"""
+    try:
+        service = JurisprudenciaService()
+        totals = service.rebuild_related_index()
+        
+        return jsonify({
+            'success': True,
+            'message': 'Índice reconstruído',
+            'totals': totals
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erro ao reconstruir índice de precedentes: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao reconstruir índice: {str(e)}'
+        }), 500
+
+@jurisprudencia_bp.route('/<int:jurisprudencia_id>/duplicates', methods=['GET'])
+def get_duplicates(jurisprudencia_id):
+    """Endpoint para listar as quase-duplicatas de uma decisão"""
+    try:
+        service = JurisprudenciaQueryService()
+        duplicates = service.get_duplicates(jurisprudencia_id)
+        
+        if duplicates is None:
+            return jsonify({
+                'success': False,
+                'message': 'Decisão não encontrada'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': duplicates,
+            'count': len(duplicates)
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erro ao buscar duplicatas: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro na busca: {str(e)}'
+        }), 500
+
+@jurisprudencia_bp.route('/duplicates/rebuild', methods=['POST'])
+def rebuild_duplicates():
+    """Endpoint para recalcular os clusters de quase-duplicatas"""
+    try:
+        service = JurisprudenciaService()
+        totals = service.rebuild_near_duplicates()
+        
+        return jsonify({
+            'success': True,
+            'message': f'{totals["duplicates"]} duplicatas em {totals["total"]} decisões',
+            'totals': totals
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erro ao recalcular duplicatas: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao recalcular duplicatas: {str(e)}'
+        }), 500
+
+@jurisprudencia_bp.route('/citations', methods=['GET'])
+def get_citing_decisions():
+    """Endpoint para buscar decisões que citam uma lei ou artigo"""
+    try:
+        query = request.args.get('q')
+        keys = request.args.getlist('key')
+        limit = int(request.args.get('limit', 50))
+        
+        if not query and not keys:
+            return jsonify({
+                'success': False,
+                'message': 'Informe a consulta (q) ou a chave canônica (key)'
+            }), 400
+        
+        service = JurisprudenciaQueryService()
+        result = service.find_citing_decisions(query, keys, limit)
+        
+        return jsonify({
+            'success': True,
+            'keys': result['keys'],
+            'data': result['data'],
+            'count': len(result['data'])
+        }), 200
+    
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    
+    except Exception as e:
+        logger.error(f"Erro na busca por citações: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro na busca: {str(e)}'
+        }), 500
+
+@jurisprudencia_bp.route('/citations/top', methods=['GET'])
+def get_most_cited():
+    """Endpoint para listar as leis/artigos mais citados no período"""
+    try:
+        days = int(request.args.get('days', 7))
+        tipo = request.args.get('tipo', 'artigo')  # artigo ou lei
+        limit = int(request.args.get('limit', 20))
+        
+        if tipo not in ('artigo', 'lei'):
+            return jsonify({
+                'success': False,
+                'message': 'Tipo deve ser artigo ou lei'
+            }), 400
+        
+        service = JurisprudenciaQueryService()
+        most_cited = service.get_most_cited(days, tipo, limit)
+        
+        return jsonify({
+            'success': True,
+            'data': most_cited,
+            'count': len(most_cited),
+            'days': days
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erro ao buscar mais citados: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro na busca: {str(e)}'
+        }), 500
+
+@jurisprudencia_bp.route('/citations/rebuild', methods=['POST'])
+def rebuild_citations():
+    """Endpoint para reextrair as citações de todas as decisões"""
+    try:
+        service = JurisprudenciaService()
+        totals = service.rebuild_citations()
+        
+        return jsonify({
+            'success': True,
+            'message': f'{totals["citations"]} citações em {totals["decisions"]} decisões',
+            'totals': totals
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erro ao reconstruir citações: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao reconstruir citações: {str(e)}'
+        }), 500
+
+
+@jurisprudencia_bp.route('/collection-runs', methods=['GET'])
+def get_collection_runs():
+    """Endpoint para listar as execuções de coleta mais recentes"""
+    try:
+        tribunal = request.args.get('tribunal')
+        limit = int(request.args.get('limit', 50))
+        
+        service = JurisprudenciaQueryService()
+        runs = service.get_collection_runs(tribunal, limit)
+        
+        return jsonify({
+            'success': True,
+            'data': runs,
+            'count': len(runs)
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erro ao buscar execuções de coleta: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro na busca: {str(e)}'
+        }), 500
+
+@jurisprudencia_bp.route('/collection-runs/stats', methods=['GET'])
+def get_collection_stats():
+    """Endpoint para percentis e tendências das métricas de coleta por tribunal"""
+    try:
+        days = int(request.args.get('days', 30))
+        tribunal = request.args.get('tribunal')
+        
+        service = JurisprudenciaQueryService()
+        stats = service.get_collection_stats(days, tribunal)
+        
+        return jsonify({
+            'success': True,
+            'stats': stats
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erro ao calcular métricas de coleta: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao calcular métricas: {str(e)}'
+        }), 500
+
+@jurisprudencia_bp.route('/watermarks', methods=['GET'])
+def get_watermarks():
+    """Endpoint para consultar a marca d'água de coleta de cada tribunal"""
+    try:
+        service = JurisprudenciaQueryService()
+        watermarks = service.get_watermarks()
+        
+        return jsonify({
+            'success': True,
+            'data': watermarks,
+            'count': len(watermarks)
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erro ao buscar marcas d'água: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro na busca: {str(e)}'
+        }), 500
+
+@jurisprudencia_bp.route('/ingestion', methods=['GET'])
+def get_ingestion_status():
+    """Endpoint para consultar o log de ingestão: segmentos, posição aplicada e pendências por fonte"""
+    try:
+        service = JurisprudenciaQueryService()
+        status = service.get_ingestion_status()
+        
+        return jsonify({
+            'success': True,
+            'data': status,
+            'count': len(status)
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erro ao consultar o log de ingestão: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro interno: {str(e)}'
+        }), 500
+
+@jurisprudencia_bp.route('/ingestion/apply', methods=['POST'])
+def apply_ingestion_log():
+    """Endpoint para aplicar ao banco os registros pendentes do log de ingestão"""
+    try:
+        data = request.get_json(silent=True) or {}
+        service = JurisprudenciaService()
+        if service.ingestion_log is None:
+            return jsonify({'success': False, 'message': 'Log de ingestão não configurado'}), 400
+        
+        source = data.get('source')
+        results = [service.apply_ingestion_log(source)] if source else service.apply_all_ingestion_logs()
+        
+        return jsonify({
+            'success': all(result['complete'] for result in results),
+            'data': results
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erro ao aplicar o log de ingestão: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro interno: {str(e)}'
+        }), 500
+
+@jurisprudencia_bp.route('/ingestion/replay', methods=['POST'])
+def replay_ingestion_log():
+    """Endpoint para reaplicar o log de ingestão de uma fonte sem refazer a coleta"""
+    try:
+        data = request.get_json(silent=True) or {}
+        source = data.get('source')
+        if not source:
+            return jsonify({'success': False, 'message': 'Parâmetro source é obrigatório'}), 400
+        
+        service = JurisprudenciaService()
+        if service.ingestion_log is None:
+            return jsonify({'success': False, 'message': 'Log de ingestão não configurado'}), 400
+        if source not in service.ingestion_log.sources():
+            return jsonify({'success': False, 'message': f'Fonte sem registros no log: {source}'}), 404
+        
+        result = service.replay_ingestion_log(source, data.get('from_segment'))
+        
+        return jsonify({
+            'success': result['complete'],
+            'data': result
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erro ao reaplicar o log de ingestão: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro interno: {str(e)}'
+        }), 500
+
+@jurisprudencia_bp.route('/cache', methods=['GET'])
+def get_cache_stats():
+    """Endpoint para consultar acertos, falhas e geração do cache de consultas"""
+    try:
+        service = JurisprudenciaQueryService()
+        stats = service.get_cache_stats()
+        if stats is None:
+            return jsonify({'success': False, 'message': 'Cache de consultas não configurado'}), 400
+        
+        return jsonify({
+            'success': True,
+            'data': stats
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erro ao consultar o cache: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro interno: {str(e)}'
+        }), 500
+
+@jurisprudencia_bp.route('/cache/clear', methods=['POST'])
+def clear_cache():
+    """Endpoint para invalidar os resultados em cache das consultas"""
+    try:
+        service = JurisprudenciaQueryService()
+        if service.query_cache is None:
+            return jsonify({'success': False, 'message': 'Cache de consultas não configurado'}), 400
+        
+        generation = service.query_cache.invalidate()
+        
+        return jsonify({
+            'success': True,
+            'data': {'generation': generation}
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erro ao limpar o cache: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro interno: {str(e)}'
+        }), 500
@@ -1,4 +1,5 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app
+import json
 import logging
 
 scheduler_bp = Blueprint('scheduler', __name__)
@@ -50,7 +51,11 @@ def run_job_now(job_id):
         scheduler_service = current_app.scheduler_service
         result = scheduler_service.run_job_now(job_id)
         
-        return jsonify(result), 200 if result.get('success') else 400
+        if result.get('success'):
+            result['events_url'] = f'/api/scheduler/runs/{result["run_id"]}/events'
+            return jsonify(result), 202
+        
+        return jsonify(result), 409 if result.get('conflict') else 400
         
     except Exception as e:
         logger.error(f"Erro ao executar job {job_id}: {e}")
@@ -63,14 +68,15 @@ def run_job_now(job_id):
 def remove_job(job_id):
     """Endpoint para remover um job agendado"""
     try:
-        # Protege job principal
-        if job_id == 'daily_jurisprudence':
+        scheduler_service = current_app.scheduler_service
+        
+        # Protege os jobs de coleta das fontes
+        if scheduler_service.source_for_job(job_id):
             return jsonify({
                 'success': False,
-                'message': 'Não é possível remover o job principal de coleta diária'
+                'message': 'Não é possível remover um job de coleta de fonte; altere o agendamento em /schedule-config'
             }), 400
         
-        scheduler_service = current_app.scheduler_service
         result = scheduler_service.remove_job(job_id)
         
         return jsonify(result), 200 if result.get('success') else 400
@@ -89,19 +95,8 @@ def collect_jurisprudence_now():
         data = request.get_json() or {}
         days_back = data.get('days_back', 1)
         
-        scheduler_service = current_app.scheduler_service
-        
-        # Executa coleta com contexto da aplicação
-        with current_app.app_context():
-            from src.services.jurisprudencia_service import JurisprudenciaService
-            service = JurisprudenciaService()
-            results = service.collect_all_recent_jurisprudence(days_back)
-        
-        return jsonify({
-            'success': True,
-            'message': f'Coleta executada: {results["total_collected"]} itens coletados',
-            'results': results
-        }), 200
+        # Enfileira a coleta no pool do scheduler e responde imediatamente
+        return enqueue_collection(days_back, data.get('sources'))
         
     except Exception as e:
         logger.error(f"Erro na coleta manual: {e}")
@@ -114,12 +109,31 @@ def collect_jurisprudence_now():
 def get_schedule_config():
     """Endpoint para obter configuração do agendamento"""
     try:
+        # Horários lidos do job store compartilhado (persistidos entre reinícios)
+        scheduler_service = current_app.scheduler_service
+        schedule = scheduler_service.get_daily_schedule()
+        hour, minute = schedule if schedule else (9, 0)
+        
+        from src.services.jurisprudencia_service import JurisprudenciaService
+        states = scheduler_service.get_source_states()
+        source_schedules = {}
+        for source in JurisprudenciaService.SCRAPER_CLASSES:
+            source_schedule = scheduler_service.get_source_schedule(source)
+            state = states.get(source, {})
+            if source_schedule and state.get('modo') == 'adaptive':
+                source_schedule['mode'] = 'adaptive'
+                source_schedule['min_minutes'] = state['intervalo_min']
+                source_schedule['max_minutes'] = state['intervalo_max']
+            source_schedules[source] = source_schedule
+        
         return jsonify({
             'success': True,
             'config': {
-                'daily_collection_time': '09:00',
+                'daily_collection_time': f'{hour:02d}:{minute:02d}',
                 'timezone': 'America/Sao_Paulo',
-                'description': 'Coleta diária de jurisprudência às 9h (horário de Brasília)',
+                'description': f'Coleta diária de jurisprudência às {hour:02d}:{minute:02d} (horário de Brasília)',
+                'source_schedules': source_schedules,
+                'max_concurrent_crawls': scheduler_service.MAX_CONCURRENT_CRAWLS,
                 'sources': [
                     'STF - Supremo Tribunal Federal',
                     'STJ - Superior Tribunal de Justiça', 
@@ -152,6 +166,56 @@ def update_schedule_config():
                 'message': 'Dados de configuração são obrigatórios'
             }), 400
         
+        scheduler_service = current_app.scheduler_service
+        source = data.get('source')
+        
+        if source is not None:
+            source = source.upper()
+            from src.services.jurisprudencia_service import JurisprudenciaService
+            if source not in JurisprudenciaService.SCRAPER_CLASSES:
+                return jsonify({
+                    'success': False,
+                    'message': f'Fonte inválida. Opções: {", ".join(JurisprudenciaService.SCRAPER_CLASSES)}'
+                }), 400
+        
+        # Modo adaptativo: o intervalo acompanha o rendimento de cada fonte
+        if data.get('mode') == 'adaptive':
+            from src.services.jurisprudencia_service import JurisprudenciaService
+            sources = [source] if source else list(JurisprudenciaService.SCRAPER_CLASSES)
+            try:
+                bounds = {
+                    s: scheduler_service.enable_adaptive_schedule(s, data.get('min_minutes'), data.get('max_minutes'))
+                    for s in sources
+                }
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'message': str(e)
+                }), 400
+            
+            return jsonify({
+                'success': True,
+                'message': f'Modo adaptativo ativado para {", ".join(sources)}',
+                'bounds': bounds
+            }), 200
+        
+        if source is not None:
+            # Fonte com intervalo fixo em vez de horário
+            interval_minutes = data.get('interval_minutes')
+            if interval_minutes is not None:
+                if not isinstance(interval_minutes, int) or interval_minutes < 1:
+                    return jsonify({
+                        'success': False,
+                        'message': 'interval_minutes deve ser um inteiro positivo'
+                    }), 400
+                
+                scheduler_service.update_source_schedule(source, {'type': 'interval', 'minutes': interval_minutes})
+                return jsonify({
+                    'success': True,
+                    'message': f'Coleta do {source} agendada a cada {interval_minutes} minutos',
+                    'new_schedule': scheduler_service.get_source_schedule(source)
+                }), 200
+        
         # Valida horário
         hour = data.get('hour')
         minute = data.get('minute', 0)
@@ -168,25 +232,20 @@ def update_schedule_config():
                 'message': 'Minuto deve estar entre 0 e 59'
             }), 400
         
-        scheduler_service = current_app.scheduler_service
-        
-        # Remove job atual
-        scheduler_service.remove_job('daily_jurisprudence')
-        
-        # Adiciona novo job com horário atualizado
-        from apscheduler.triggers.cron import CronTrigger
-        import pytz
+        if source is not None:
+            config = {'type': 'cron', 'hour': hour, 'minute': minute}
+            if data.get('day_of_week'):
+                config['day_of_week'] = data['day_of_week']
+            scheduler_service.update_source_schedule(source, config)
+            
+            return jsonify({
+                'success': True,
+                'message': f'Agendamento do {source} atualizado para {hour:02d}:{minute:02d}',
+                'new_schedule': scheduler_service.get_source_schedule(source)
+            }), 200
         
-        timezone = pytz.timezone('America/Sao_Paulo')
-        scheduler_service.scheduler.add_job(
-            func=scheduler_service.collect_daily_jurisprudence,
-            trigger=CronTrigger(hour=hour, minute=minute, timezone=timezone),
-            id='daily_jurisprudence',
-            name='Coleta Diária de Jurisprudência',
-            replace_existing=True,
-            max_instances=1,
-            misfire_grace_time=3600
-        )
+        # Atualiza os jobs no job store compartilhado (vale para todos os workers)
+        scheduler_service.update_daily_schedule(hour, minute)
         
         return jsonify({
             'success': True,
@@ -201,3 +260,245 @@ def update_schedule_config():
             'message': f'Erro interno: {str(e)}'
         }), 500
 
+def enqueue_collection(days_back, sources=None):
+    """Enfileira uma coleta e retorna a resposta 202 com o id da execução (usado também por /api/jurisprudencia/collect)"""
+    scheduler_service = current_app.scheduler_service
+    
+    if sources:
+        from src.services.jurisprudencia_service import JurisprudenciaService
+        sources = [source.upper() for source in sources]
+        invalid = [source for source in sources if source not in JurisprudenciaService.SCRAPER_CLASSES]
+        if invalid:
+            return jsonify({
+                'success': False,
+                'message': f'Fontes inválidas: {", ".join(invalid)}'
+            }), 400
+    
+    progress, busy = scheduler_service.start_collection(sources, days_back)
+    if not progress:
+        return jsonify({
+            'success': False,
+            'message': 'Já existe uma coleta em andamento para todas as fontes solicitadas',
+            'busy': busy
+        }), 409
+    
+    return jsonify({
+        'success': True,
+        'message': f'Coleta enfileirada: {", ".join(progress.sources)}',
+        'run_id': progress.run_id,
+        'run': progress.to_dict(),
+        'busy': busy,
+        'status_url': f'/api/scheduler/runs/{progress.run_id}',
+        'events_url': f'/api/scheduler/runs/{progress.run_id}/events'
+    }), 202
+
+@scheduler_bp.route('/runs', methods=['GET'])
+def get_collection_runs():
+    """Endpoint para listar as coletas recentes deste processo"""
+    try:
+        limit = int(request.args.get('limit', 20))
+        runs = current_app.scheduler_service.runs.recent(limit)
+        
+        return jsonify({
+            'success': True,
+            'runs': runs,
+            'count': len(runs)
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erro ao listar coletas: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro interno: {str(e)}'
+        }), 500
+
+@scheduler_bp.route('/runs/<run_id>', methods=['GET'])
+def get_collection_run(run_id):
+    """Endpoint para consultar o progresso de uma coleta"""
+    progress = current_app.scheduler_service.runs.get(run_id)
+    if not progress:
+        return jsonify({
+            'success': False,
+            'message': 'Coleta não encontrada'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'run': progress.to_dict()
+    }), 200
+
+@scheduler_bp.route('/runs/<run_id>/events', methods=['GET'])
+def stream_collection_events(run_id):
+    """Stream SSE com o progresso por tribunal e os totais finais de uma coleta
+    
+    Os eventos ficam em memória no processo que recebeu a coleta; o cliente pode
+    reconectar com o cabeçalho Last-Event-ID para continuar de onde parou.
+    """
+    progress = current_app.scheduler_service.runs.get(run_id)
+    if not progress:
+        return jsonify({
+            'success': False,
+            'message': 'Coleta não encontrada'
+        }), 404
+    
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID', -1))
+    except ValueError:
+        last_event_id = -1
+    
+    def generate():
+        after = last_event_id
+        while True:
+            events = progress.wait_events(after, timeout=15)
+            if not events:
+                # Coleta encerrada e todos os eventos já enviados: fecha o stream
+                if progress.done:
+                    break
+                yield ': keepalive\n\n'
+                continue
+            
+            for event_id, event, data in events:
+                yield f'id: {event_id}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+                after = event_id
+            
+            if progress.done and after == len(progress.events) - 1:
+                break
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@scheduler_bp.route('/backfill', methods=['POST'])
+def create_backfill():
+    """Endpoint para criar e iniciar um backfill histórico dos tribunais"""
+    try:
+        data = request.get_json() or {}
+        
+        from datetime import date
+        try:
+            data_inicio = date.fromisoformat(data.get('data_inicio', ''))
+            data_fim = date.fromisoformat(data.get('data_fim') or date.today().isoformat())
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': 'data_inicio (e data_fim, opcional) devem estar no formato AAAA-MM-DD'
+            }), 400
+        
+        scheduler_service = current_app.scheduler_service
+        try:
+            backfill_id = scheduler_service.backfill_service.create(
+                data.get('tribunais'), data_inicio, data_fim, data.get('janela_dias')
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        scheduler_service.start_backfill(backfill_id, data.get('workers_por_tribunal'))
+        
+        return jsonify({
+            'success': True,
+            'message': f'Backfill {backfill_id} criado e enfileirado',
+            'backfill': scheduler_service.backfill_service.status(backfill_id)
+        }), 202
+    
+    except Exception as e:
+        logger.error(f"Erro ao criar backfill: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro interno: {str(e)}'
+        }), 500
+
+@scheduler_bp.route('/backfill', methods=['GET'])
+def list_backfills():
+    """Endpoint para listar os backfills com progresso, vazão e ETA"""
+    try:
+        backfills = current_app.scheduler_service.backfill_service.list_backfills()
+        
+        return jsonify({
+            'success': True,
+            'backfills': backfills,
+            'count': len(backfills)
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erro ao listar backfills: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro interno: {str(e)}'
+        }), 500
+
+@scheduler_bp.route('/backfill/<int:backfill_id>', methods=['GET'])
+def get_backfill(backfill_id):
+    """Endpoint para consultar progresso, vazão e ETA de um backfill"""
+    try:
+        status = current_app.scheduler_service.backfill_service.status(backfill_id)
+        if not status:
+            return jsonify({
+                'success': False,
+                'message': 'Backfill não encontrado'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'backfill': status
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erro ao consultar backfill {backfill_id}: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro interno: {str(e)}'
+        }), 500
+
+@scheduler_bp.route('/backfill/<int:backfill_id>/resume', methods=['POST'])
+def resume_backfill(backfill_id):
+    """Endpoint para retomar um backfill parado ou interrompido"""
+    try:
+        scheduler_service = current_app.scheduler_service
+        status = scheduler_service.backfill_service.status(backfill_id)
+        if not status:
+            return jsonify({
+                'success': False,
+                'message': 'Backfill não encontrado'
+            }), 404
+        
+        data = request.get_json(silent=True) or {}
+        scheduler_service.start_backfill(backfill_id, data.get('workers_por_tribunal'))
+        
+        return jsonify({
+            'success': True,
+            'message': f'Backfill {backfill_id} enfileirado para retomada'
+        }), 202
+    
+    except Exception as e:
+        logger.error(f"Erro ao retomar backfill {backfill_id}: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro interno: {str(e)}'
+        }), 500
+
+@scheduler_bp.route('/backfill/<int:backfill_id>/stop', methods=['POST'])
+def stop_backfill(backfill_id):
+    """Endpoint para parar um backfill (as janelas gravam o cursor e podem ser retomadas)"""
+    try:
+        stopped = current_app.scheduler_service.backfill_service.stop(backfill_id)
+        if not stopped:
+            return jsonify({
+                'success': False,
+                'message': 'Backfill não está em execução neste processo'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'message': f'Parada do backfill {backfill_id} solicitada'
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erro ao parar backfill {backfill_id}: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro interno: {str(e)}'
+        }), 500
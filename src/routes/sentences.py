@@ -2,6 +2,7 @@ import os
 from flask import Blueprint, request, jsonify, current_app
 from werkzeug.utils import secure_filename
 from src.services.sentence_service import SentenceService
+from src.routes.http_cache import conditional_get, CACHE_PRIVATE
 import logging
 
 sentences_bp = Blueprint('sentences', __name__)
@@ -186,6 +187,7 @@ def list_sentences():
         }), 500
 
 @sentences_bp.route('/style-profile', methods=['GET'])
+@conditional_get(lambda: SentenceService().get_style_profile_version(), CACHE_PRIVATE)
 def get_style_profile():
     """Endpoint para obter perfil de estilo do usuário"""
     try:
@@ -263,3 +265,64 @@ def clear_all_sentences():
             'message': f'Erro interno: {str(e)}'
         }), 500
 
+@sentences_bp.route('/similar-paragraphs', methods=['POST'])
+def find_similar_paragraphs():
+    """Endpoint para buscar parágrafos similares nas sentenças do usuário"""
+    try:
+        data = request.get_json() or {}
+        text = data.get('text', '')
+        try:
+            top_k = max(1, min(int(data.get('top_k', 5)), 50))
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'message': 'top_k deve ser um número inteiro'
+            }), 400
+        exclude_sentence_id = data.get('exclude_sentence_id')
+        
+        service = SentenceService()
+        result = service.find_similar_paragraphs(text, top_k, exclude_sentence_id)
+        
+        return jsonify(result), 200 if result.get('success') else 400
+    
+    except Exception as e:
+        logger.error(f"Erro na busca de parágrafos similares: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro interno: {str(e)}'
+        }), 500
+
+@sentences_bp.route('/paragraph-index/rebuild', methods=['POST'])
+def rebuild_paragraph_index():
+    """Endpoint para reconstruir o índice de parágrafos"""
+    try:
+        service = SentenceService()
+        result = service.rebuild_paragraph_index()
+        
+        return jsonify(result), 200 if result.get('success') else 400
+    
+    except Exception as e:
+        logger.error(f"Erro ao reconstruir índice de parágrafos: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro interno: {str(e)}'
+        }), 500
+
+@sentences_bp.route('/compare-draft', methods=['POST'])
+def compare_draft():
+    """Endpoint para comparar um rascunho com o perfil de estilo do usuário"""
+    try:
+        data = request.get_json() or {}
+        
+        service = SentenceService()
+        result = service.compare_draft_to_profile(data.get('text', ''))
+        
+        return jsonify(result), 200 if result.get('success') else 400
+    
+    except Exception as e:
+        logger.error(f"Erro ao comparar rascunho: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Erro interno: {str(e)}'
+        }), 500
+
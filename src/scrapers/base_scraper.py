@@ -1,21 +1,57 @@
 import requests
 import time
+import queue
 import random
+import threading
+from datetime import datetime, timedelta
 from abc import ABC, abstractmethod
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import logging
+from .http_pool import shared_adapters, HostRateLimiter
+from .resilience import RetryPolicy, circuit_breakers
+
+# lxml é bem mais rápido que o html.parser; sem ele instalado, as mesmas chamadas usam o parser nativo
+try:
+    import lxml
+    DEFAULT_HTML_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_HTML_PARSER = 'html.parser'
 
 class BaseScraper(ABC):
     """Classe base para todos os scrapers de jurisprudência"""
     
+    # Dias revisitados antes da marca d'água (decisões publicadas com atraso)
+    WATERMARK_OVERLAP_DAYS = 2
+    
+    HTML_PARSER = DEFAULT_HTML_PARSER
+    
+    # Limite de páginas de resultados seguidas por janela de busca
+    MAX_SEARCH_PAGES = 200
+    
+    # Resultados já listados aguardando a extração de detalhes (mantém a memória constante)
+    PIPELINE_BUFFER = 50
+    
+    # Novas tentativas para erros de rede e respostas 408/425/429/5xx
+    RETRY_POLICY = RetryPolicy(max_attempts=3, base_delay=2.0, max_delay=30.0)
+    
     def __init__(self, delay_range=(1, 3)):
-        self.session = requests.Session()
+        self.session = self._create_session()
         self.delay_range = delay_range
         self.logger = logging.getLogger(self.__class__.__name__)
+        self._metrics_lock = threading.Lock()
+        self.reset_metrics()
+        
+        # Busca e detalhes do pipeline usam sessões diferentes, mas o mesmo ritmo por host
+        self.rate_limiter = HostRateLimiter()
+        self._thread_sessions = threading.local()
+    
+    @staticmethod
+    def _create_session():
+        session = requests.Session()
         
         # Headers para simular um navegador real
-        self.session.headers.update({
+        session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
@@ -23,24 +59,80 @@ class BaseScraper(ABC):
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1'
         })
+        return session
+    
+    def _current_session(self):
+        """Sessão da thread atual: a própria da thread de busca do pipeline ou a principal do scraper"""
+        return getattr(self._thread_sessions, 'session', None) or self.session
+    
+    def reset_metrics(self):
+        """Zera os contadores de páginas, bytes, erros HTTP, novas tentativas e recusas do disjuntor da coleta atual"""
+        self.metrics = {'pages': 0, 'bytes': 0, 'errors': 0, 'retries': 0, 'short_circuited': 0}
+    
+    def _count(self, metric, amount=1):
+        with self._metrics_lock:
+            self.metrics[metric] += amount
     
     def get_page(self, url, params=None, timeout=30):
-        """Faz uma requisição HTTP com delay aleatório para evitar sobrecarga"""
-        try:
-            # Delay aleatório entre requisições
-            delay = random.uniform(*self.delay_range)
-            time.sleep(delay)
+        """Faz uma requisição HTTP com intervalo aleatório por host, novas tentativas com backoff e disjuntor por host
+        
+        Retorna None se a página não pôde ser obtida: erro não recuperável (ex.: 404),
+        tentativas esgotadas ou host com o disjuntor aberto (falha imediata, sem rede).
+        """
+        breaker = circuit_breakers.for_url(url)
+        
+        for attempt in range(1, self.RETRY_POLICY.max_attempts + 1):
+            if not breaker.allow_request():
+                self._count('errors')
+                self._count('short_circuited')
+                self.logger.warning(f"Disjuntor aberto para {url}: requisição não enviada")
+                return None
             
-            response = self.session.get(url, params=params, timeout=timeout)
-            response.raise_for_status()
-            return response
-        except requests.RequestException as e:
-            self.logger.error(f"Erro ao acessar {url}: {e}")
-            return None
+            response = None
+            try:
+                # Intervalo aleatório entre requisições ao host, somando todas as threads do scraper
+                self.rate_limiter.wait(url, random.uniform(*self.delay_range))
+                
+                # Conexões do host vêm do pool compartilhado pelo processo (keep-alive entre coletas)
+                session = self._current_session()
+                shared_adapters.mount(session, url)
+                response = session.get(url, params=params, timeout=timeout)
+                response.raise_for_status()
+                breaker.record_success()
+                with self._metrics_lock:
+                    self.metrics['pages'] += 1
+                    self.metrics['bytes'] += len(response.content)
+                return response
+            
+            except requests.RequestException as e:
+                status_code = response.status_code if response is not None else None
+                if status_code is not None and not self.RETRY_POLICY.is_retryable_status(status_code):
+                    # O servidor respondeu (ex.: 404): falha da página, não do host
+                    breaker.record_success()
+                    self._count('errors')
+                    self.logger.error(f"Erro ao acessar {url}: {e}")
+                    return None
+                
+                breaker.record_failure(str(status_code or type(e).__name__))
+                if attempt == self.RETRY_POLICY.max_attempts:
+                    self._count('errors')
+                    self.logger.error(f"Erro ao acessar {url} após {attempt} tentativas: {e}")
+                    return None
+                
+                wait = self.RETRY_POLICY.backoff(attempt, RetryPolicy.retry_after(response))
+                self._count('retries')
+                self.logger.warning(f"Falha temporária em {url} ({e}); nova tentativa em {wait:.1f}s")
+                time.sleep(wait)
+            
+            except BaseException:
+                # Erro que não é da rede (ex.: interrupção da thread): não conta para o disjuntor,
+                # mas libera a requisição de teste do estado half_open
+                breaker.release_probe()
+                raise
     
-    def parse_html(self, html_content):
-        """Converte HTML em objeto BeautifulSoup"""
-        return BeautifulSoup(html_content, 'html.parser')
+    def parse_html(self, html_content, parse_only=None):
+        """Converte HTML em objeto BeautifulSoup; `parse_only` (SoupStrainer) restringe a árvore aos elementos usados"""
+        return BeautifulSoup(html_content, self.HTML_PARSER, parse_only=parse_only)
     
     def clean_text(self, text):
         """Limpa e normaliza texto extraído"""
@@ -62,35 +154,127 @@ class BaseScraper(ABC):
         """Retorna o nome do tribunal (STF, STJ, etc.)"""
         pass
     
+    @classmethod
+    def watermark_field(cls):
+        """Campo de data da decisão que a busca por intervalo filtra (a marca d'água usa o mesmo)"""
+        return 'data_julgamento'
+    
+    def search_window(self, days_back=7, since=None):
+        """Retorna (início, fim) da busca: a partir da marca d'água com sobreposição, ou dos últimos N dias"""
+        end_date = datetime.now()
+        if since:
+            start_date = datetime.combine(since, datetime.min.time()) - timedelta(days=self.WATERMARK_OVERLAP_DAYS)
+            return min(start_date, end_date), end_date
+        return end_date - timedelta(days=days_back), end_date
+    
     @abstractmethod
-    def search_recent_decisions(self, days_back=7):
-        """Busca decisões recentes dos últimos N dias"""
+    def search_recent_decisions(self, days_back=7, since=None):
+        """Busca decisões recentes dos últimos N dias (ou desde a marca d'água `since`); retorna um iterável"""
         pass
     
+    def search_decisions(self, start_date, end_date, page=1):
+        """Busca uma página de resultados entre as datas (usado pelo backfill); None indica falha"""
+        self.logger.error(f"{self.get_tribunal_name()} não suporta busca por intervalo")
+        return None
+    
     @abstractmethod
     def extract_decision_details(self, decision_url):
         """Extrai detalhes completos de uma decisão específica"""
         pass
     
-    def get_recent_jurisprudence(self, days_back=7):
+    def iter_search_results(self, start_date, end_date, first_page=1):
+        """Percorre as páginas de resultados entre as datas, gerando as informações básicas de cada decisão
+        
+        Para na primeira página vazia, numa página que só repete resultados já vistos
+        (tribunal que ignora o parâmetro de página) ou em MAX_SEARCH_PAGES. Uma página
+        que não pôde ser obtida encerra a busca; o erro fica em metrics e impede o
+        avanço da marca d'água.
+        """
+        seen_urls = set()
+        for page in range(first_page, first_page + self.MAX_SEARCH_PAGES):
+            results = self.search_decisions(start_date, end_date, page)
+            if results is None:
+                self.logger.warning(f"Busca do {self.get_tribunal_name()} interrompida na página {page}")
+                return
+            
+            new_results = [r for r in results if r.get('url') not in seen_urls]
+            if not new_results:
+                return
+            
+            for result in new_results:
+                seen_urls.add(result.get('url'))
+                yield result
+        
+        self.logger.warning(f"Busca do {self.get_tribunal_name()} atingiu o limite de {self.MAX_SEARCH_PAGES} páginas")
+    
+    def iter_recent_jurisprudence(self, days_back=7, since=None, skip=None):
+        """Gera as decisões detalhadas da janela de busca à medida que são extraídas
+        
+        As páginas de resultados são baixadas numa thread própria (com sessão própria)
+        e passam por uma fila limitada, de modo que a extração de detalhes começa
+        enquanto as páginas seguintes ainda estão sendo baixadas; o intervalo entre
+        requisições ao host vale para as duas threads juntas. `skip(info)` permite pular a extração
+        de decisões já conhecidas; as puladas são geradas como {'skipped': True, ...}.
+        """
+        buffer = queue.Queue(maxsize=self.PIPELINE_BUFFER)
+        stop = threading.Event()
+        done = object()
+        
+        def produce():
+            # Sessão própria da busca (requests.Session não é thread-safe); as conexões continuam
+            # no adaptador compartilhado do host. Não é fechada: close() fecharia o adaptador
+            self._thread_sessions.session = self._create_session()
+            try:
+                for info in self.search_recent_decisions(days_back, since):
+                    while not stop.is_set():
+                        try:
+                            buffer.put(info, timeout=1)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        return
+            except Exception as e:
+                with self._metrics_lock:
+                    self.metrics['errors'] += 1
+                self.logger.error(f"Erro na busca de decisões do {self.get_tribunal_name()}: {e}")
+            finally:
+                buffer.put(done)
+        
+        producer = threading.Thread(target=produce, name=f'busca-{self.get_tribunal_name()}', daemon=True)
+        producer.start()
+        
+        try:
+            while True:
+                info = buffer.get()
+                if info is done:
+                    break
+                
+                if skip and skip(info):
+                    yield dict(info, skipped=True)
+                    continue
+                
+                details = self.extract_decision_details(info.get('url'))
+                if details:
+                    yield details
+        finally:
+            # Consumidor encerrado antes do fim: libera a thread de busca
+            stop.set()
+            while producer.is_alive():
+                try:
+                    buffer.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+    
+    def get_recent_jurisprudence(self, days_back=7, since=None):
         """Método principal para coletar jurisprudência recente"""
         self.logger.info(f"Iniciando coleta de jurisprudência do {self.get_tribunal_name()}")
         
         try:
-            # Busca decisões recentes
-            decisions = self.search_recent_decisions(days_back)
-            
-            # Extrai detalhes de cada decisão
-            detailed_decisions = []
-            for decision in decisions:
-                details = self.extract_decision_details(decision.get('url'))
-                if details:
-                    detailed_decisions.append(details)
-            
+            detailed_decisions = list(self.iter_recent_jurisprudence(days_back, since))
             self.logger.info(f"Coletadas {len(detailed_decisions)} decisões do {self.get_tribunal_name()}")
             return detailed_decisions
             
         except Exception as e:
             self.logger.error(f"Erro na coleta do {self.get_tribunal_name()}: {e}")
             return []
-
@@ -1,9 +1,16 @@
 from .base_scraper import BaseScraper
+from bs4 import SoupStrainer
 import re
 
 class EnunciadosScraper(BaseScraper):
     """Scraper para enunciados do FONAJE e CNJ"""
     
+    # Elementos que contêm os enunciados, em ordem de preferência de cada página: (tag, classe)
+    FONAJE_ELEMENTS = (('p', None), ('div', 'enunciado'))
+    CNJ_ELEMENTS = (('div', 'enunciado'), ('p', None))
+    
+    ENUNCIADO_PATTERN = re.compile(r'ENUNCIADO\s+(?:N[ºº]\s*)?\d+', re.IGNORECASE)
+    
     def __init__(self):
         super().__init__()
         self.fonaje_urls = {
@@ -37,74 +44,62 @@ class EnunciadosScraper(BaseScraper):
     
     def _scrape_fonaje_enunciados(self, url, tipo):
         """Coleta enunciados específicos do FONAJE"""
-        enunciados = []
-        
         try:
             response = self.get_page(url)
             if not response:
-                return enunciados
-            
-            soup = self.parse_html(response.text)
+                return []
             
-            # Busca por enunciados na página
             # A estrutura pode variar, mas geralmente são parágrafos ou divs
-            enunciado_elements = soup.find_all('p') or soup.find_all('div', class_='enunciado')
-            
-            for element in enunciado_elements:
-                text = self.clean_text(element.get_text())
-                
-                # Verifica se é um enunciado (geralmente começa com "ENUNCIADO" seguido de número)
-                if self._is_enunciado(text):
-                    enunciado_data = self._parse_enunciado_text(text, 'FONAJE', tipo, url)
-                    if enunciado_data:
-                        enunciados.append(enunciado_data)
+            return self.parse_enunciados(response.text, self.FONAJE_ELEMENTS, 'FONAJE', tipo, url)
             
         except Exception as e:
             self.logger.error(f"Erro ao coletar enunciados FONAJE {tipo}: {e}")
-        
-        return enunciados
+            return []
     
     def _scrape_cnj_enunciados(self):
         """Coleta enunciados do CNJ"""
-        enunciados = []
-        
         try:
             response = self.get_page(self.cnj_url)
             if not response:
-                return enunciados
+                return []
             
-            soup = self.parse_html(response.text)
-            
-            # Busca por enunciados na página do CNJ
-            enunciado_elements = soup.find_all('div', class_='enunciado') or soup.find_all('p')
-            
-            for element in enunciado_elements:
-                text = self.clean_text(element.get_text())
-                
-                if self._is_enunciado(text):
-                    enunciado_data = self._parse_enunciado_text(text, 'CNJ', 'GERAL', self.cnj_url)
-                    if enunciado_data:
-                        enunciados.append(enunciado_data)
+            return self.parse_enunciados(response.text, self.CNJ_ELEMENTS, 'CNJ', 'GERAL', self.cnj_url)
             
         except Exception as e:
             self.logger.error(f"Erro ao coletar enunciados CNJ: {e}")
-        
-        return enunciados
+            return []
     
-    def _is_enunciado(self, text):
-        """Verifica se o texto é um enunciado válido"""
-        # Padrões comuns para identificar enunciados
-        patterns = [
-            r'ENUNCIADO\s+\d+',
-            r'Enunciado\s+\d+',
-            r'ENUNCIADO\s+N[ºº]\s*\d+'
-        ]
+    def parse_enunciados(self, html_content, elements, orgao, tipo, url):
+        """Extrai os enunciados do primeiro tipo de elemento presente na página
         
-        for pattern in patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return True
+        Cada tentativa analisa só as tags daquele tipo (SoupStrainer); a segunda
+        análise só acontece quando a página não tem nenhum elemento do primeiro tipo.
+        """
+        for name, css_class in elements:
+            soup = self.parse_html(html_content, SoupStrainer(name, class_=css_class) if css_class else SoupStrainer(name))
+            try:
+                enunciado_elements = soup.find_all(name, class_=css_class) if css_class else soup.find_all(name)
+                if not enunciado_elements:
+                    continue
+                
+                enunciados = []
+                for element in enunciado_elements:
+                    text = element.get_text()
+                    
+                    # Verifica se é um enunciado (geralmente começa com "ENUNCIADO" seguido de número)
+                    if self._is_enunciado(text):
+                        enunciado_data = self._parse_enunciado_text(self.clean_text(text), orgao, tipo, url)
+                        if enunciado_data:
+                            enunciados.append(enunciado_data)
+                return enunciados
+            finally:
+                soup.decompose()
         
-        return False
+        return []
+    
+    def _is_enunciado(self, text):
+        """Verifica se o texto é um enunciado válido ("ENUNCIADO 12", "Enunciado nº 12")"""
+        return bool(self.ENUNCIADO_PATTERN.search(text))
     
     def _parse_enunciado_text(self, text, orgao, tipo, url):
         """Extrai informações estruturadas do texto do enunciado"""
@@ -0,0 +1,218 @@
+import os
+import re
+import json
+import functools
+from collections import defaultdict
+from datetime import datetime
+from urllib.parse import urljoin
+import soupsieve
+from bs4 import SoupStrainer, Tag
+
+SPECS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'specs')
+
+# Seletores simples ('div', 'span.ementa', 'a[href]') são comparados sem o soupsieve
+# e permitem montar um SoupStrainer equivalente
+SIMPLE_SELECTOR = re.compile(r'^([a-z][a-z0-9]*)(?:\.([\w-]+))?(?:\[([\w-]+)\])?$')
+
+class FieldRule:
+    """Regra de extração de um campo
+    
+    Configuração aceita (no JSON da especificação):
+        selector  seletor CSS ou lista de seletores em ordem de preferência (fallbacks)
+        attr      lê um atributo em vez do texto do elemento
+        regex     aplicado ao texto; sem seletor, ao texto bruto do elemento raiz
+        flags     'i' para regex sem diferenciar maiúsculas
+        type      'text' (padrão), 'date' ou 'url'
+        many      junta o texto de todos os elementos do primeiro seletor com resultado
+        join      separador usado com many (padrão ', ')
+    """
+    
+    def __init__(self, name, config, date_formats=('%d/%m/%Y',), base_url=''):
+        if isinstance(config, (str, list)):
+            config = {'selector': config}
+        selectors = config.get('selector') or []
+        
+        self.name = name
+        self.selectors = [selectors] if isinstance(selectors, str) else list(selectors)
+        self.matchers = [soupsieve.compile(selector) for selector in self.selectors]
+        self.attr = config.get('attr')
+        self.regex = re.compile(config['regex'], re.IGNORECASE if 'i' in config.get('flags', '') else 0) if config.get('regex') else None
+        self.type = config.get('type', 'text')
+        self.many = config.get('many', False)
+        self.join = config.get('join', ', ')
+        self.date_formats = tuple(config.get('formats', date_formats))
+        self.base_url = base_url
+        self.default = config.get('default', None if self.type == 'date' else '')
+    
+    def read(self, element):
+        """Texto normalizado (ou atributo) de um elemento"""
+        if self.attr:
+            return element.get(self.attr) or ''
+        return ' '.join(element.get_text().split())
+    
+    def convert(self, text):
+        """Aplica regex e tipo ao texto lido; retorna '' quando não há valor"""
+        if self.regex:
+            match = self.regex.search(text)
+            if not match:
+                return ''
+            text = (match.group(1) if self.regex.groups else match.group(0)) or ''
+        text = text.strip()
+        
+        if text and self.type == 'url' and not text.startswith('http'):
+            return urljoin(self.base_url, text)
+        if text and self.type == 'date':
+            for date_format in self.date_formats:
+                try:
+                    return datetime.strptime(text, date_format).strftime('%d/%m/%Y')
+                except ValueError:
+                    continue
+        return text
+    
+    def value(self, elements, root):
+        if not self.selectors:
+            values = [self.convert(root.get_text())]
+        else:
+            values = [self.convert(self.read(element)) for element in (elements if self.many else elements[:1])]
+        
+        values = [v for v in values if v]
+        if not values:
+            return self.default
+        return self.join.join(values) if self.many else values[0]
+
+class SpecExtractor:
+    """Extrai um conjunto de campos de uma árvore com uma única passagem pelos elementos
+    
+    Os seletores simples ficam indexados pelo nome da tag, de modo que cada elemento
+    custa uma consulta a dicionário; só seletores complexos passam pelo soupsieve.
+    O primeiro seletor da lista de um campo que encontrar algo vence, como nas
+    cadeias `find(...) or find(...)` dos scrapers manuais.
+    """
+    
+    def __init__(self, fields):
+        self.fields = fields
+        self._selector_fields = [rule for rule in fields.values() if rule.selectors]
+        self._can_stop_early = not any(rule.many for rule in self._selector_fields)
+        
+        # nome da tag -> [(regra, posição, classe, atributo)]; '*' para seletores complexos
+        self._by_name = defaultdict(list)
+        self._complex = []
+        for rule in self._selector_fields:
+            for position, selector in enumerate(rule.selectors):
+                match = SIMPLE_SELECTOR.match(selector)
+                if match:
+                    self._by_name[match.group(1)].append((rule, position, match.group(2), match.group(3)))
+                else:
+                    self._complex.append((rule, position, rule.matchers[position]))
+    
+    def matches(self, root):
+        """Retorna {campo: elementos do primeiro seletor que encontrou algo}"""
+        found = {rule.name: [[] for _ in rule.matchers] for rule in self._selector_fields}
+        pending = {rule.name for rule in self._selector_fields}
+        
+        for element in root.descendants:
+            if not isinstance(element, Tag):
+                continue
+            
+            candidates = self._by_name.get(element.name)
+            if candidates:
+                classes = element.get('class') or ()
+                matched = set()
+                for rule, position, css_class, attr in candidates:
+                    if rule.name not in pending or rule.name in matched:
+                        continue
+                    if css_class and css_class not in classes:
+                        continue
+                    if attr and not element.has_attr(attr):
+                        continue
+                    self._record(rule, position, element, found, pending)
+                    matched.add(rule.name)
+            
+            for rule, position, matcher in self._complex:
+                if rule.name in pending and matcher.match(element):
+                    self._record(rule, position, element, found, pending)
+            
+            if self._can_stop_early and not pending:
+                break
+        
+        return {name: next((l for l in lists if l), []) for name, lists in found.items()}
+    
+    @staticmethod
+    def _record(rule, position, element, found, pending):
+        lists = found[rule.name]
+        if rule.many or not lists[position]:
+            lists[position].append(element)
+        if position == 0 and not rule.many:
+            pending.discard(rule.name)  # Seletor preferido encontrado: nada melhor virá
+    
+    def extract(self, root):
+        """Retorna {campo: valor} na ordem da especificação"""
+        found = self.matches(root)
+        return {name: rule.value(found.get(name, []), root) for name, rule in self.fields.items()}
+
+def build_strainer(selectors):
+    """SoupStrainer que cobre os seletores, ou None se algum não for simples ('tag', 'tag.classe')"""
+    names, classes = set(), set()
+    for selector in selectors:
+        match = SIMPLE_SELECTOR.match(selector)
+        if not match:
+            return None
+        names.add(match.group(1))
+        classes.add(match.group(2))
+    
+    if None in classes:
+        return None if classes != {None} else SoupStrainer(sorted(names))
+    return SoupStrainer(sorted(names), class_=sorted(classes))
+
+class ExtractionSpec:
+    """Especificação declarativa de um tribunal, compilada uma única vez por processo"""
+    
+    def __init__(self, name, config):
+        self.name = name
+        self.tribunal = config['tribunal']
+        self.description = config.get('nome', self.tribunal)
+        # Especificações ainda não validadas contra o site do tribunal ficam fora da coleta
+        self.enabled = config.get('enabled', True)
+        self.base_url = config['base_url']
+        date_formats = tuple(config.get('date_formats', ('%d/%m/%Y',)))
+        
+        search = config['search']
+        self.search_url = urljoin(self.base_url, search['path'])
+        self.search_params = dict(search.get('params', {}))
+        self.start_param = search['start_param']
+        self.end_param = search['end_param']
+        self.page_param = search['page_param']
+        self.param_date_format = search.get('date_format', '%d/%m/%Y')
+        # Campo da decisão filtrado pelo intervalo de datas da busca (base da marca d'água)
+        self.date_field = search.get('date_field', 'data_julgamento')
+        
+        self.results = SpecExtractor({'results': FieldRule('results', {'selector': search['results'], 'many': True})})
+        self.result_fields = self._compile_fields(search['fields'], date_formats)
+        self.detail_fields = self._compile_fields(config['detail']['fields'], date_formats)
+        
+        self.results_strainer = build_strainer(search['results'])
+        self.detail_strainer = build_strainer([
+            selector for rule in self.detail_fields.fields.values() for selector in rule.selectors
+        ])
+    
+    def _compile_fields(self, fields, date_formats):
+        return SpecExtractor({
+            name: FieldRule(name, config, date_formats, self.base_url) for name, config in fields.items()
+        })
+    
+    def search_params_for(self, start_date, end_date, page):
+        params = dict(self.search_params)
+        params[self.start_param] = start_date.strftime(self.param_date_format)
+        params[self.end_param] = end_date.strftime(self.param_date_format)
+        params[self.page_param] = page
+        return params
+
+def available_specs():
+    """Nomes das especificações em specs/ (nome do arquivo sem .json)"""
+    return sorted(name[:-5] for name in os.listdir(SPECS_DIR) if name.endswith('.json'))
+
+@functools.lru_cache(maxsize=None)
+def load_spec(name):
+    """Carrega e compila specs/<name>.json (uma vez por processo)"""
+    with open(os.path.join(SPECS_DIR, f'{name}.json'), encoding='utf-8') as f:
+        return ExtractionSpec(name, json.load(f))
@@ -0,0 +1,95 @@
+import time
+import socket
+import threading
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter com TCP keep-alive nas conexões guardadas no pool"""
+    
+    SOCKET_OPTIONS = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = self.SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+class HostAdapterPool:
+    """Adaptadores HTTP (pools de conexões) compartilhados por host em todo o processo
+    
+    Cada scraper mantém a própria requests.Session (headers e cookies), mas as
+    conexões TCP/TLS de um host ficam num único pool, reaproveitado entre coletas,
+    backfill e scrapers diferentes que acessam o mesmo host.
+    """
+    
+    # Conexões mantidas por host: busca e detalhes em paralelo (pipeline) mais os workers de backfill
+    POOL_MAXSIZE = 8
+    
+    def __init__(self, pool_maxsize=POOL_MAXSIZE):
+        self.pool_maxsize = pool_maxsize
+        self._adapters = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def prefix_for(url):
+        parsed = urlparse(url)
+        return f'{parsed.scheme}://{parsed.netloc}/'
+    
+    def adapter_for(self, url):
+        """Retorna (criando na primeira vez) o adaptador do host da URL"""
+        prefix = self.prefix_for(url)
+        with self._lock:
+            adapter = self._adapters.get(prefix)
+            if adapter is None:
+                adapter = KeepAliveAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+                self._adapters[prefix] = adapter
+            return adapter
+    
+    def override(self, url, adapter):
+        """Usa `adapter` para o host da URL (ex.: servidor local dos benchmarks); vale para sessões que ainda não acessaram o host"""
+        with self._lock:
+            self._adapters[self.prefix_for(url)] = adapter
+    
+    def mount(self, session, url):
+        """Monta na sessão o adaptador compartilhado do host da URL"""
+        prefix = self.prefix_for(url)
+        if session.adapters.get(prefix) is None:
+            session.mount(prefix, self.adapter_for(url))
+    
+    def stats(self):
+        """Conexões abertas e ociosas por host"""
+        stats = {}
+        with self._lock:
+            adapters = dict(self._adapters)
+        for prefix, adapter in adapters.items():
+            pools = list(adapter.poolmanager.pools._container.values())
+            stats[prefix] = {
+                'pools': len(pools),
+                'connections_opened': sum(pool.num_connections for pool in pools),
+                'requests': sum(pool.num_requests for pool in pools),
+                'idle_connections': sum(pool.pool.qsize() for pool in pools if pool.pool)
+            }
+        return stats
+
+class HostRateLimiter:
+    """Intervalo entre requisições a um mesmo host, compartilhado pelas threads de um scraper
+    
+    Cada requisição reserva o próximo horário livre do host (`delay` segundos após a
+    reserva anterior) e aguarda até ele; assim a busca e a extração de detalhes do
+    pipeline, juntas, respeitam o mesmo ritmo de um scraper sequencial.
+    """
+    
+    def __init__(self):
+        self._next_slot = {}
+        self._lock = threading.Lock()
+    
+    def wait(self, url, delay):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now)) + delay
+            self._next_slot[host] = slot
+        time.sleep(max(0.0, slot - now))
+
+# Pool único do processo, usado por todos os scrapers
+shared_adapters = HostAdapterPool()
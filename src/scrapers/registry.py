@@ -0,0 +1,65 @@
+import threading
+from contextlib import contextmanager
+from collections.abc import Mapping
+
+class ScraperRegistry(Mapping):
+    """Registro de scrapers do processo, criados sob demanda
+    
+    Funciona como o antigo dicionário {fonte: scraper}: iterar ou listar as fontes
+    não cria nenhum scraper, e cada um é instanciado (com sua sessão HTTP) só no
+    primeiro acesso, ficando vivo entre as coletas para reaproveitar conexões.
+    """
+    
+    def __init__(self, scraper_classes):
+        self.scraper_classes = dict(scraper_classes)
+        self._instances = {}
+        self._in_use = set()
+        self._lock = threading.Lock()
+    
+    def __getitem__(self, name):
+        scraper = self._instances.get(name)
+        if scraper is None:
+            scraper_class = self.scraper_classes[name]
+            with self._lock:
+                scraper = self._instances.get(name)
+                if scraper is None:
+                    scraper = self._instances[name] = scraper_class()
+        return scraper
+    
+    def __iter__(self):
+        return iter(self.scraper_classes)
+    
+    def __len__(self):
+        return len(self.scraper_classes)
+    
+    def __contains__(self, name):
+        return name in self.scraper_classes
+    
+    def create(self, name):
+        """Nova instância independente (métricas e sessão próprias), para uso em paralelo à coleta"""
+        return self.scraper_classes[name]()
+    
+    @contextmanager
+    def checkout(self, name):
+        """Empresta o scraper da fonte durante uma coleta
+        
+        As métricas do scraper são por coleta; se a instância do registro já estiver
+        em uso (ex.: coleta manual durante a agendada), uma instância temporária é
+        usada. Como os pools HTTP são compartilhados por host, ela também reaproveita
+        as conexões abertas.
+        """
+        scraper = self[name]
+        with self._lock:
+            shared = name not in self._in_use
+            if shared:
+                self._in_use.add(name)
+        try:
+            yield scraper if shared else self.create(name)
+        finally:
+            if shared:
+                with self._lock:
+                    self._in_use.discard(name)
+    
+    def loaded(self):
+        """Fontes cujo scraper já foi instanciado"""
+        return list(self._instances)
@@ -0,0 +1,150 @@
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+class RetryPolicy:
+    """Novas tentativas limitadas com backoff exponencial e jitter ("full jitter")"""
+    
+    # Respostas que indicam sobrecarga ou falha temporária do servidor
+    RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+    
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=30.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+    
+    def is_retryable_status(self, status_code):
+        return status_code in self.RETRYABLE_STATUS
+    
+    def backoff(self, attempt, retry_after=None):
+        """Espera antes da tentativa seguinte à `attempt` (1 = primeira falha)"""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+    
+    @staticmethod
+    def retry_after(response):
+        """Segundos pedidos no cabeçalho Retry-After (número ou data HTTP), ou None"""
+        value = response.headers.get('Retry-After') if response is not None else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+class CircuitBreaker:
+    """Disjuntor de um host: abre após falhas seguidas e volta a testar depois de um intervalo
+    
+    Estados: 'closed' (normal), 'open' (requisições falham na hora, sem rede) e
+    'half_open' (uma única requisição de teste; sucesso fecha, falha reabre com
+    o intervalo dobrado, até `max_reset_timeout`). Uma requisição de teste sem
+    resultado após `probe_timeout` (thread interrompida) libera um novo teste.
+    """
+    
+    def __init__(self, failure_threshold=5, reset_timeout=60.0, max_reset_timeout=900.0, probe_timeout=120.0):
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.last_failure = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+        self._probe_started_at = None
+        self._lock = threading.Lock()
+    
+    def allow_request(self):
+        """True se a requisição pode ir à rede (no estado half_open, só a de teste)"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'half_open' and (
+                not self._probe_in_flight or time.monotonic() - self._probe_started_at >= self.probe_timeout
+            ):
+                self._probe_in_flight = True
+                self._probe_started_at = time.monotonic()
+                return True
+            self.rejected += 1
+            return False
+    
+    def release_probe(self):
+        """Libera a requisição de teste que terminou sem resultado (erro fora da rede); o próximo pedido testa de novo"""
+        with self._lock:
+            self._probe_in_flight = False
+    
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.consecutive_failures = 0
+            self.reset_timeout = self.base_reset_timeout
+            self._probe_in_flight = False
+    
+    def record_failure(self, reason=None):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_failure = reason
+            if self.state == 'half_open':
+                # O teste falhou: espera mais antes do próximo
+                self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+                self._open()
+            elif self.state == 'closed' and self.consecutive_failures >= self.failure_threshold:
+                self._open()
+    
+    def _open(self):
+        self.state = 'open'
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+        self._probe_in_flight = False
+    
+    def to_dict(self):
+        with self._lock:
+            retry_in = None
+            if self.state == 'open':
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'times_opened': self.times_opened,
+                'rejected_requests': self.rejected,
+                'reset_timeout': self.reset_timeout,
+                'retry_in': retry_in,
+                'last_failure': self.last_failure
+            }
+
+class CircuitBreakerRegistry:
+    """Um disjuntor por host, compartilhado por todos os scrapers do processo"""
+    
+    def __init__(self, **breaker_options):
+        self.breaker_options = breaker_options
+        self._breakers = {}
+        self._lock = threading.Lock()
+    
+    def for_url(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(**self.breaker_options)
+            return breaker
+    
+    def states(self):
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {host: breaker.to_dict() for host, breaker in sorted(breakers.items())}
+
+# Disjuntores do processo (coleta agendada, manual e backfill enxergam o mesmo estado do host)
+circuit_breakers = CircuitBreakerRegistry()
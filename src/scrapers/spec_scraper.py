@@ -0,0 +1,113 @@
+from .base_scraper import BaseScraper
+from .extraction_spec import load_spec, available_specs
+
+class SpecScraper(BaseScraper):
+    """Scraper de tribunal dirigido por uma especificação declarativa (specs/<SPEC>.json)
+    
+    A especificação define a URL e os parâmetros da busca, os contêineres de
+    resultado, os seletores/regex de cada campo e os formatos de data; ela é
+    compilada uma vez por processo e compartilhada por todas as instâncias.
+    """
+    
+    SPEC = None
+    
+    def __init__(self):
+        super().__init__()
+        self.spec = load_spec(self.SPEC)
+        self.base_url = self.spec.base_url
+        self.search_url = self.spec.search_url
+        
+        # Só os contêineres usados na extração entram na árvore do BeautifulSoup
+        self.RESULTS_STRAINER = self.spec.results_strainer
+        self.DETAIL_STRAINER = self.spec.detail_strainer
+    
+    def get_tribunal_name(self):
+        return self.spec.tribunal
+    
+    @classmethod
+    def watermark_field(cls):
+        return load_spec(cls.SPEC).date_field
+    
+    def search_recent_decisions(self, days_back=7, since=None):
+        """Busca decisões recentes do tribunal, seguindo a paginação (gerador)"""
+        # Janela de busca: da marca d'água (com sobreposição) até hoje
+        start_date, end_date = self.search_window(days_back, since)
+        return self.iter_search_results(start_date, end_date)
+    
+    def search_decisions(self, start_date, end_date, page=1):
+        """Busca uma página de decisões entre as datas (None se a página não pôde ser obtida)"""
+        try:
+            response = self.get_page(self.search_url, params=self.spec.search_params_for(start_date, end_date, page))
+            if not response:
+                return None
+            
+            return self.parse_search_results(response.text)
+        
+        except Exception as e:
+            self.logger.error(f"Erro na busca de decisões do {self.get_tribunal_name()}: {e}")
+            return None
+    
+    def parse_search_results(self, html_content):
+        """Extrai as informações básicas dos resultados de uma página de busca"""
+        soup = self.parse_html(html_content, self.RESULTS_STRAINER)
+        try:
+            decisions = []
+            for item in self.spec.results.matches(soup)['results']:
+                decision_data = self.spec.result_fields.extract(item)
+                if decision_data.get('url'):
+                    decision_data['tribunal'] = self.get_tribunal_name()
+                    decisions.append(decision_data)
+            return decisions
+        finally:
+            soup.decompose()
+    
+    def extract_decision_details(self, decision_url):
+        """Extrai detalhes completos de uma decisão específica"""
+        try:
+            response = self.get_page(decision_url)
+            if not response:
+                return None
+            
+            return self.parse_decision_details(response.text, decision_url)
+        
+        except Exception as e:
+            self.logger.error(f"Erro ao extrair detalhes da decisão {decision_url}: {e}")
+            return None
+    
+    def parse_decision_details(self, html_content, decision_url):
+        """Extrai os campos da página de detalhes de uma decisão"""
+        soup = self.parse_html(html_content, self.DETAIL_STRAINER)
+        try:
+            details = {'tribunal': self.get_tribunal_name(), 'url_origem': decision_url}
+            details.update(self.spec.detail_fields.extract(soup))
+            return details
+        finally:
+            soup.decompose()
+
+def spec_scraper_classes(*custom_classes):
+    """Classe de scraper de cada especificação em specs/, pelo nome do tribunal
+    
+    As classes em `custom_classes` (com SPEC definido) vêm primeiro, na ordem dada;
+    para as demais especificações é criada uma subclasse de SpecScraper. Só entram
+    as especificações habilitadas ("enabled", padrão true), que são as coletadas
+    pelo scheduler e pelo backfill.
+    """
+    classes = {}
+    for scraper_class in custom_classes:
+        spec = load_spec(scraper_class.SPEC)
+        if spec.enabled:
+            classes[spec.tribunal] = scraper_class
+    
+    custom_specs = {scraper_class.SPEC for scraper_class in custom_classes}
+    for name in available_specs():
+        if name not in custom_specs:
+            spec = load_spec(name)
+            if not spec.enabled:
+                continue
+            classes[spec.tribunal] = type(f'{spec.tribunal}Scraper', (SpecScraper,), {
+                'SPEC': name,
+                '__module__': __name__,
+                '__doc__': f'Scraper para jurisprudência do {spec.description} ({spec.tribunal})'
+            })
+    
+    return classes
@@ -0,0 +1,25 @@
+class AdaptivePollingPolicy:
+    """Calcula o próximo intervalo de coleta de uma fonte a partir do rendimento da última execução
+    
+    Execuções sem itens novos multiplicam o intervalo por `backoff_factor`
+    (recuo exponencial); execuções com itens novos o dividem por
+    `tighten_factor`. O resultado fica sempre entre `min_minutes` e `max_minutes`.
+    """
+    
+    def __init__(self, min_minutes, max_minutes, backoff_factor=2.0, tighten_factor=2.0):
+        if min_minutes <= 0 or max_minutes < min_minutes:
+            raise ValueError('Intervalos inválidos: exige 0 < min_minutes <= max_minutes')
+        self.min_minutes = min_minutes
+        self.max_minutes = max_minutes
+        self.backoff_factor = backoff_factor
+        self.tighten_factor = tighten_factor
+    
+    def clamp(self, minutes):
+        return max(self.min_minutes, min(self.max_minutes, minutes))
+    
+    def next_interval(self, current_minutes, new_items):
+        """Retorna o intervalo (em minutos) até a próxima coleta"""
+        current_minutes = self.clamp(current_minutes or self.min_minutes)
+        if new_items > 0:
+            return self.clamp(current_minutes / self.tighten_factor)
+        return self.clamp(current_minutes * self.backoff_factor)
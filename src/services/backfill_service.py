@@ -0,0 +1,386 @@
+import logging
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from src.models.jurisprudencia import db, Backfill, BackfillJanela
+from src.services.jurisprudencia_service import JurisprudenciaService
+from src.services.leader_election import LeaderLock
+from src.scrapers.spec_scraper import SpecScraper
+
+class BackfillService:
+    """Backfill histórico retomável dos tribunais com especificação de busca (STF, STJ, TJSP, ...)
+    
+    O intervalo de datas é dividido em janelas por tribunal, gravadas em
+    backfill_janelas. Cada página de resultados processada é persistida junto
+    com o cursor (proxima_pagina) da janela, então uma execução interrompida
+    retoma exatamente da próxima página ainda não gravada.
+    
+    As janelas de tribunais diferentes rodam em paralelo; dentro de um tribunal
+    o paralelismo é limitado por `workers_per_tribunal` e o intervalo entre
+    requisições continua sendo o delay de cada scraper. Cada página baixada
+    ocupa uma vaga do limite global de coletas simultâneas (`crawl_slots`).
+    """
+    
+    # Tribunais com busca por intervalo de datas (todos os scrapers por especificação)
+    BACKFILL_SOURCES = tuple(
+        name for name, scraper_class in JurisprudenciaService.SCRAPER_CLASSES.items()
+        if issubclass(scraper_class, SpecScraper)
+    )
+    DEFAULT_WINDOW_DAYS = 30
+    MAX_WINDOW_DAYS = 366
+    WORKERS_PER_TRIBUNAL = 1
+    MAX_ATTEMPTS = 3
+    MAX_PAGES_PER_WINDOW = 500
+    
+    # Lease do backfill entre processos (renovado a cada relatório de progresso)
+    LOCK_SECONDS = 300
+    
+    # Sinais de parada das execuções deste processo (backfill_id -> Event)
+    _stop_events = {}
+    
+    def __init__(self, app, engine=None, crawl_slots=None):
+        self.app = app
+        self.engine = engine
+        # Semáforo do limite global de coletas simultâneas (ver SchedulerService.MAX_CONCURRENT_CRAWLS)
+        self.crawl_slots = crawl_slots
+        self.logger = logging.getLogger(__name__)
+    
+    # Criação e consulta
+    
+    def create(self, tribunais, data_inicio, data_fim, janela_dias=None):
+        """Cria o backfill e suas janelas; retorna o id"""
+        tribunais = [t.upper() for t in (tribunais or self.BACKFILL_SOURCES)]
+        invalid = [t for t in tribunais if t not in self.BACKFILL_SOURCES]
+        if invalid:
+            raise ValueError(f"Tribunais sem suporte a backfill: {', '.join(invalid)}")
+        if data_inicio > data_fim:
+            raise ValueError("data_inicio deve ser anterior a data_fim")
+        
+        if janela_dias is None:
+            janela_dias = self.DEFAULT_WINDOW_DAYS
+        if isinstance(janela_dias, bool) or not isinstance(janela_dias, int) or not 1 <= janela_dias <= self.MAX_WINDOW_DAYS:
+            raise ValueError(f"janela_dias deve ser um inteiro entre 1 e {self.MAX_WINDOW_DAYS}")
+        
+        with self.app.app_context():
+            backfill = Backfill(
+                tribunais=','.join(tribunais),
+                data_inicio=data_inicio,
+                data_fim=data_fim,
+                janela_dias=janela_dias
+            )
+            db.session.add(backfill)
+            db.session.flush()
+            
+            # Janelas mais recentes primeiro: os dados novos ficam disponíveis antes
+            windows = []
+            window_end = data_fim
+            while window_end >= data_inicio:
+                window_start = max(data_inicio, window_end - timedelta(days=janela_dias - 1))
+                windows.extend(
+                    BackfillJanela(backfill_id=backfill.id, tribunal=t, data_inicio=window_start, data_fim=window_end)
+                    for t in tribunais
+                )
+                window_end = window_start - timedelta(days=1)
+            
+            db.session.add_all(windows)
+            db.session.commit()
+            self.logger.info(f"Backfill {backfill.id} criado: {len(windows)} janelas de {janela_dias} dias")
+            return backfill.id
+    
+    def list_backfills(self):
+        """Retorna o progresso de todos os backfills"""
+        with self.app.app_context():
+            ids = [b.id for b in Backfill.query.order_by(Backfill.id.desc()).all()]
+        return [self.status(backfill_id) for backfill_id in ids]
+    
+    def status(self, backfill_id):
+        """Retorna contadores, vazão da execução atual e ETA do backfill"""
+        with self.app.app_context():
+            backfill = db.session.get(Backfill, backfill_id)
+            if not backfill:
+                return None
+            
+            rows = db.session.query(
+                BackfillJanela.status,
+                db.func.count(BackfillJanela.id),
+                db.func.coalesce(db.func.sum(BackfillJanela.paginas), 0),
+                db.func.coalesce(db.func.sum(BackfillJanela.decisoes), 0),
+                db.func.coalesce(db.func.sum(BackfillJanela.inseridos), 0)
+            ).filter_by(backfill_id=backfill_id).group_by(BackfillJanela.status).all()
+            
+            windows = {status: count for status, count, _, _, _ in rows}
+            total_windows = sum(windows.values())
+            done_windows = windows.get('done', 0)
+            pages = sum(int(r[2]) for r in rows)
+            decisions = sum(int(r[3]) for r in rows)
+            inserted = sum(int(r[4]) for r in rows)
+            
+            result = backfill.to_dict()
+            result.update({
+                'windows': windows,
+                'total_windows': total_windows,
+                'done_windows': done_windows,
+                'progress_pct': round(done_windows / total_windows * 100, 1) if total_windows else 0.0,
+                'pages': pages,
+                'decisions': decisions,
+                'inserted': inserted,
+                'throughput': None,
+                'eta_seconds': None
+            })
+            
+            # Vazão e ETA consideram só a execução atual (o backfill pode ter sido retomado)
+            if backfill.iniciado_em:
+                end = backfill.finalizado_em if backfill.status != 'running' and backfill.finalizado_em else datetime.utcnow()
+                elapsed = max((end - backfill.iniciado_em).total_seconds(), 1e-6)
+                run_windows = done_windows - (backfill.janelas_no_inicio or 0)
+                run_pages = pages - (backfill.paginas_no_inicio or 0)
+                run_decisions = decisions - (backfill.decisoes_no_inicio or 0)
+                result['throughput'] = {
+                    'elapsed_seconds': round(elapsed, 1),
+                    'pages_per_minute': round(run_pages / elapsed * 60, 2),
+                    'decisions_per_minute': round(run_decisions / elapsed * 60, 2),
+                    'windows_per_hour': round(run_windows / elapsed * 3600, 2)
+                }
+                remaining = total_windows - done_windows - windows.get('error', 0)
+                if backfill.status == 'running' and run_windows > 0:
+                    result['eta_seconds'] = round(remaining / (run_windows / elapsed))
+            
+            return result
+    
+    # Execução
+    
+    def stop(self, backfill_id):
+        """Pede a parada das janelas em andamento (cada uma termina a página atual e grava o cursor)"""
+        event = self._stop_events.get(backfill_id)
+        if not event:
+            return False
+        event.set()
+        return True
+    
+    def run(self, backfill_id, workers_per_tribunal=None, report_every=30, on_progress=None):
+        """Executa (ou retoma) o backfill até terminar as janelas ou receber stop()"""
+        workers_per_tribunal = workers_per_tribunal or self.WORKERS_PER_TRIBUNAL
+        lock = LeaderLock(self.engine, f'backfill:{backfill_id}', ttl_seconds=self.LOCK_SECONDS) if self.engine else None
+        if lock and not lock.acquire():
+            raise RuntimeError(f"Backfill {backfill_id} já está em execução em outro processo")
+        
+        stop_event = threading.Event()
+        self._stop_events[backfill_id] = stop_event
+        
+        try:
+            tribunais = self._start_run(backfill_id)
+            
+            with ThreadPoolExecutor(max_workers=len(tribunais) * workers_per_tribunal,
+                                    thread_name_prefix=f'backfill-{backfill_id}') as executor:
+                futures = [
+                    executor.submit(self._tribunal_worker, backfill_id, tribunal, stop_event)
+                    for tribunal in tribunais
+                    for _ in range(workers_per_tribunal)
+                ]
+                
+                pending = futures
+                try:
+                    while pending:
+                        done, pending = wait(pending, timeout=report_every, return_when=FIRST_EXCEPTION)
+                        for future in done:
+                            future.result()  # propaga erros inesperados dos workers
+                        
+                        if lock:
+                            lock.acquire()  # renova o lease
+                        self._report(backfill_id, on_progress)
+                except BaseException:
+                    # Ctrl+C ou erro em um worker: os demais terminam a página atual e gravam o cursor
+                    stop_event.set()
+                    raise
+            
+            self._finish_run(backfill_id, 'stopped' if stop_event.is_set() else None)
+        
+        except KeyboardInterrupt:
+            self._finish_run(backfill_id, 'stopped')
+            raise
+        
+        except Exception as e:
+            stop_event.set()
+            self.logger.error(f"Erro no backfill {backfill_id}: {e}")
+            self._finish_run(backfill_id, 'error')
+            raise
+        
+        finally:
+            self._stop_events.pop(backfill_id, None)
+            if lock:
+                lock.release()
+        
+        status = self.status(backfill_id)
+        if on_progress:
+            on_progress(status)
+        return status
+    
+    def _start_run(self, backfill_id):
+        """Marca o início da execução e devolve janelas interrompidas para a fila"""
+        with self.app.app_context():
+            backfill = db.session.get(Backfill, backfill_id)
+            if not backfill:
+                raise ValueError(f"Backfill {backfill_id} não encontrado")
+            
+            # Janelas 'running' de uma execução que caiu voltam a ficar pendentes (com o cursor preservado)
+            BackfillJanela.query.filter_by(backfill_id=backfill_id, status='running').update({'status': 'pending'})
+            
+            totals = db.session.query(
+                db.func.coalesce(db.func.sum(BackfillJanela.paginas), 0),
+                db.func.coalesce(db.func.sum(BackfillJanela.decisoes), 0)
+            ).filter_by(backfill_id=backfill_id).one()
+            
+            backfill.status = 'running'
+            backfill.iniciado_em = datetime.utcnow()
+            backfill.finalizado_em = None
+            backfill.janelas_no_inicio = BackfillJanela.query.filter_by(backfill_id=backfill_id, status='done').count()
+            backfill.paginas_no_inicio = int(totals[0])
+            backfill.decisoes_no_inicio = int(totals[1])
+            db.session.commit()
+            
+            return backfill.tribunais.split(',')
+    
+    def _finish_run(self, backfill_id, status=None):
+        with self.app.app_context():
+            backfill = db.session.get(Backfill, backfill_id)
+            if not backfill:
+                return
+            
+            if status is None:
+                remaining = BackfillJanela.query.filter(
+                    BackfillJanela.backfill_id == backfill_id,
+                    BackfillJanela.status != 'done'
+                ).count()
+                status = 'finished' if not remaining else 'error'
+            
+            backfill.status = status
+            backfill.finalizado_em = datetime.utcnow()
+            db.session.commit()
+            self.logger.info(f"Backfill {backfill_id}: {status}")
+    
+    def _report(self, backfill_id, on_progress):
+        status = self.status(backfill_id)
+        throughput = status['throughput'] or {}
+        self.logger.info(
+            f"Backfill {backfill_id}: {status['done_windows']}/{status['total_windows']} janelas "
+            f"({status['progress_pct']}%), {throughput.get('decisions_per_minute', 0)} decisões/min, "
+            f"ETA {status['eta_seconds']}s"
+        )
+        if on_progress:
+            on_progress(status)
+    
+    def _claim_window(self, backfill_id, tribunal):
+        """Reserva a próxima janela pendente do tribunal (atômico entre workers)"""
+        while True:
+            window = BackfillJanela.query.filter_by(
+                backfill_id=backfill_id, tribunal=tribunal, status='pending'
+            ).order_by(BackfillJanela.data_inicio.desc()).first()
+            if not window:
+                return None
+            
+            claimed = db.session.execute(
+                update(BackfillJanela)
+                .where(BackfillJanela.id == window.id, BackfillJanela.status == 'pending')
+                .values(status='running', tentativas=BackfillJanela.tentativas + 1)
+            ).rowcount
+            db.session.commit()
+            if claimed:
+                db.session.refresh(window)
+                return window
+    
+    def _tribunal_worker(self, backfill_id, tribunal, stop_event):
+        """Processa janelas do tribunal até acabarem ou o backfill ser parado"""
+        with self.app.app_context():
+            service = JurisprudenciaService()
+            # Instância própria: as métricas não se misturam às da coleta agendada da mesma fonte
+            scraper = service.scrapers.create(tribunal)
+            
+            while not stop_event.is_set():
+                window = self._claim_window(backfill_id, tribunal)
+                if not window:
+                    return
+                self._process_window(service, scraper, window, stop_event)
+    
+    @contextlib.contextmanager
+    def _crawl_slot(self, stop_event):
+        """Ocupa uma vaga de coleta durante o bloco; entrega False se o backfill for parado antes de obtê-la"""
+        if self.crawl_slots is None:
+            yield True
+            return
+        
+        while not self.crawl_slots.acquire(timeout=1):
+            if stop_event.is_set():
+                yield False
+                return
+        try:
+            yield True
+        finally:
+            self.crawl_slots.release()
+    
+    def _process_window(self, service, scraper, window, stop_event):
+        """Percorre as páginas da janela a partir do cursor, gravando o checkpoint a cada página
+        
+        Como em iter_search_results, a janela termina numa página vazia ou que só
+        repete resultados já vistos (tribunal que ignora o parâmetro de página).
+        Decisões cuja URL já está no banco não têm a página de detalhes baixada; se
+        algum detalhe da página falhar, o cursor não passa dela.
+        """
+        start_date = datetime.combine(window.data_inicio, datetime.min.time())
+        end_date = datetime.combine(window.data_fim, datetime.min.time())
+        seen_urls = set()
+        
+        while not stop_event.is_set():
+            page = window.proxima_pagina
+            if page > self.MAX_PAGES_PER_WINDOW:
+                self.logger.warning(f"Janela {window.id} atingiu o limite de {self.MAX_PAGES_PER_WINDOW} páginas")
+                window.status = 'done'
+                break
+            
+            # Vaga no limite global de coletas simultâneas, compartilhado com as coletas do scheduler
+            with self._crawl_slot(stop_event) as acquired:
+                if not acquired:
+                    continue  # Parado enquanto esperava a vaga
+                
+                items = scraper.search_decisions(start_date, end_date, page)
+                if items is None:
+                    # Página não obtida: tenta de novo depois, a partir do mesmo cursor
+                    window.status = 'pending' if window.tentativas < self.MAX_ATTEMPTS else 'error'
+                    window.erro = f"Falha ao obter a página {page} do {window.tribunal}"
+                    self.logger.error(f"{window.erro} ({window.data_inicio} a {window.data_fim})")
+                    break
+                
+                new_items = [item for item in items if item.get('url') not in seen_urls]
+                if not new_items:
+                    window.status = 'done'
+                    window.erro = None
+                    break
+                seen_urls.update(item.get('url') for item in new_items)
+                
+                urls = [item.get('url') for item in new_items if not service._is_known_url(window.tribunal, item.get('url'))]
+                fetched = [(url, scraper.extract_decision_details(url)) for url in urls]
+                details = [d for _, d in fetched if d]
+                failed = [url for url, d in fetched if not d]
+                inserted = service._ingest(window.tribunal, 'jurisprudencia', details)
+                window.decisoes += len(details)
+                window.inseridos += inserted
+                
+                if failed:
+                    # Detalhes não obtidos (circuito aberto, 5xx, tentativas esgotadas): o cursor fica
+                    # nesta página e a janela volta para a fila; na retomada, as decisões já gravadas
+                    # são puladas como URLs conhecidas e só as que falharam são baixadas de novo
+                    window.status = 'pending' if window.tentativas < self.MAX_ATTEMPTS else 'error'
+                    window.erro = f"Falha ao obter {len(failed)} decisões da página {page} do {window.tribunal}: {failed[0]}"
+                    self.logger.error(f"{window.erro} ({window.data_inicio} a {window.data_fim})")
+                    break
+                
+                # Checkpoint: a página só avança depois que todas as decisões dela foram gravadas
+                window.proxima_pagina = page + 1
+                window.paginas += 1
+                db.session.commit()
+        else:
+            # Parada solicitada: a janela volta para a fila com o cursor atual
+            window.status = 'pending'
+        
+        db.session.commit()
@@ -0,0 +1,183 @@
+import re
+from collections import Counter
+
+class CitationExtractor:
+    """Extrai citações de leis e artigos e as normaliza em chaves canônicas
+    
+    Exemplos de chaves:
+        'Lei nº 8.078/90'              -> LEI-8078-1990
+        'art. 6º do CDC'               -> LEI-8078-1990:ART-6
+        'arts. 186 e 927 do CC'        -> LEI-10406-2002:ART-186, LEI-10406-2002:ART-927
+        'art. 5º, X, da CF/88'         -> CF-1988:ART-5
+    """
+    
+    # Códigos e diplomas citados por nome ou sigla
+    CODE_NAMES = {
+        'código civil': 'LEI-10406-2002',
+        'código de processo civil': 'LEI-13105-2015',
+        'código de defesa do consumidor': 'LEI-8078-1990',
+        'código penal': 'DL-2848-1940',
+        'código de processo penal': 'DL-3689-1941',
+        'código tributário nacional': 'LEI-5172-1966',
+        'consolidação das leis do trabalho': 'DL-5452-1943',
+        'estatuto da criança e do adolescente': 'LEI-8069-1990',
+        'constituição federal': 'CF-1988',
+        'constituição da república': 'CF-1988'
+    }
+    
+    CODE_ACRONYMS = {
+        'CC': 'LEI-10406-2002',
+        'CPC': 'LEI-13105-2015',
+        'CDC': 'LEI-8078-1990',
+        'CP': 'DL-2848-1940',
+        'CPP': 'DL-3689-1941',
+        'CTN': 'LEI-5172-1966',
+        'CLT': 'DL-5452-1943',
+        'ECA': 'LEI-8069-1990',
+        'CF': 'CF-1988',
+        'CRFB': 'CF-1988'
+    }
+    
+    # Versões anteriores identificadas pelo ano após a sigla (ex.: CPC/73)
+    CODE_VERSIONS = {
+        ('CPC', '1973'): 'LEI-5869-1973',
+        ('CC', '1916'): 'LEI-3071-1916'
+    }
+    
+    # Ano das leis mais citadas, para normalizar citações sem o ano
+    KNOWN_LAWS = {
+        ('LEI', '8078'): '1990',
+        ('LEI', '9099'): '1995',
+        ('LEI', '10406'): '2002',
+        ('LEI', '13105'): '2015',
+        ('LEI', '12153'): '2009',
+        ('LEI', '10259'): '2001',
+        ('LEI', '8069'): '1990',
+        ('LEI', '5172'): '1966',
+        ('LEI', '8245'): '1991',
+        ('LEI', '8213'): '1991',
+        ('LEI', '8112'): '1990',
+        ('LEI', '11340'): '2006',
+        ('LEI', '6015'): '1973',
+        ('DL', '2848'): '1940',
+        ('DL', '3689'): '1941',
+        ('DL', '5452'): '1943'
+    }
+    
+    LAW_PATTERN = re.compile(
+        r'\b(lei\s+complementar|lei|decreto-lei|decreto\s+lei|lc|dl)\s*'
+        r'(?:federal\s*)?(?:n\.?\s*[º°o]?\s*|nº\s*|n°\s*)?'
+        r'(\d{1,2}\.\d{3}|\d{1,5})'
+        r'(?:\s*/\s*(\d{4}|\d{2})\b|,?\s+de\s+(?:\d{1,2}(?:º|°)?\s+de\s+\w+\s+de\s+)?(\d{4}))?',
+        re.IGNORECASE
+    )
+    CODE_NAME_PATTERN = re.compile(r'\b(' + '|'.join(CODE_NAMES) + r')\b', re.IGNORECASE)
+    CODE_ACRONYM_PATTERN = re.compile(r'\b(' + '|'.join(CODE_ACRONYMS) + r')\b(?:\s*/\s*(\d{4}|\d{2})\b)?')
+    ARTICLE_PATTERN = re.compile(
+        r'\b(?:arts?\.|artigos?)\s*'
+        r'(\d[\d.]*(?:\s*[º°o])?(?:-[A-Za-z])?'
+        r'(?:(?:\s*,\s*|\s+e\s+)\d[\d.]*(?:\s*[º°o])?(?:-[A-Za-z])?)*)',
+        re.IGNORECASE
+    )
+    ARTICLE_NUMBER = re.compile(r'(\d[\d.]*)\s*[º°o]?(?:-([A-Za-z]))?')
+    
+    LAW_KINDS = {'lei': 'LEI', 'lei complementar': 'LC', 'lc': 'LC', 'decreto-lei': 'DL', 'decreto lei': 'DL', 'dl': 'DL'}
+    
+    # Texto permitido entre o artigo e a lei citada depois dele: só parágrafo, inciso,
+    # alínea ou caput, terminando em do/da/de ('art. 5º, X, da CF/88', 'art. 1º, § 2º, da Lei ...')
+    ARTICLE_QUALIFIER = (
+        r'(?:§+\s*\d+\s*[º°o]?|par[áa]grafo\s+[úu]nico|caput|incisos?\s+[IVXLCDM]+|inc\.\s*[IVXLCDM]+|[IVXLCDM]+'
+        r'|al[íi]neas?\s+["“]?[a-z]["”]?|["“][a-z]["”]|e\s+(?:seguintes|ss\.))'
+    )
+    STATUTE_AFTER_GAP = re.compile(
+        r'(?:\s*,?\s*' + ARTICLE_QUALIFIER + r')*\s*,?\s*d[oae]s?\s+', re.IGNORECASE
+    )
+    
+    # Distância máxima (em caracteres) entre a lei citada antes do artigo e o artigo
+    STATUTE_BEFORE_ARTICLE = 15
+    
+    @staticmethod
+    def _normalize_year(year):
+        if not year:
+            return None
+        if len(year) == 2:
+            return ('19' if int(year) >= 30 else '20') + year
+        return year
+    
+    def _statute_mentions(self, text):
+        """Retorna [(início, fim, chave)] das leis e códigos citados no texto"""
+        mentions = []
+        
+        for match in self.LAW_PATTERN.finditer(text):
+            kind = self.LAW_KINDS[' '.join(match.group(1).lower().split())]
+            number = str(int(match.group(2).replace('.', '')))
+            year = self._normalize_year(match.group(3) or match.group(4)) or self.KNOWN_LAWS.get((kind, number))
+            key = f'{kind}-{number}-{year}' if year else f'{kind}-{number}'
+            mentions.append((match.start(), match.end(), key))
+        
+        for match in self.CODE_NAME_PATTERN.finditer(text):
+            mentions.append((match.start(), match.end(), self.CODE_NAMES[' '.join(match.group(1).lower().split())]))
+        
+        for match in self.CODE_ACRONYM_PATTERN.finditer(text):
+            acronym = match.group(1)
+            year = self._normalize_year(match.group(2))
+            key = self.CODE_VERSIONS.get((acronym, year), self.CODE_ACRONYMS[acronym])
+            mentions.append((match.start(), match.end(), key))
+        
+        mentions.sort()
+        return mentions
+    
+    def _normalize_article(self, raw):
+        """'1.022º' -> '1022', '285-b' -> '285-B'"""
+        match = self.ARTICLE_NUMBER.match(raw.strip())
+        if not match:
+            return None
+        number = str(int(match.group(1).replace('.', '') or 0))
+        return f'{number}-{match.group(2).upper()}' if match.group(2) else number
+    
+    def extract(self, text):
+        """Retorna um Counter {(chave, tipo): ocorrências}, com tipo 'lei' ou 'artigo'"""
+        citations = Counter()
+        if not text:
+            return citations
+        
+        mentions = self._statute_mentions(text)
+        for _, _, key in mentions:
+            citations[(key, 'lei')] += 1
+        
+        for match in self.ARTICLE_PATTERN.finditer(text):
+            statute = self._statute_for_article(text, mentions, match.start(), match.end())
+            if not statute:
+                continue  # Artigo sem lei identificável não gera chave canônica
+            
+            for raw in re.split(r'\s*,\s*|\s+e\s+', match.group(1)):
+                article = self._normalize_article(raw)
+                if article:
+                    citations[(f'{statute}:ART-{article}', 'artigo')] += 1
+        
+        return citations
+    
+    def _statute_for_article(self, text, mentions, start, end):
+        """Associa o artigo à lei citada logo depois ('art. 6º do CDC') ou logo antes ('CDC, art. 6º')
+        
+        A lei seguinte só vale quando introduzida por do/da/de (ver STATUTE_AFTER_GAP);
+        a anterior, quando não há fim de frase ou de cláusula ('.' ou ';') entre as duas.
+        """
+        following = next((mention for mention in mentions if mention[0] >= end), None)
+        if following and self.STATUTE_AFTER_GAP.fullmatch(text, end, following[0]):
+            return following[2]
+        
+        for _, mention_end, key in reversed(mentions):
+            if mention_end <= start:
+                gap = text[mention_end:start]
+                if len(gap) <= self.STATUTE_BEFORE_ARTICLE and not re.search(r'[.;]', gap):
+                    return key
+                break
+        
+        return None
+    
+    def keys_for_query(self, text):
+        """Normaliza uma consulta livre nas chaves mais específicas que ela cita"""
+        citations = self.extract(text)
+        articles = [key for key, kind in citations if kind == 'artigo']
+        return articles or [key for key, kind in citations if kind == 'lei']
@@ -0,0 +1,137 @@
+import uuid
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+class CollectionProgress:
+    """Progresso de uma execução de coleta (manual ou agendada)
+    
+    Os eventos ficam em memória no processo que executa a coleta e são
+    consumidos pelo stream SSE; cada evento tem um id sequencial para que o
+    cliente possa reconectar com Last-Event-ID sem perder eventos.
+    """
+    
+    def __init__(self, sources, days_back, trigger='manual'):
+        self.run_id = uuid.uuid4().hex
+        self.sources = list(sources)
+        self.days_back = days_back
+        self.trigger = trigger
+        self.status = 'queued'  # queued, running, finished
+        self.created_at = datetime.utcnow()
+        self.finished_at = None
+        self.results = {}
+        self.events = []
+        self._pending = set(self.sources)
+        self._condition = threading.Condition()
+        
+        self.emit('queued', {'sources': self.sources, 'days_back': days_back})
+    
+    @property
+    def done(self):
+        return self.status == 'finished'
+    
+    def emit(self, event, data=None):
+        """Registra um evento e acorda os streams que estão aguardando"""
+        with self._condition:
+            payload = {'run_id': self.run_id, 'timestamp': datetime.utcnow().isoformat()}
+            payload.update(data or {})
+            self.events.append((len(self.events), event, payload))
+            self._condition.notify_all()
+    
+    def source_started(self, source):
+        with self._condition:
+            self.status = 'running'
+        self.emit('source_started', {'source': source})
+    
+    def source_finished(self, source, result):
+        """Registra o resultado de uma fonte e, na última, o evento final com os totais"""
+        self.emit('source_finished', result)
+        
+        with self._condition:
+            self.results[source] = result
+            self._pending.discard(source)
+            if self._pending:
+                return
+        
+        self.emit('finished', self.summary())
+        with self._condition:
+            self.status = 'finished'
+            self.finished_at = datetime.utcnow()
+            self._condition.notify_all()
+    
+    def summary(self):
+        """Totais da execução no mesmo formato de collect_all_recent_jurisprudence"""
+        results = list(self.results.values())
+        return {
+            'total_collected': sum(r.get('collected', 0) for r in results),
+            'success': [r['message'] for r in results if r.get('message') and not r.get('error')],
+            'errors': [r['error'] for r in results if r.get('error')],
+            'skipped': [r['source'] for r in results if r.get('skipped')]
+        }
+    
+    def wait_events(self, after=-1, timeout=15):
+        """Retorna os eventos com id maior que `after`, aguardando até `timeout` segundos"""
+        with self._condition:
+            if len(self.events) <= after + 1 and not self.done:
+                self._condition.wait(timeout)
+            return self.events[after + 1:]
+    
+    def to_dict(self):
+        return {
+            'run_id': self.run_id,
+            'sources': self.sources,
+            'days_back': self.days_back,
+            'trigger': self.trigger,
+            'status': self.status,
+            'created_at': self.created_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'results': dict(self.results),
+            'summary': self.summary() if self.done else None
+        }
+
+class CollectionProgressRegistry:
+    """Execuções de coleta recentes do processo e fontes em andamento (no máximo uma execução por fonte)"""
+    
+    MAX_RUNS = 50
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs = OrderedDict()
+        self._active_sources = {}
+    
+    def create(self, sources, days_back, trigger='manual'):
+        """Reserva as fontes livres e cria a execução; retorna (progresso, fontes ocupadas)"""
+        with self._lock:
+            busy = {s: self._active_sources[s] for s in sources if s in self._active_sources}
+            free = [s for s in sources if s not in busy]
+            if not free:
+                return None, busy
+            
+            progress = CollectionProgress(free, days_back, trigger)
+            for source in free:
+                self._active_sources[source] = progress.run_id
+            
+            self._runs[progress.run_id] = progress
+            while len(self._runs) > self.MAX_RUNS:
+                self._runs.popitem(last=False)
+            
+            return progress, busy
+    
+    def release(self, source, run_id):
+        """Libera a fonte ao fim da execução que a reservou"""
+        with self._lock:
+            if self._active_sources.get(source) == run_id:
+                del self._active_sources[source]
+    
+    def get(self, run_id):
+        with self._lock:
+            return self._runs.get(run_id)
+    
+    def active_sources(self):
+        with self._lock:
+            return dict(self._active_sources)
+    
+    def recent(self, limit=20):
+        with self._lock:
+            runs = list(self._runs.values())
+        return [run.to_dict() for run in reversed(runs[-limit:])]
@@ -0,0 +1,153 @@
+import os
+import re
+import gzip
+import json
+import zlib
+import logging
+import threading
+from datetime import datetime
+
+class IngestionLog:
+    """Log de ingestão local, somente de acréscimo: segmentos NDJSON comprimidos por fonte
+    
+    Layout: <path>/<fonte>/<segmento:08d>.ndjson.gz. Cada acréscimo grava um lote
+    como um membro gzip independente (com fsync) no segmento atual, de modo que os
+    registros coletados sobrevivem a uma queda antes de chegarem ao banco. Cada
+    instância abre um segmento novo por fonte no primeiro acréscimo e troca de
+    segmento ao atingir `segment_max_bytes`; um segmento interrompido no meio de
+    uma escrita nunca recebe mais dados, e a leitura para no último registro íntegro.
+    """
+    
+    SEGMENT_PATTERN = re.compile(r'^(\d{8})\.ndjson\.gz$')
+    SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+    READ_CHUNK_BYTES = 64 * 1024
+    
+    def __init__(self, path, segment_max_bytes=SEGMENT_MAX_BYTES, compresslevel=6):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.segment_max_bytes = segment_max_bytes
+        self.compresslevel = compresslevel
+        self._current = {}
+        self._write_lock = threading.Lock()
+        self._source_locks = {}
+        os.makedirs(path, exist_ok=True)
+    
+    def _source_dir(self, source):
+        return os.path.join(self.path, source)
+    
+    def segment_path(self, source, segment):
+        return os.path.join(self._source_dir(source), f'{segment:08d}.ndjson.gz')
+    
+    def sources(self):
+        """Fontes com algum segmento gravado"""
+        return sorted(name for name in os.listdir(self.path) if self.segments(name))
+    
+    def segments(self, source):
+        """Números dos segmentos da fonte, em ordem"""
+        directory = self._source_dir(source)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            int(match.group(1)) for match in map(self.SEGMENT_PATTERN.match, os.listdir(directory)) if match
+        )
+    
+    def source_lock(self, source):
+        """Lock que serializa a aplicação ao banco dos registros de uma fonte neste processo"""
+        with self._write_lock:
+            return self._source_locks.setdefault(source, threading.Lock())
+    
+    def _new_segment(self, source):
+        """Cria o próximo segmento da fonte (O_EXCL: outro processo pode estar criando ao mesmo tempo)"""
+        os.makedirs(self._source_dir(source), exist_ok=True)
+        segment = (self.segments(source) or [0])[-1] + 1
+        while True:
+            try:
+                os.close(os.open(self.segment_path(source, segment), os.O_WRONLY | os.O_CREAT | os.O_EXCL))
+                return segment
+            except FileExistsError:
+                segment += 1
+    
+    def append(self, source, kind, records):
+        """Acrescenta registros ({'tipo', 'coletado_em', 'dados'}) ao log da fonte; retorna o segmento usado"""
+        if not records:
+            return None
+        
+        collected_at = datetime.utcnow().isoformat()
+        lines = b''.join(
+            json.dumps({'tipo': kind, 'coletado_em': collected_at, 'dados': record}, ensure_ascii=False, default=str).encode('utf-8') + b'\n'
+            for record in records
+        )
+        member = gzip.compress(lines, compresslevel=self.compresslevel)
+        
+        with self._write_lock:
+            segment = self._current.get(source)
+            if segment is None or os.path.getsize(self.segment_path(source, segment)) >= self.segment_max_bytes:
+                segment = self._current[source] = self._new_segment(source)
+            
+            fd = os.open(self.segment_path(source, segment), os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(fd, member)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        
+        return segment
+    
+    def members(self, source, segment, offset=0):
+        """Gera (posição do próximo membro, registros) de cada membro gzip íntegro do segmento
+        
+        A leitura começa em `offset` (posição em bytes do início de um membro), sem
+        descomprimir o que vem antes. Para no primeiro membro truncado ou corrompido
+        (escrita interrompida ou ainda em andamento em outro processo).
+        """
+        with open(self.segment_path(source, segment), 'rb') as f:
+            f.seek(offset)
+            data = memoryview(f.read())
+        
+        position = 0
+        while position < len(data):
+            decompressor = zlib.decompressobj(31)  # wbits 31: um membro gzip
+            chunks, end = [], position
+            try:
+                while not decompressor.eof and end < len(data):
+                    chunk = data[end:end + self.READ_CHUNK_BYTES]
+                    chunks.append(decompressor.decompress(chunk))
+                    end += len(chunk)
+                if not decompressor.eof:
+                    raise EOFError('membro gzip incompleto')
+                end -= len(decompressor.unused_data)
+                
+                lines = b''.join(chunks).split(b'\n')
+                if lines[-1]:
+                    raise EOFError('última linha incompleta')
+                records = [json.loads(line) for line in lines[:-1]]
+            except (EOFError, zlib.error, json.JSONDecodeError) as e:
+                self.logger.warning(f"Segmento {source}/{segment} truncado na posição {offset + position}: {e}")
+                return
+            
+            position = end
+            yield offset + position, records
+    
+    def read(self, source, segment, start=0, offset=0):
+        """Gera (índice, registro) do segmento a partir do índice `start`
+        
+        `offset`, se informado, é a posição em bytes do membro que começa no registro
+        `start` (ver IngestaoOffset.posicao); sem ele, o segmento é lido desde o início.
+        """
+        index = start if offset else 0
+        for _, records in self.members(source, segment, offset):
+            for record in records:
+                if index >= start:
+                    yield index, record
+                index += 1
+    
+    def count(self, source, segment, start=0, offset=0):
+        return sum(1 for _ in self.read(source, segment, start, offset))
+    
+    def stats(self, source):
+        segments = self.segments(source)
+        return {
+            'segmentos': len(segments),
+            'bytes': sum(os.path.getsize(self.segment_path(source, segment)) for segment in segments),
+            'ultimo_segmento': segments[-1] if segments else None
+        }
@@ -0,0 +1,360 @@
+from flask import current_app, has_app_context
+from src.models.jurisprudencia import (
+    db, Jurisprudencia, Enunciado, SentencaUsuario, Citacao, CollectionRun, ColetaWatermark, IngestaoOffset, VersaoDados
+)
+from src.services.citation_extractor import CitationExtractor
+from src.services.query_cache import cached_query
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+import numpy as np
+
+class JurisprudenciaQueryService:
+    """Consultas de jurisprudência, enunciados, citações e métricas de coleta (somente leitura)
+    
+    Não cria scrapers nem sessões HTTP; é o serviço usado pelos endpoints de
+    leitura. A coleta fica no JurisprudenciaService, que estende este.
+    """
+    
+    # Tabelas cujas consultas ficam no query_cache (as demais versões, ex.: sentencas, não o invalidam)
+    CACHED_TABLES = ('jurisprudencia', 'enunciados')
+    
+    # Métricas por fonte gravadas em collection_runs
+    COLLECTION_METRICS = ('duracao', 'paginas', 'bytes_baixados', 'itens_parseados', 'duplicatas', 'inseridos', 'erros')
+    
+    def __init__(self, precedent_index=None, ingestion_log=None, query_cache=None):
+        self.logger = logging.getLogger(__name__)
+        self.citation_extractor = CitationExtractor()
+        
+        # Índice de similaridade, log de ingestão e cache de consultas compartilhados pela aplicação (ver main.py)
+        if precedent_index is None and has_app_context():
+            precedent_index = getattr(current_app, 'precedent_index', None)
+        if ingestion_log is None and has_app_context():
+            ingestion_log = getattr(current_app, 'ingestion_log', None)
+        if query_cache is None and has_app_context():
+            query_cache = getattr(current_app, 'query_cache', None)
+        self.precedent_index = precedent_index
+        self.ingestion_log = ingestion_log
+        self.query_cache = query_cache
+    
+    def get_watermark(self, tribunal_name):
+        """Retorna a data mais recente já ingerida do tribunal, ou None"""
+        watermark = db.session.get(ColetaWatermark, tribunal_name)
+        return watermark.data_referencia if watermark else None
+    
+    def get_ingestion_status(self):
+        """Segmentos, posição aplicada e registros pendentes do log de ingestão de cada fonte"""
+        if self.ingestion_log is None:
+            return []
+        
+        status = []
+        for source in self.ingestion_log.sources():
+            offset = db.session.get(IngestaoOffset, source)
+            position = (offset.segmento, offset.registro, offset.posicao or 0) if offset else (0, 0, 0)
+            pending = sum(
+                self.ingestion_log.count(source, segment, *(position[1:] if segment == position[0] else (0, 0)))
+                for segment in self.ingestion_log.segments(source) if segment >= position[0]
+            )
+            status.append({
+                'fonte': source,
+                **self.ingestion_log.stats(source),
+                'aplicado': offset.to_dict() if offset else None,
+                'pendentes': pending
+            })
+        return status
+    
+    def get_data_version(self, *tables):
+        """Validadores HTTP dos dados das tabelas ('jurisprudencia', 'enunciados'): ETag e data da última alteração
+        
+        Vêm dos contadores em data_versions, incrementados no mesmo commit de cada
+        alteração (novas decisões, reconstrução das quase-duplicatas) por qualquer
+        processo. Uma versão diferente da última vista por este processo também
+        descarta o cache de consultas local, para a resposta corresponder ao ETag.
+        """
+        versions = {row.tabela: row for row in VersaoDados.query.all()}
+        if self.query_cache:
+            self.query_cache.observe(tuple(sorted(
+                (row.tabela, row.versao) for row in versions.values() if row.tabela in self.CACHED_TABLES
+            )))
+        
+        rows = [versions[table] for table in tables if table in versions]
+        return {
+            'etag': '-'.join(f'{table}:{versions[table].versao if table in versions else 0}' for table in tables),
+            'last_modified': max((row.atualizado_em for row in rows), default=None)
+        }
+    
+    def get_cache_stats(self):
+        """Acertos, falhas e tamanho do cache de consultas"""
+        return self.query_cache.stats() if self.query_cache else None
+    
+    def get_watermarks(self):
+        """Retorna as marcas d'água de todos os tribunais"""
+        return [w.to_dict() for w in ColetaWatermark.query.order_by(ColetaWatermark.tribunal).all()]
+    
+    @cached_query
+    def get_recent_jurisprudence(self, tribunal=None, limit=50, collapse_duplicates=False):
+        """Busca jurisprudência recente no banco de dados"""
+        # O inteiro teor (textos_comprimidos) vem numa única consulta extra, não uma por decisão
+        query = Jurisprudencia.query.options(db.selectinload(Jurisprudencia.acordao_texto))
+        
+        if tribunal:
+            query = query.filter_by(tribunal=tribunal)
+        
+        query = query.order_by(Jurisprudencia.data_coleta.desc())
+        
+        if collapse_duplicates:
+            return self._collapse_duplicates(query, limit)
+        
+        jurisprudencia = query.limit(limit).all()
+        return [j.to_dict() for j in jurisprudencia]
+    
+    @cached_query
+    def count_by_source(self):
+        """Quantidade de decisões por tribunal e de enunciados por órgão (um GROUP BY em cada tabela)"""
+        return {
+            'jurisprudencia': dict(
+                db.session.query(Jurisprudencia.tribunal, db.func.count(Jurisprudencia.id))
+                .group_by(Jurisprudencia.tribunal).all()
+            ),
+            'enunciados': dict(
+                db.session.query(Enunciado.orgao, db.func.count(Enunciado.id)).group_by(Enunciado.orgao).all()
+            )
+        }
+    
+    @cached_query
+    def get_enunciados(self, orgao=None, tipo=None, limit=100):
+        """Busca enunciados no banco de dados"""
+        query = Enunciado.query
+        
+        if orgao:
+            query = query.filter_by(orgao=orgao)
+        
+        if tipo:
+            query = query.filter_by(tipo=tipo)
+        
+        enunciados = query.order_by(Enunciado.numero).limit(limit).all()
+        return [e.to_dict() for e in enunciados]
+    
+    @cached_query
+    def search_jurisprudence(self, search_term, tribunal=None, limit=50, collapse_duplicates=False):
+        """Busca jurisprudência por termo"""
+        query = Jurisprudencia.query.options(db.selectinload(Jurisprudencia.acordao_texto))
+        
+        if tribunal:
+            query = query.filter_by(tribunal=tribunal)
+        
+        # Busca na ementa e nas tags. O inteiro teor fica de fora: comprimido, o filtro
+        # descomprimiria o acórdão de cada decisão da tabela a cada busca
+        query = query.filter(
+            db.or_(
+                Jurisprudencia.ementa.contains(search_term),
+                Jurisprudencia.tags.contains(search_term)
+            )
+        )
+        
+        query = query.order_by(Jurisprudencia.data_coleta.desc())
+        
+        if collapse_duplicates:
+            return self._collapse_duplicates(query, limit)
+        
+        jurisprudencia = query.limit(limit).all()
+        return [j.to_dict() for j in jurisprudencia]
+    
+    def _collapse_duplicates(self, query, limit):
+        """Mantém apenas a primeira decisão de cada cluster de quase-duplicatas"""
+        results = []
+        seen_clusters = set()
+        batch_size = max(limit * 2, 50)
+        offset = 0
+        
+        while len(results) < limit:
+            rows = query.offset(offset).limit(batch_size).all()
+            for row in rows:
+                if row.cluster_id in seen_clusters:
+                    continue
+                seen_clusters.add(row.cluster_id)
+                results.append(row)
+                if len(results) == limit:
+                    break
+            
+            if len(rows) < batch_size:
+                break
+            offset += batch_size
+        
+        # Quantidade de decisões em cada cluster retornado
+        cluster_sizes = dict(
+            db.session.query(Jurisprudencia.duplicata_de, db.func.count(Jurisprudencia.id))
+            .filter(Jurisprudencia.duplicata_de.in_(seen_clusters))
+            .group_by(Jurisprudencia.duplicata_de)
+            .all()
+        )
+        
+        items = []
+        for row in results:
+            item = row.to_dict()
+            item['cluster_id'] = row.cluster_id
+            item['cluster_size'] = 1 + cluster_sizes.get(row.cluster_id, 0)
+            items.append(item)
+        return items
+    
+    def get_duplicates(self, jurisprudencia_id):
+        """Retorna todas as decisões do cluster de quase-duplicatas de uma decisão"""
+        jurisprudencia = db.session.get(Jurisprudencia, jurisprudencia_id)
+        if not jurisprudencia:
+            return None
+        
+        cluster_id = jurisprudencia.cluster_id
+        members = Jurisprudencia.query.filter(
+            db.or_(Jurisprudencia.id == cluster_id, Jurisprudencia.duplicata_de == cluster_id)
+        ).order_by(Jurisprudencia.id).all()
+        return [j.to_dict() for j in members]
+    
+    def find_related(self, text=None, sentenca_id=None, top_k=10):
+        """Busca precedentes e enunciados relacionados a um texto ou a uma sentença do usuário"""
+        if not self.precedent_index:
+            raise RuntimeError('Índice de precedentes não inicializado')
+        
+        if sentenca_id is not None:
+            sentenca = SentencaUsuario.query.get(sentenca_id)
+            if not sentenca:
+                raise ValueError('Sentença não encontrada')
+            text = sentenca.texto_extraido
+        
+        if not text or not text.strip():
+            raise ValueError('Texto ou sentenca_id é obrigatório')
+        
+        return self.precedent_index.search(text, top_k)
+    
+    def find_citing_decisions(self, query=None, keys=None, limit=50):
+        """Busca decisões que citam uma lei/artigo (consulta livre ou chaves canônicas)"""
+        if not keys:
+            keys = self.citation_extractor.keys_for_query(query or '')
+        if not keys:
+            raise ValueError('Nenhuma lei ou artigo reconhecido na consulta')
+        
+        # Decisões que citam todas as chaves (interseção das listas de postings)
+        matching_ids = (
+            db.session.query(Citacao.jurisprudencia_id)
+            .filter(Citacao.chave.in_(keys))
+            .group_by(Citacao.jurisprudencia_id)
+            .having(db.func.count(Citacao.chave) == len(set(keys)))
+        )
+        
+        jurisprudencia = (
+            Jurisprudencia.query
+            .filter(Jurisprudencia.id.in_(matching_ids))
+            .order_by(Jurisprudencia.data_coleta.desc())
+            .limit(limit)
+            .all()
+        )
+        return {
+            'keys': sorted(set(keys)),
+            'data': [j.to_dict() for j in jurisprudencia]
+        }
+    
+    def get_most_cited(self, days=7, tipo='artigo', limit=20):
+        """Retorna as leis/artigos mais citados nas decisões coletadas nos últimos dias"""
+        since = datetime.utcnow() - timedelta(days=days)
+        
+        rows = (
+            db.session.query(
+                Citacao.chave,
+                db.func.count(Citacao.jurisprudencia_id).label('decisoes'),
+                db.func.sum(Citacao.ocorrencias).label('ocorrencias')
+            )
+            .filter(Citacao.tipo == tipo, Citacao.data_coleta >= since)
+            .group_by(Citacao.chave)
+            .order_by(db.desc('decisoes'), db.desc('ocorrencias'))
+            .limit(limit)
+            .all()
+        )
+        return [
+            {'chave': row.chave, 'decisoes': row.decisoes, 'ocorrencias': int(row.ocorrencias or 0)}
+            for row in rows
+        ]
+    
+    def get_collection_runs(self, tribunal=None, limit=50):
+        """Retorna as execuções de coleta mais recentes"""
+        query = CollectionRun.query
+        if tribunal:
+            query = query.filter_by(tribunal=tribunal)
+        runs = query.order_by(CollectionRun.inicio.desc()).limit(limit).all()
+        return [run.to_dict() for run in runs]
+    
+    def get_collection_stats(self, days=30, tribunal=None, percentiles=(50, 90, 95, 99)):
+        """Retorna percentis e tendência diária das métricas de coleta por tribunal"""
+        since = datetime.utcnow() - timedelta(days=days)
+        query = CollectionRun.query.filter(CollectionRun.inicio >= since)
+        if tribunal:
+            query = query.filter_by(tribunal=tribunal)
+        
+        runs_by_tribunal = defaultdict(list)
+        for run in query.order_by(CollectionRun.inicio):
+            runs_by_tribunal[run.tribunal].append(run)
+        
+        return {
+            'days': days,
+            'since': since.isoformat(),
+            'tribunais': {
+                name: self._summarize_runs(runs, since, days, percentiles)
+                for name, runs in runs_by_tribunal.items()
+            }
+        }
+    
+    def _summarize_runs(self, runs, since, days, percentiles):
+        """Calcula percentis, série diária e variação entre as duas metades da janela"""
+        values = {
+            metric: np.array([getattr(run, metric) or 0 for run in runs], dtype=np.float64)
+            for metric in self.COLLECTION_METRICS
+        }
+        
+        summary = {
+            'runs': len(runs),
+            'failed_runs': sum(1 for run in runs if run.status == 'error'),
+            'last_run': runs[-1].to_dict(),
+            'percentiles': {
+                metric: {
+                    f'p{p}': round(float(value), 3)
+                    for p, value in zip(percentiles, np.percentile(series, percentiles))
+                }
+                for metric, series in values.items()
+            },
+            'totals': {
+                metric: int(series.sum())
+                for metric, series in values.items() if metric != 'duracao'
+            }
+        }
+        
+        # Série diária (duração mediana e somas do dia)
+        daily = defaultdict(list)
+        for run in runs:
+            daily[run.inicio.date().isoformat()].append(run)
+        summary['daily'] = [
+            {
+                'date': day,
+                'runs': len(day_runs),
+                'median_duration': round(float(np.median([r.duracao or 0 for r in day_runs])), 3),
+                'pages': sum(r.paginas or 0 for r in day_runs),
+                'inserted': sum(r.inseridos or 0 for r in day_runs),
+                'errors': sum(r.erros or 0 for r in day_runs)
+            }
+            for day, day_runs in sorted(daily.items())
+        ]
+        
+        # Tendência: mediana da segunda metade da janela contra a da primeira
+        middle = since + timedelta(days=days / 2)
+        summary['trend'] = {}
+        for metric in ('duracao', 'paginas', 'inseridos', 'erros'):
+            before = [getattr(r, metric) or 0 for r in runs if r.inicio < middle]
+            after = [getattr(r, metric) or 0 for r in runs if r.inicio >= middle]
+            if not before or not after:
+                summary['trend'][metric] = None
+                continue
+            median_before, median_after = float(np.median(before)), float(np.median(after))
+            summary['trend'][metric] = {
+                'median_before': round(median_before, 3),
+                'median_after': round(median_after, 3),
+                'change_pct': round((median_after - median_before) / median_before * 100, 1) if median_before else None
+            }
+        
+        return summary
@@ -1,22 +1,43 @@
-from src.models.jurisprudencia import db, Jurisprudencia, Enunciado
+from src.models.jurisprudencia import (
+    db, Jurisprudencia, Enunciado, Citacao, CollectionRun, ColetaWatermark, IngestaoOffset, VersaoDados
+)
+from src.models.sqlite_config import begin_write
 from src.scrapers.stf_scraper import STFScraper
 from src.scrapers.stj_scraper import STJScraper
 from src.scrapers.tjsp_scraper import TJSPScraper
 from src.scrapers.enunciados_scraper import EnunciadosScraper
+from src.scrapers.spec_scraper import spec_scraper_classes
+from src.scrapers.registry import ScraperRegistry
+from src.services.near_duplicates import NearDuplicateIndex
+from src.services.jurisprudencia_query_service import JurisprudenciaQueryService
+import time
+import uuid
 import logging
 from datetime import datetime
 
-class JurisprudenciaService:
+class JurisprudenciaService(JurisprudenciaQueryService):
     """Serviço para gerenciar a coleta e armazenamento de jurisprudência"""
     
-    def __init__(self):
+    # Fontes de coleta (a ordem é a mesma da coleta completa); cada arquivo em
+    # src/scrapers/specs/ vira uma fonte, sem precisar de uma classe própria
+    SCRAPER_CLASSES = {
+        **spec_scraper_classes(STFScraper, STJScraper, TJSPScraper),
+        'ENUNCIADOS': EnunciadosScraper
+    }
+    
+    # Formatos de data aceitos nas páginas dos tribunais
+    DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d', '%d.%m.%Y', '%d-%m-%Y')
+    
+    # Decisões salvas por commit durante a coleta (o pipeline do scraper não é materializado)
+    # e registros do log de ingestão aplicados por transação
+    SAVE_BATCH_SIZE = 50
+    
+    def __init__(self, precedent_index=None, ingestion_log=None, query_cache=None):
+        super().__init__(precedent_index, ingestion_log, query_cache)
         self.logger = logging.getLogger(__name__)
-        self.scrapers = {
-            'STF': STFScraper(),
-            'STJ': STJScraper(),
-            'TJSP': TJSPScraper(),
-            'ENUNCIADOS': EnunciadosScraper()
-        }
+        # Scrapers do processo, criados no primeiro uso e reaproveitados entre coletas
+        self.scrapers = scraper_registry
+        self.near_duplicates = NearDuplicateIndex()
     
     def collect_all_recent_jurisprudence(self, days_back=7):
         """Coleta jurisprudência recente de todos os tribunais"""
@@ -28,78 +49,399 @@ class JurisprudenciaService:
             'total_collected': 0
         }
         
+        # Todas as fontes desta coleta compartilham o mesmo execucao_id em collection_runs
+        run_id = uuid.uuid4().hex
+        
         # Coleta de cada tribunal
-        for tribunal_name, scraper in self.scrapers.items():
-            try:
-                if tribunal_name == 'ENUNCIADOS':
-                    # Para enunciados, coletamos todos, não apenas recentes
-                    enunciados = scraper.get_all_enunciados()
-                    saved_count = self._save_enunciados(enunciados)
-                    results['success'].append(f"{tribunal_name}: {saved_count} enunciados coletados")
-                    results['total_collected'] += saved_count
-                else:
-                    # Para tribunais, coletamos jurisprudência recente
-                    decisions = scraper.get_recent_jurisprudence(days_back)
-                    saved_count = self._save_jurisprudencia(decisions)
-                    results['success'].append(f"{tribunal_name}: {saved_count} decisões coletadas")
-                    results['total_collected'] += saved_count
-                    
-            except Exception as e:
-                error_msg = f"Erro na coleta do {tribunal_name}: {str(e)}"
-                self.logger.error(error_msg)
-                results['errors'].append(error_msg)
+        for tribunal_name in self.scrapers:
+            source_result = self.collect_source(tribunal_name, days_back, run_id=run_id)
+            
+            if source_result['error']:
+                results['errors'].append(source_result['error'])
+            else:
+                results['success'].append(source_result['message'])
+                results['total_collected'] += source_result['collected']
         
         self.logger.info(f"Coleta finalizada. Total: {results['total_collected']} itens")
         return results
     
-    def _save_jurisprudencia(self, decisions):
-        """Salva decisões de jurisprudência no banco de dados"""
+    def collect_source(self, tribunal_name, days_back=7, run_id=None, heartbeat=None):
+        """Coleta uma única fonte (tribunal ou enunciados) e registra a execução em collection_runs
+        
+        `heartbeat`, se informado, é chamado após cada lote salvo (ex.: para renovar o
+        lease da fonte no scheduler); uma exceção nele interrompe a coleta.
+        """
+        result = {
+            'source': tribunal_name,
+            'collected': 0,
+            'message': None,
+            'error': None
+        }
+        if tribunal_name not in self.scrapers:
+            error_msg = f"Erro na coleta do {tribunal_name}: Fonte desconhecida: {tribunal_name}"
+            self.logger.error(error_msg)
+            result['error'] = error_msg
+            self._record_collection_run(
+                run_id or uuid.uuid4().hex, tribunal_name, datetime.utcnow(), 0.0, {}, self._empty_save_stats(), error_msg
+            )
+            return result
+        
+        with self.scrapers.checkout(tribunal_name) as scraper:
+            return self._collect_with_scraper(scraper, tribunal_name, days_back, run_id, result, heartbeat)
+    
+    def _collect_with_scraper(self, scraper, tribunal_name, days_back, run_id, result, heartbeat=None):
+        """Executa a coleta da fonte com o scraper emprestado do registro"""
+        stats = self._empty_save_stats()
+        started_at = datetime.utcnow()
+        start = time.monotonic()
+        run_id = run_id or uuid.uuid4().hex
+        
+        try:
+            scraper.reset_metrics()
+            
+            if tribunal_name == 'ENUNCIADOS':
+                # Para enunciados, coletamos todos, não apenas recentes
+                enunciados = scraper.get_all_enunciados()
+                saved_count = self._ingest(tribunal_name, 'enunciado', enunciados, stats)
+                if heartbeat:
+                    heartbeat()
+                result['message'] = f"{tribunal_name}: {saved_count} enunciados coletados"
+            else:
+                # Para tribunais, coletamos o intervalo desde a marca d'água (ou os últimos N dias)
+                watermark = self.get_watermark(tribunal_name)
+                saved_count = self._collect_decisions(scraper, days_back, watermark, stats, heartbeat)
+                result['message'] = f"{tribunal_name}: {saved_count} decisões coletadas"
+                
+                # Só avança a marca se a execução foi limpa; senão a próxima refaz o intervalo
+                if not scraper.metrics['errors'] and not stats['errors']:
+                    self._advance_watermark(tribunal_name, stats['latest_date'], run_id)
+            
+            result['collected'] = saved_count
+        
+        except Exception as e:
+            error_msg = f"Erro na coleta do {tribunal_name}: {str(e)}"
+            self.logger.error(error_msg)
+            result['error'] = error_msg
+        
+        self._record_collection_run(
+            run_id, tribunal_name, started_at, time.monotonic() - start,
+            scraper.metrics, stats, result['error']
+        )
+        
+        return result
+    
+    def _collect_decisions(self, scraper, days_back, since, stats, heartbeat=None):
+        """Consome o pipeline busca -> detalhes do scraper, salvando em lotes de SAVE_BATCH_SIZE"""
+        tribunal_name = scraper.get_tribunal_name()
         saved_count = 0
+        batch = []
         
+        # Decisões cuja URL já está no banco não têm a página de detalhes baixada
+        decisions = scraper.iter_recent_jurisprudence(
+            days_back, since, skip=lambda info: self._is_known_url(tribunal_name, info.get('url'))
+        )
         for decision in decisions:
-            try:
-                # Verifica se já existe no banco
-                existing = Jurisprudencia.query.filter_by(
-                    tribunal=decision.get('tribunal'),
-                    numero_processo=decision.get('numero_processo')
-                ).first()
+            if decision.get('skipped'):
+                stats['parsed'] += 1
+                stats['duplicates'] += 1
+                continue
+            
+            batch.append(decision)
+            if len(batch) >= self.SAVE_BATCH_SIZE:
+                saved_count += self._ingest(tribunal_name, 'jurisprudencia', batch, stats)
+                batch = []
+                if heartbeat:
+                    heartbeat()
+        
+        if batch:
+            saved_count += self._ingest(tribunal_name, 'jurisprudencia', batch, stats)
+        
+        self.logger.info(f"Coletadas {stats['parsed']} decisões do {tribunal_name} ({stats['duplicates']} já conhecidas)")
+        return saved_count
+    
+    def _is_known_url(self, tribunal_name, url):
+        if not url:
+            return False
+        return db.session.query(
+            Jurisprudencia.query.filter_by(tribunal=tribunal_name, url_origem=url).exists()
+        ).scalar()
+    
+    @staticmethod
+    def _empty_save_stats():
+        return {'parsed': 0, 'duplicates': 0, 'inserted': 0, 'errors': 0, 'failed_commits': 0, 'latest_date': None}
+    
+    def _ingest(self, source, kind, records, stats=None):
+        """Grava os registros no log de ingestão e os aplica ao banco; retorna quantos foram inseridos
+        
+        Sem log de ingestão configurado, os registros vão direto para o banco.
+        """
+        stats = stats if stats is not None else self._empty_save_stats()
+        if self.ingestion_log is None:
+            return self._save_records(kind, records, stats)
+        
+        inserted_before = stats['inserted']
+        # Um membro gzip por lote de SAVE_BATCH_SIZE: a aplicação ao banco avança membro a membro
+        for start in range(0, len(records), self.SAVE_BATCH_SIZE):
+            self.ingestion_log.append(source, kind, records[start:start + self.SAVE_BATCH_SIZE])
+        self.apply_ingestion_log(source, stats)
+        return stats['inserted'] - inserted_before
+    
+    def _save_records(self, kind, records, stats):
+        if kind == 'enunciado':
+            return self._save_enunciados(records, stats)
+        return self._save_jurisprudencia(records, stats)
+    
+    def apply_ingestion_log(self, source, stats=None):
+        """Aplica ao banco os registros da fonte ainda não aplicados, em transações de até SAVE_BATCH_SIZE
+        
+        Cada transação aplica membros gzip inteiros do log; a posição aplicada
+        (ingestion_offsets: segmento, registro e byte do próximo membro) é gravada
+        no mesmo commit dos registros, e a próxima aplicação começa a ler o segmento
+        dali. Se o commit falhar, a aplicação para e os registros continuam pendentes.
+        """
+        stats = stats if stats is not None else self._empty_save_stats()
+        applied = 0
+        
+        with self.ingestion_log.source_lock(source):
+            offset = db.session.get(IngestaoOffset, source) or IngestaoOffset(fonte=source, segmento=0, registro=0, posicao=0)
+            
+            for segment in self.ingestion_log.segments(source):
+                if segment < offset.segmento:
+                    continue
                 
-                if existing:
-                    continue  # Pula se já existe
+                start, position = (offset.registro, offset.posicao or 0) if segment == offset.segmento else (0, 0)
+                # Sem a posição em bytes (offset gravado por versões anteriores), lê desde o início do segmento
+                index = start if position else 0
+                batch, kind, next_index, next_position = [], None, None, None
                 
-                # Cria nova entrada
-                jurisprudencia = Jurisprudencia(
-                    tribunal=decision.get('tribunal'),
-                    numero_processo=decision.get('numero_processo'),
-                    relator=decision.get('relator'),
-                    data_julgamento=self._parse_date(decision.get('data_julgamento')),
-                    data_publicacao=self._parse_date(decision.get('data_publicacao')),
-                    ementa=decision.get('ementa'),
-                    acordao=decision.get('acordao'),
-                    tags=decision.get('tags'),
-                    url_origem=decision.get('url_origem')
-                )
+                for member_end, records in self.ingestion_log.members(source, segment, position):
+                    first_index = index
+                    index += len(records)
+                    records = records[max(0, start - first_index):]
+                    if not records:
+                        continue
+                    
+                    if batch and (records[0]['tipo'] != kind or len(batch) + len(records) > self.SAVE_BATCH_SIZE):
+                        if not self._apply_batch(offset, segment, next_index, next_position, kind, batch, stats):
+                            return self._apply_result(source, applied, stats, complete=False)
+                        applied += len(batch)
+                        batch = []
+                    kind = records[0]['tipo']
+                    batch.extend(record['dados'] for record in records)
+                    next_index, next_position = index, member_end
                 
-                db.session.add(jurisprudencia)
-                saved_count += 1
+                if batch:
+                    if not self._apply_batch(offset, segment, next_index, next_position, kind, batch, stats):
+                        return self._apply_result(source, applied, stats, complete=False)
+                    applied += len(batch)
+        
+        return self._apply_result(source, applied, stats, complete=True)
+    
+    def _apply_batch(self, offset, segment, next_index, next_position, kind, batch, stats):
+        """Salva um lote e avança a posição no mesmo commit; False se o commit falhou"""
+        failed_before = stats['failed_commits']
+        offset.segmento = segment
+        offset.registro = next_index
+        offset.posicao = next_position
+        db.session.add(offset)
+        self._save_records(kind, batch, stats)
+        
+        if stats['failed_commits'] > failed_before:
+            self.logger.error(f"Aplicação do log de ingestão do {offset.fonte} interrompida no segmento {segment}")
+            return False
+        return True
+    
+    @staticmethod
+    def _apply_result(source, applied, stats, complete):
+        return {
+            'source': source,
+            'applied': applied,
+            'inserted': stats['inserted'],
+            'duplicates': stats['duplicates'],
+            'errors': stats['errors'],
+            'complete': complete
+        }
+    
+    def apply_all_ingestion_logs(self):
+        """Aplica os registros pendentes de todas as fontes do log de ingestão"""
+        return [self.apply_ingestion_log(source) for source in self.ingestion_log.sources()]
+    
+    def replay_ingestion_log(self, source, from_segment=None):
+        """Reaplica o log da fonte a partir de um segmento (ou do início), sem refazer a coleta
+        
+        Registros já presentes no banco contam como duplicatas; serve para reconstruir
+        o banco ou reprocessar os registros depois de uma mudança no salvamento.
+        """
+        with self.ingestion_log.source_lock(source):
+            offset = db.session.get(IngestaoOffset, source) or IngestaoOffset(fonte=source)
+            offset.segmento = from_segment or 0
+            offset.registro = 0
+            offset.posicao = 0
+            db.session.add(offset)
+            db.session.commit()
+        
+        return self.apply_ingestion_log(source)
+    
+    def _advance_watermark(self, tribunal_name, latest_date, run_id):
+        """Avança a marca d'água do tribunal (nunca para trás nem além de hoje)"""
+        if not latest_date:
+            return
+        
+        latest_date = min(latest_date, datetime.utcnow().date())
+        try:
+            watermark = db.session.get(ColetaWatermark, tribunal_name)
+            if watermark and watermark.data_referencia >= latest_date:
+                return
+            
+            watermark = watermark or ColetaWatermark(tribunal=tribunal_name)
+            watermark.data_referencia = latest_date
+            watermark.execucao_id = run_id
+            db.session.add(watermark)
+            db.session.commit()
+            self.logger.info(f"Marca d'água do {tribunal_name} avançada para {latest_date.isoformat()}")
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Erro ao atualizar marca d'água do {tribunal_name}: {e}")
+    
+    def _record_collection_run(self, run_id, tribunal_name, started_at, duration, scraper_metrics, stats, error):
+        """Grava as métricas de uma fonte em collection_runs"""
+        try:
+            db.session.add(CollectionRun(
+                execucao_id=run_id,
+                tribunal=tribunal_name,
+                inicio=started_at,
+                fim=datetime.utcnow(),
+                duracao=duration,
+                paginas=scraper_metrics.get('pages', 0),
+                bytes_baixados=scraper_metrics.get('bytes', 0),
+                itens_parseados=stats['parsed'],
+                duplicatas=stats['duplicates'],
+                inseridos=stats['inserted'],
+                erros=scraper_metrics.get('errors', 0) + stats['errors'] + (1 if error else 0),
+                status='error' if error else 'success',
+                mensagem_erro=error
+            ))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Erro ao registrar execução da coleta do {tribunal_name}: {e}")
+    
+    def _save_jurisprudencia(self, decisions, stats=None):
+        """Salva decisões de jurisprudência no banco de dados"""
+        saved_count = 0
+        new_rows = []
+        stats = stats if stats is not None else self._empty_save_stats()
+        stats['parsed'] += len(decisions)
+        ingested_dates = []
+        
+        # Lock de escrita antes dos savepoints por decisão (ver begin_write)
+        begin_write(db.session)
+        
+        for decision in decisions:
+            try:
+                # Savepoint por decisão: uma falha (ex.: IntegrityError no flush, erro ao registrar
+                # buckets LSH ou citações) desfaz só esta decisão, sem deixar a sessão inválida
+                with db.session.begin_nested():
+                    decision_date = self._watermark_date(decision)
+                    
+                    # Verifica se já existe no banco. O número do processo pode vir vazio
+                    # (fallback do _extract_process_number), então nesse caso usa a URL
+                    existing = None
+                    if decision.get('numero_processo'):
+                        existing = Jurisprudencia.query.filter_by(
+                            tribunal=decision.get('tribunal'),
+                            numero_processo=decision.get('numero_processo')
+                        ).first()
+                    elif decision.get('url_origem'):
+                        existing = Jurisprudencia.query.filter_by(
+                            tribunal=decision.get('tribunal'),
+                            url_origem=decision.get('url_origem')
+                        ).first()
+                    
+                    if existing:
+                        stats['duplicates'] += 1
+                        ingested_dates.append(decision_date)
+                        continue  # Pula se já existe
+                    
+                    # Busca quase-duplicatas da ementa via MinHash/LSH
+                    signature = self.near_duplicates.hasher.signature(decision.get('ementa'))
+                    duplicate, similarity = self.near_duplicates.find_duplicate(signature)
+                    
+                    if duplicate and self._is_republication(duplicate, decision):
+                        # Mesma decisão republicada pelo mesmo tribunal; outros processos com ementa
+                        # quase idêntica (ex.: casos repetitivos) são gravados no cluster da duplicata
+                        self.logger.info(f"Ementa republicada ignorada (similaridade {similarity:.2f} com {duplicate.id})")
+                        stats['duplicates'] += 1
+                        ingested_dates.append(decision_date)
+                        continue
+                    
+                    # Cria nova entrada
+                    jurisprudencia = Jurisprudencia(
+                        tribunal=decision.get('tribunal'),
+                        numero_processo=decision.get('numero_processo'),
+                        relator=decision.get('relator'),
+                        data_julgamento=self._parse_date(decision.get('data_julgamento')),
+                        data_publicacao=self._parse_date(decision.get('data_publicacao')),
+                        ementa=decision.get('ementa'),
+                        acordao=decision.get('acordao'),
+                        tags=decision.get('tags'),
+                        url_origem=decision.get('url_origem'),
+                        duplicata_de=duplicate.cluster_id if duplicate else None
+                    )
+                    
+                    db.session.add(jurisprudencia)
+                    db.session.flush()  # Gera o id para registrar os buckets LSH
+                    self.near_duplicates.add(jurisprudencia.id, signature)
+                    self._add_citations(jurisprudencia)
+                    new_rows.append(jurisprudencia)
+                    ingested_dates.append(decision_date)
+                    saved_count += 1
                 
             except Exception as e:
                 self.logger.error(f"Erro ao salvar decisão: {e}")
+                stats['errors'] += 1
                 continue
         
         try:
+            if saved_count:
+                VersaoDados.bump('jurisprudencia')
             db.session.commit()
             self.logger.info(f"Salvadas {saved_count} decisões no banco de dados")
+            if saved_count:
+                self._invalidate_cache()
+            ingested_dates = [d for d in [stats['latest_date']] + ingested_dates if d]
+            stats['latest_date'] = max(ingested_dates) if ingested_dates else None
         except Exception as e:
             db.session.rollback()
             self.logger.error(f"Erro ao fazer commit: {e}")
+            stats['errors'] += 1
+            stats['failed_commits'] += 1
             saved_count = 0
+            new_rows = []
+        
+        stats['inserted'] += saved_count
+        self._index_new_rows(new_rows, 'jurisprudencia')
         
         return saved_count
     
-    def _save_enunciados(self, enunciados):
+    @staticmethod
+    def _is_republication(duplicate, decision):
+        """Quase-duplicata do mesmo tribunal com o mesmo número de processo ou a mesma URL"""
+        if duplicate.tribunal != decision.get('tribunal'):
+            return False
+        numero_processo = decision.get('numero_processo')
+        url_origem = decision.get('url_origem')
+        return bool(
+            (numero_processo and duplicate.numero_processo == numero_processo)
+            or (url_origem and duplicate.url_origem == url_origem)
+        )
+    
+    def _save_enunciados(self, enunciados, stats=None):
         """Salva enunciados no banco de dados"""
         saved_count = 0
+        new_rows = []
+        stats = stats if stats is not None else self._empty_save_stats()
+        stats['parsed'] += len(enunciados)
         
         for enunciado_data in enunciados:
             try:
@@ -111,6 +453,7 @@ class JurisprudenciaService:
                 ).first()
                 
                 if existing:
+                    stats['duplicates'] += 1
                     continue  # Pula se já existe
                 
                 # Cria nova entrada
@@ -124,70 +467,130 @@ class JurisprudenciaService:
                 )
                 
                 db.session.add(enunciado)
+                new_rows.append(enunciado)
                 saved_count += 1
                 
             except Exception as e:
                 self.logger.error(f"Erro ao salvar enunciado: {e}")
+                stats['errors'] += 1
                 continue
         
         try:
+            if saved_count:
+                VersaoDados.bump('enunciados')
             db.session.commit()
             self.logger.info(f"Salvados {saved_count} enunciados no banco de dados")
+            if saved_count:
+                self._invalidate_cache()
         except Exception as e:
             db.session.rollback()
             self.logger.error(f"Erro ao fazer commit: {e}")
+            stats['errors'] += 1
+            stats['failed_commits'] += 1
             saved_count = 0
+            new_rows = []
+        
+        stats['inserted'] += saved_count
+        self._index_new_rows(new_rows, 'enunciados')
         
         return saved_count
     
+    def _add_citations(self, jurisprudencia):
+        """Registra no índice invertido as leis e artigos citados na ementa e no acórdão"""
+        text = '\n'.join(filter(None, [jurisprudencia.ementa, jurisprudencia.acordao]))
+        citations = self.citation_extractor.extract(text)
+        
+        db.session.add_all([
+            Citacao(
+                chave=key,
+                tipo=kind,
+                jurisprudencia_id=jurisprudencia.id,
+                ocorrencias=count,
+                data_coleta=jurisprudencia.data_coleta or datetime.utcnow()
+            )
+            for (key, kind), count in citations.items()
+        ])
+    
+    def _invalidate_cache(self):
+        """Novos dados confirmados no banco: descarta os resultados em cache das consultas"""
+        if self.query_cache:
+            self.query_cache.invalidate()
+    
+    def _index_new_rows(self, rows, kind):
+        """Atualiza o índice de similaridade com as linhas recém-salvas"""
+        if not self.precedent_index or not rows:
+            return
+        
+        try:
+            if kind == 'jurisprudencia':
+                added = self.precedent_index.add_jurisprudencia(rows)
+            else:
+                added = self.precedent_index.add_enunciados(rows)
+            self.logger.info(f"Indexados {added} novos itens de {kind}")
+        except Exception as e:
+            self.logger.error(f"Erro ao indexar {kind}: {e}")
+    
     def _parse_date(self, date_string):
-        """Converte string de data para objeto datetime"""
+        """Converte string de data (dd/mm/aaaa ou aaaa-mm-dd) para objeto date"""
         if not date_string:
             return None
         
-        # Implementar parsing de datas específico
-        # Por enquanto, retorna None
+        if hasattr(date_string, 'year'):
+            return date_string.date() if isinstance(date_string, datetime) else date_string
+        
+        # Os tribunais costumam prefixar a data (ex.: "Julgamento: 10/05/2024")
+        for token in str(date_string).split():
+            for date_format in self.DATE_FORMATS:
+                try:
+                    return datetime.strptime(token.strip(',;.'), date_format).date()
+                except ValueError:
+                    continue
         return None
     
-    def get_recent_jurisprudence(self, tribunal=None, limit=50):
-        """Busca jurisprudência recente no banco de dados"""
-        query = Jurisprudencia.query
+    def _watermark_date(self, decision):
+        """Data da decisão no campo que a busca do tribunal filtra (normalmente o julgamento)
         
-        if tribunal:
-            query = query.filter_by(tribunal=tribunal)
-        
-        jurisprudencia = query.order_by(Jurisprudencia.data_coleta.desc()).limit(limit).all()
-        return [j.to_dict() for j in jurisprudencia]
+        A marca d'água vira o início da próxima busca; usar outra data (ex.: a
+        publicação, posterior ao julgamento) faria a busca pular decisões.
+        """
+        scraper_class = self.SCRAPER_CLASSES.get(decision.get('tribunal'))
+        field = scraper_class.watermark_field() if scraper_class else 'data_julgamento'
+        return self._parse_date(decision.get(field))
     
-    def get_enunciados(self, orgao=None, tipo=None, limit=100):
-        """Busca enunciados no banco de dados"""
-        query = Enunciado.query
-        
-        if orgao:
-            query = query.filter_by(orgao=orgao)
-        
-        if tipo:
-            query = query.filter_by(tipo=tipo)
-        
-        enunciados = query.order_by(Enunciado.numero).limit(limit).all()
-        return [e.to_dict() for e in enunciados]
+    def rebuild_near_duplicates(self):
+        """Recalcula o índice LSH e os clusters de quase-duplicatas"""
+        result = self.near_duplicates.rebuild()
+        # Os clusters mudam o resultado das consultas com collapse (e o ETag das rotas de leitura)
+        VersaoDados.bump('jurisprudencia')
+        db.session.commit()
+        self._invalidate_cache()
+        return result
     
-    def search_jurisprudence(self, search_term, tribunal=None, limit=50):
-        """Busca jurisprudência por termo"""
-        query = Jurisprudencia.query
+    def rebuild_related_index(self):
+        """Reconstrói o índice de similaridade de precedentes e enunciados"""
+        if not self.precedent_index:
+            raise RuntimeError('Índice de precedentes não inicializado')
         
-        if tribunal:
-            query = query.filter_by(tribunal=tribunal)
+        return self.precedent_index.rebuild()
+    
+    def rebuild_citations(self, batch_size=500):
+        """Reextrai as citações de todas as decisões já salvas"""
+        Citacao.query.delete()
+        ids = [row.id for row in db.session.query(Jurisprudencia.id).order_by(Jurisprudencia.id)]
         
-        # Busca no texto da ementa e acórdão
-        query = query.filter(
-            db.or_(
-                Jurisprudencia.ementa.contains(search_term),
-                Jurisprudencia.acordao.contains(search_term),
-                Jurisprudencia.tags.contains(search_term)
+        for start in range(0, len(ids), batch_size):
+            batch = (
+                Jurisprudencia.query.options(db.selectinload(Jurisprudencia.acordao_texto))
+                .filter(Jurisprudencia.id.in_(ids[start:start + batch_size])).all()
             )
-        )
+            for jurisprudencia in batch:
+                self._add_citations(jurisprudencia)
+            db.session.flush()
         
-        jurisprudencia = query.order_by(Jurisprudencia.data_coleta.desc()).limit(limit).all()
-        return [j.to_dict() for j in jurisprudencia]
+        db.session.commit()
+        total = Citacao.query.count()
+        self.logger.info(f"Índice de citações reconstruído: {total} citações em {len(ids)} decisões")
+        return {'decisions': len(ids), 'citations': total}
 
+# Registro único do processo: as sessões HTTP dos scrapers sobrevivem às requisições
+scraper_registry = ScraperRegistry(JurisprudenciaService.SCRAPER_CLASSES)
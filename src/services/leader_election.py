@@ -0,0 +1,84 @@
+import os
+import uuid
+import socket
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import insert, update, select, or_
+from sqlalchemy.exc import IntegrityError
+from src.models.scheduler import SchedulerLock
+
+class LeaderLock:
+    """Eleição de líder por lease em uma tabela do banco compartilhado
+    
+    O processo que consegue gravar seu id em scheduler_locks (linha inexistente
+    ou lease expirado) vira líder até `expira_em`, e precisa renovar o lease
+    antes disso. Se o líder morrer, outro processo assume após o TTL.
+    """
+    
+    def __init__(self, engine, name, ttl_seconds=60):
+        self.logger = logging.getLogger(__name__)
+        self.engine = engine
+        self.name = name
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.owner_id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self.table = SchedulerLock.__table__
+        self.table.create(bind=self.engine, checkfirst=True)
+    
+    def acquire(self):
+        """Tenta obter ou renovar o lease; retorna True se este processo é o líder"""
+        now = datetime.utcnow()
+        values = {'dono': self.owner_id, 'expira_em': now + self.ttl, 'atualizado_em': now}
+        
+        try:
+            with self.engine.begin() as conn:
+                result = conn.execute(
+                    update(self.table)
+                    .where(self.table.c.nome == self.name)
+                    .where(or_(self.table.c.dono == self.owner_id, self.table.c.expira_em < now))
+                    .values(**values)
+                )
+                if result.rowcount == 1:
+                    return True
+                
+                exists = conn.execute(
+                    select(self.table.c.nome).where(self.table.c.nome == self.name)
+                ).first()
+                if exists:
+                    return False
+                
+                conn.execute(insert(self.table).values(nome=self.name, **values))
+                return True
+        
+        except IntegrityError:
+            # Outro processo inseriu o lock ao mesmo tempo
+            return False
+        except Exception as e:
+            self.logger.error(f"Erro na eleição de líder: {e}")
+            return False
+    
+    def release(self):
+        """Libera o lease para que outro processo assuma imediatamente"""
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    update(self.table)
+                    .where(self.table.c.nome == self.name)
+                    .where(self.table.c.dono == self.owner_id)
+                    .values(expira_em=datetime.utcnow())
+                )
+        except Exception as e:
+            self.logger.error(f"Erro ao liberar lock de líder: {e}")
+    
+    def current(self):
+        """Retorna o estado atual do lock (dono e expiração)"""
+        with self.engine.connect() as conn:
+            row = conn.execute(select(self.table).where(self.table.c.nome == self.name)).mappings().first()
+        
+        if not row:
+            return None
+        
+        return {
+            'owner': row['dono'],
+            'expires_at': row['expira_em'].isoformat() if row['expira_em'] else None,
+            'is_me': row['dono'] == self.owner_id
+        }
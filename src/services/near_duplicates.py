@@ -0,0 +1,140 @@
+import re
+import zlib
+import logging
+import numpy as np
+from src.models.jurisprudencia import db, Jurisprudencia, AssinaturaEmenta, BucketLSH
+
+class MinHasher:
+    """Calcula assinaturas MinHash de textos a partir de shingles de palavras"""
+    
+    MERSENNE_PRIME = (1 << 61) - 1
+    TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+    
+    def __init__(self, num_perm=128, shingle_size=3, seed=42):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        # Sementes fixas: as assinaturas precisam ser iguais entre processos e execuções
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.uint64)
+    
+    def shingles(self, text):
+        """Retorna os hashes (crc32) dos shingles de palavras do texto"""
+        tokens = self.TOKEN_PATTERN.findall(text.lower()) if text else []
+        if not tokens:
+            return np.empty(0, dtype=np.uint64)
+        
+        size = min(self.shingle_size, len(tokens))
+        values = {
+            zlib.crc32(' '.join(tokens[i:i + size]).encode('utf-8'))
+            for i in range(len(tokens) - size + 1)
+        }
+        return np.fromiter(values, dtype=np.uint64, count=len(values))
+    
+    def signature(self, text):
+        """Retorna a assinatura MinHash (uint32 x num_perm) ou None para textos vazios"""
+        shingles = self.shingles(text)
+        if not len(shingles):
+            return None
+        
+        # (a * x + b) mod p com a, b < 2^31 e x < 2^32 cabe em uint64
+        hashed = (np.outer(self._a, shingles) + self._b[:, None]) % self.MERSENNE_PRIME
+        return (hashed.min(axis=1) & 0xFFFFFFFF).astype(np.uint32)
+    
+    @staticmethod
+    def jaccard(sig_a, sig_b):
+        """Estimativa da similaridade de Jaccard entre duas assinaturas"""
+        return float(np.mean(sig_a == sig_b))
+
+class NearDuplicateIndex:
+    """Índice LSH de quase-duplicatas de ementas, persistido no banco
+    
+    A assinatura MinHash é dividida em `bands` bandas; cada banda vira uma linha
+    em lsh_buckets. Ementas que colidem em pelo menos uma banda são candidatas, e
+    só as candidatas têm a similaridade estimada comparando as assinaturas. A busca
+    faz consultas indexadas por (banda, hash) em vez de varrer a tabela.
+    """
+    
+    def __init__(self, num_perm=128, bands=16, threshold=0.8):
+        if num_perm % bands:
+            raise ValueError('num_perm deve ser múltiplo de bands')
+        self.logger = logging.getLogger(__name__)
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.threshold = threshold
+    
+    def _band_hashes(self, signature):
+        """Retorna um hash de 63 bits por banda da assinatura"""
+        hashes = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows_per_band:(band + 1) * self.rows_per_band].tobytes()
+            value = (zlib.crc32(chunk) << 31) ^ zlib.adler32(chunk)
+            hashes.append(value & 0x7FFFFFFFFFFFFFFF)
+        return hashes
+    
+    def find_duplicate(self, signature):
+        """Retorna (jurisprudencia, similaridade) da quase-duplicata mais próxima, ou (None, 0)"""
+        if signature is None:
+            return None, 0.0
+        
+        conditions = [
+            db.and_(BucketLSH.banda == band, BucketLSH.hash_bucket == value)
+            for band, value in enumerate(self._band_hashes(signature))
+        ]
+        candidate_ids = {
+            row.jurisprudencia_id
+            for row in db.session.query(BucketLSH.jurisprudencia_id).filter(db.or_(*conditions)).distinct()
+        }
+        if not candidate_ids:
+            return None, 0.0
+        
+        best_id, best_score = None, 0.0
+        for row in AssinaturaEmenta.query.filter(AssinaturaEmenta.jurisprudencia_id.in_(candidate_ids)):
+            score = self.hasher.jaccard(signature, np.frombuffer(row.assinatura, dtype=np.uint32))
+            if score > best_score:
+                best_id, best_score = row.jurisprudencia_id, score
+        
+        if best_score < self.threshold:
+            return None, best_score
+        
+        return db.session.get(Jurisprudencia, best_id), best_score
+    
+    def add(self, jurisprudencia_id, signature):
+        """Registra a assinatura e os buckets de uma decisão (na sessão atual, sem commit)"""
+        if signature is None:
+            return
+        db.session.add(AssinaturaEmenta(jurisprudencia_id=jurisprudencia_id, assinatura=signature.tobytes()))
+        db.session.add_all([
+            BucketLSH(banda=band, hash_bucket=value, jurisprudencia_id=jurisprudencia_id)
+            for band, value in enumerate(self._band_hashes(signature))
+        ])
+    
+    def rebuild(self, batch_size=500):
+        """Recalcula assinaturas e clusters de todas as decisões já salvas"""
+        BucketLSH.query.delete()
+        AssinaturaEmenta.query.delete()
+        Jurisprudencia.query.update({Jurisprudencia.duplicata_de: None})
+        db.session.flush()
+        
+        ids = [row.id for row in db.session.query(Jurisprudencia.id).order_by(Jurisprudencia.id)]
+        total, duplicates = 0, 0
+        
+        for start in range(0, len(ids), batch_size):
+            batch = Jurisprudencia.query.filter(
+                Jurisprudencia.id.in_(ids[start:start + batch_size])
+            ).order_by(Jurisprudencia.id).all()
+            
+            for jurisprudencia in batch:
+                signature = self.hasher.signature(jurisprudencia.ementa)
+                duplicate, _ = self.find_duplicate(signature)
+                if duplicate:
+                    jurisprudencia.duplicata_de = duplicate.cluster_id
+                    duplicates += 1
+                self.add(jurisprudencia.id, signature)
+                db.session.flush()
+                total += 1
+        
+        db.session.commit()
+        self.logger.info(f"Índice de quase-duplicatas reconstruído: {total} decisões, {duplicates} duplicatas")
+        return {'total': total, 'duplicates': duplicates}
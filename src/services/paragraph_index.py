@@ -0,0 +1,117 @@
+import re
+import logging
+from sqlalchemy.orm import selectinload
+from src.models.jurisprudencia import SentencaUsuario
+from src.services.vector_index import SparseVectorIndex
+
+class ParagraphIndex:
+    """Índice de parágrafos das sentenças do usuário para busca por similaridade
+    
+    O texto extraído dos PDFs tem as quebras de linha normalizadas, então os
+    "parágrafos" são blocos de frases consecutivas com tamanho aproximado de
+    `target_words` palavras. Cada bloco é indexado pela chave
+    (sentenca_id, início, fim) no texto_extraido, e o texto é recuperado do banco
+    apenas para os resultados retornados.
+    """
+    
+    SENTENCE_END = re.compile(r'(?<=[.!?;])\s+')
+    
+    def __init__(self, path, target_words=80, max_words=160):
+        self.logger = logging.getLogger(__name__)
+        self.index = SparseVectorIndex(path, key_width=3)
+        self.target_words = target_words
+        self.max_words = max_words
+    
+    def split_paragraphs(self, text):
+        """Divide o texto em blocos de frases e retorna [(início, fim)]"""
+        spans = []
+        if not text:
+            return spans
+        
+        start = None
+        words = 0
+        position = 0
+        boundaries = [m.start() for m in self.SENTENCE_END.finditer(text)] + [len(text)]
+        
+        for end in boundaries:
+            sentence = text[position:end]
+            if start is None:
+                start = position + (len(sentence) - len(sentence.lstrip()))
+            words += len(sentence.split())
+            
+            if words >= self.target_words or end == len(text):
+                # Frases muito longas (sem pontuação) são cortadas por palavras
+                spans.extend(self._cut_long_span(text, start, end))
+                start = None
+                words = 0
+            
+            position = end
+        
+        return [(s, e) for s, e in spans if e - s > 0 and text[s:e].strip()]
+    
+    def _cut_long_span(self, text, start, end):
+        """Corta um bloco maior que max_words em pedaços de max_words palavras"""
+        matches = list(re.finditer(r'\S+', text[start:end]))
+        if len(matches) <= self.max_words:
+            return [(start, end)]
+        
+        spans = []
+        for i in range(0, len(matches), self.max_words):
+            chunk = matches[i:i + self.max_words]
+            spans.append((start + chunk[0].start(), start + chunk[-1].end()))
+        return spans
+    
+    def add_sentence(self, sentenca_id, text):
+        """Indexa os parágrafos de uma sentença"""
+        items = [((sentenca_id, s, e), text[s:e]) for s, e in self.split_paragraphs(text)]
+        added = self.index.add(items)
+        self.logger.info(f"Indexados {added} parágrafos da sentença {sentenca_id}")
+        return added
+    
+    def remove_sentence(self, sentenca_id):
+        """Remove do índice os parágrafos de uma sentença"""
+        return self.index.remove((sentenca_id,))
+    
+    def rebuild(self):
+        """Reconstrói o índice a partir de todas as sentenças do banco"""
+        items = []
+        for sentenca in SentencaUsuario.query.options(selectinload(SentencaUsuario.texto_extraido_texto)):
+            text = sentenca.texto_extraido or ''
+            items.extend(((sentenca.id, s, e), text[s:e]) for s, e in self.split_paragraphs(text))
+        
+        added = self.index.rebuild(items)
+        self.logger.info(f"Índice de parágrafos reconstruído: {added} parágrafos")
+        return added
+    
+    def search(self, text, top_k=5, exclude_sentenca_id=None):
+        """Retorna os parágrafos mais similares ao trecho informado"""
+        exclude = (exclude_sentenca_id,) if exclude_sentenca_id is not None else None
+        hits = self.index.search(text, top_k=top_k, exclude=exclude)
+        if not hits:
+            return []
+        
+        sentenca_ids = {key[0] for key, _ in hits}
+        sentencas = {
+            s.id: s for s in SentencaUsuario.query.options(selectinload(SentencaUsuario.texto_extraido_texto))
+            .filter(SentencaUsuario.id.in_(sentenca_ids)).all()
+        }
+        
+        results = []
+        for (sentenca_id, start, end), score in hits:
+            sentenca = sentencas.get(sentenca_id)
+            if not sentenca:
+                continue  # Sentença removida sem atualizar o índice
+            results.append({
+                'sentenca_id': sentenca_id,
+                'nome_arquivo': sentenca.nome_arquivo,
+                'paragrafo': sentenca.texto_extraido[start:end],
+                'inicio': start,
+                'fim': end,
+                'score': score
+            })
+        
+        return results
+    
+    def stats(self):
+        """Retorna estatísticas do índice"""
+        return {'total_paragraphs': len(self.index)}
@@ -0,0 +1,68 @@
+import logging
+from src.models.jurisprudencia import Jurisprudencia, Enunciado
+from src.services.vector_index import SparseVectorIndex
+
+class PrecedentIndex:
+    """Índice de similaridade sobre ementas de jurisprudência e textos de enunciados
+    
+    Mantém dois índices vetoriais (um por tabela) com a chave igual ao id da linha.
+    As linhas novas são indexadas pelo JurisprudenciaService logo após o commit,
+    e o texto completo só é lido do banco para os resultados retornados.
+    """
+    
+    def __init__(self, path):
+        self.logger = logging.getLogger(__name__)
+        self.jurisprudencia = SparseVectorIndex(f'{path}/jurisprudencia', key_width=1)
+        self.enunciados = SparseVectorIndex(f'{path}/enunciados', key_width=1)
+    
+    def add_jurisprudencia(self, rows):
+        """Indexa decisões recém-salvas; rows é uma lista de objetos Jurisprudencia"""
+        return self.jurisprudencia.add([(j.id, j.ementa) for j in rows if j.ementa])
+    
+    def add_enunciados(self, rows):
+        """Indexa enunciados recém-salvos; rows é uma lista de objetos Enunciado"""
+        return self.enunciados.add([(e.id, e.texto) for e in rows if e.texto])
+    
+    def rebuild(self):
+        """Reconstrói os dois índices a partir do banco"""
+        total_jurisprudencia = self.jurisprudencia.rebuild(
+            (j.id, j.ementa) for j in Jurisprudencia.query.filter(Jurisprudencia.ementa != '').yield_per(500)
+        )
+        total_enunciados = self.enunciados.rebuild(
+            (e.id, e.texto) for e in Enunciado.query.yield_per(500)
+        )
+        self.logger.info(
+            f"Índice de precedentes reconstruído: {total_jurisprudencia} ementas, {total_enunciados} enunciados"
+        )
+        return {'jurisprudencia': total_jurisprudencia, 'enunciados': total_enunciados}
+    
+    def search(self, text, top_k=10):
+        """Retorna as decisões e os enunciados mais similares ao texto"""
+        return {
+            'jurisprudencia': self._resolve(Jurisprudencia, self.jurisprudencia.search(text, top_k)),
+            'enunciados': self._resolve(Enunciado, self.enunciados.search(text, top_k))
+        }
+    
+    def _resolve(self, model, hits):
+        """Carrega do banco as linhas dos resultados, preservando a ordem por score"""
+        if not hits:
+            return []
+        
+        ids = [key[0] for key, _ in hits]
+        rows = {row.id: row for row in model.query.filter(model.id.in_(ids)).all()}
+        
+        results = []
+        for (row_id,), score in hits:
+            row = rows.get(row_id)
+            if row:
+                item = row.to_dict()
+                item['score'] = score
+                results.append(item)
+        return results
+    
+    def stats(self):
+        """Retorna estatísticas do índice"""
+        return {
+            'jurisprudencia': len(self.jurisprudencia),
+            'enunciados': len(self.enunciados)
+        }
@@ -0,0 +1,251 @@
+import os
+import uuid
+import json
+import time
+import zlib
+import sqlite3
+import logging
+import inspect
+import threading
+import functools
+from collections import OrderedDict
+
+class DiskCache:
+    """Cache de resultados compartilhado entre processos num arquivo SQLite
+    
+    Guarda os valores (JSON comprimido) com a geração em que foram calculados e a
+    própria geração atual, de modo que um commit feito por um processo (ex.: o
+    líder do scheduler) invalida o cache dos workers da API.
+    """
+    
+    MAX_ENTRIES = 2000
+    
+    def __init__(self, path, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS geracao (id INTEGER PRIMARY KEY CHECK (id = 1), valor INTEGER NOT NULL, '
+                'epoca TEXT NOT NULL)'
+            )
+            connection.execute('INSERT OR IGNORE INTO geracao (id, valor, epoca) VALUES (1, 0, ?)', (uuid.uuid4().hex[:8],))
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS entradas (chave TEXT PRIMARY KEY, geracao INTEGER NOT NULL, '
+                'expira_em REAL NOT NULL, valor BLOB NOT NULL)'
+            )
+    
+    def _connection(self):
+        """Conexão da thread atual (sqlite3 não compartilha conexões entre threads)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+    
+    def epoch(self):
+        """Identificador do arquivo de cache (distingue a geração 0 de um arquivo recriado)"""
+        return self._connection().execute('SELECT epoca FROM geracao WHERE id = 1').fetchone()[0]
+    
+    def generation(self):
+        return self._connection().execute('SELECT valor FROM geracao WHERE id = 1').fetchone()[0]
+    
+    def bump(self):
+        """Incrementa a geração compartilhada e descarta as entradas anteriores; retorna a nova geração"""
+        connection = self._connection()
+        with connection:
+            connection.execute('UPDATE geracao SET valor = valor + 1 WHERE id = 1')
+            generation = connection.execute('SELECT valor FROM geracao WHERE id = 1').fetchone()[0]
+            connection.execute('DELETE FROM entradas WHERE geracao < ?', (generation,))
+        return generation
+    
+    def get(self, key, generation):
+        row = self._connection().execute(
+            'SELECT valor FROM entradas WHERE chave = ? AND geracao = ? AND expira_em > ?', (key, generation, time.time())
+        ).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+    
+    def set(self, key, generation, value, ttl):
+        data = zlib.compress(json.dumps(value, ensure_ascii=False, default=str).encode('utf-8'))
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO entradas (chave, geracao, expira_em, valor) VALUES (?, ?, ?, ?)',
+                (key, generation, time.time() + ttl, data)
+            )
+            # Mantém o arquivo limitado: remove as entradas vencidas e, acima do limite, as que vencem primeiro
+            connection.execute(
+                'DELETE FROM entradas WHERE expira_em <= ? OR chave IN '
+                '(SELECT chave FROM entradas ORDER BY expira_em DESC LIMIT -1 OFFSET ?)',
+                (time.time(), self.max_entries)
+            )
+    
+    def count(self):
+        return self._connection().execute('SELECT COUNT(*) FROM entradas').fetchone()[0]
+
+class QueryCache:
+    """Cache LRU com TTL de resultados de consultas, invalidado por um contador de geração
+    
+    Cada entrada guarda a geração em que foi calculada; o salvamento de novos dados
+    incrementa a geração (invalidate) e todas as entradas anteriores deixam de valer.
+    Com `disk_path`, os resultados e a geração também ficam num DiskCache
+    compartilhado pelos processos da aplicação. Os valores devolvidos são
+    compartilhados entre as requisições e não devem ser alterados.
+    """
+    
+    MAXSIZE = 256
+    TTL = 300  # s; limita a defasagem quando outro processo grava sem cache em disco
+    
+    # Intervalo mínimo entre leituras da geração compartilhada em disco (s)
+    GENERATION_CHECK_INTERVAL = 1.0
+    
+    def __init__(self, maxsize=MAXSIZE, ttl=TTL, disk_path=None):
+        self.logger = logging.getLogger(__name__)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.disk = DiskCache(disk_path) if disk_path else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = self.disk.generation() if self.disk else 0
+        self.epoch = self.disk.epoch() if self.disk else uuid.uuid4().hex[:8]
+        self._generation_checked_at = time.monotonic()
+        self._data_version = None
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'stale': 0, 'expired': 0, 'evictions': 0, 'invalidations': 0}
+    
+    @staticmethod
+    def key(name, params):
+        """Chave da consulta: nome e parâmetros em JSON canônico (ordem e tipos normalizados)"""
+        return json.dumps([name, params], sort_keys=True, ensure_ascii=False, default=str)
+    
+    @property
+    def generation(self):
+        if self.disk and time.monotonic() - self._generation_checked_at >= self.GENERATION_CHECK_INTERVAL:
+            try:
+                generation = self.disk.generation()
+                with self._lock:
+                    if generation != self._generation:
+                        self._entries.clear()
+                    self._generation = generation
+                    self._generation_checked_at = time.monotonic()
+            except sqlite3.Error as e:
+                self.logger.warning(f"Erro ao ler a geração do cache em disco: {e}")
+        return self._generation
+    
+    @property
+    def version(self):
+        """Versão dos dados consultados (época e geração), estável entre processos com cache em disco"""
+        return f'{self.epoch}.{self.generation}'
+    
+    def invalidate(self):
+        """Invalida todos os resultados (novos dados no banco); retorna a nova geração
+        
+        Com cache em disco, a geração compartilhada é a que vale; se não for possível
+        gravá-la, ao menos o cache deste processo é invalidado.
+        """
+        generation = None
+        if self.disk:
+            try:
+                generation = self.disk.bump()
+            except sqlite3.Error as e:
+                self.logger.warning(f"Erro ao invalidar o cache em disco: {e}")
+        
+        with self._lock:
+            self._generation = generation if generation is not None else self._generation + 1
+            self._generation_checked_at = time.monotonic()
+            self._stats['invalidations'] += 1
+            self._entries.clear()
+            return self._generation
+    
+    def observe(self, data_version):
+        """Registra a versão dos dados lida do banco; se mudou desde a última, descarta as entradas deste processo
+        
+        Cobre as alterações feitas por outros processos quando não há cache em disco.
+        """
+        with self._lock:
+            if self._data_version is not None and data_version != self._data_version:
+                self._entries.clear()
+                self._stats['invalidations'] += 1
+            self._data_version = data_version
+    
+    def _count(self, metric):
+        with self._lock:
+            self._stats[metric] += 1
+    
+    def get_or_compute(self, name, params, compute):
+        """Resultado em cache da consulta `name` com `params`, ou calculado (e guardado) por `compute()`"""
+        generation = self.generation
+        key = self.key(name, params)
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_generation, expires_at, value = entry
+                if entry_generation == generation and expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return value
+                del self._entries[key]
+                self._stats['stale' if entry_generation != generation else 'expired'] += 1
+        
+        if self.disk:
+            try:
+                value = self.disk.get(key, generation)
+            except sqlite3.Error as e:
+                self.logger.warning(f"Erro ao ler o cache em disco: {e}")
+                value = None
+            if value is not None:
+                self._count('disk_hits')
+                self._store(key, generation, value)
+                return value
+        
+        self._count('misses')
+        value = compute()
+        self._store(key, generation, value)
+        if self.disk:
+            try:
+                self.disk.set(key, generation, value, self.ttl)
+            except sqlite3.Error as e:
+                self.logger.warning(f"Erro ao gravar no cache em disco: {e}")
+        return value
+    
+    def _store(self, key, generation, value):
+        with self._lock:
+            # Resultado calculado antes de uma invalidação: não vale mais
+            if generation != self._generation:
+                return
+            self._entries[key] = (generation, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+    
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(size=len(self._entries), maxsize=self.maxsize, ttl=self.ttl, generation=self._generation)
+        lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['disk_hits']) / lookups, 4) if lookups else None
+        if self.disk:
+            stats['disk'] = {'path': self.disk.path, 'entries': self.disk.count()}
+        return stats
+
+def cached_query(method):
+    """Guarda no query_cache do serviço o resultado do método, pela chave (nome, argumentos com defaults)"""
+    signature = inspect.signature(method)
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.query_cache is None:
+            return method(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        params = {name: value for name, value in bound.arguments.items() if name != 'self'}
+        return self.query_cache.get_or_compute(method.__name__, params, lambda: method(self, *args, **kwargs))
+    
+    return wrapper
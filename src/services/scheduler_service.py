@@ -1,18 +1,105 @@
+import time
 import logging
+import threading
+import concurrent.futures
 from datetime import datetime
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.executors.pool import BasePoolExecutor
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 import pytz
-from src.services.jurisprudencia_service import JurisprudenciaService
+from src.models.database import db
+from src.models.sqlite_config import database_status
+from src.models.scheduler import SourceState
+from src.models.jurisprudencia import TextoComprimido
+from src.services.jurisprudencia_service import JurisprudenciaService, scraper_registry
+from src.scrapers.http_pool import shared_adapters
+from src.scrapers.resilience import circuit_breakers
+from src.services.leader_election import LeaderLock
+from src.services.collection_progress import CollectionProgressRegistry
+from src.services.backfill_service import BackfillService
+from src.services.adaptive_polling import AdaptivePollingPolicy
+
+def run_source_collection(source):
+    """Ponto de entrada dos jobs de coleta por fonte
+    
+    O job store persistente guarda apenas a referência textual da função,
+    por isso os jobs apontam para esta função de módulo e não para um método.
+    """
+    return SchedulerService.instance.collect_source(source)
+
+def run_text_cleanup():
+    """Ponto de entrada do job de limpeza dos textos comprimidos órfãos (ver run_source_collection)"""
+    return SchedulerService.instance.cleanup_orphan_texts()
+
+class SharedPoolExecutor(BasePoolExecutor):
+    """Executor do APScheduler sobre um pool de threads compartilhado com as coletas manuais"""
+    
+    def __init__(self, pool):
+        super().__init__(pool)
 
 class SchedulerService:
-    """Serviço para agendamento de tarefas automáticas"""
+    """Serviço para agendamento de tarefas automáticas
+    
+    Todos os processos abrem o mesmo job store no banco da aplicação, mas só o
+    líder eleito (ver LeaderLock) executa os jobs; os demais mantêm o scheduler
+    pausado e apenas leem/alteram o agendamento compartilhado.
+    """
+    
+    instance = None
+    
+    LOCK_NAME = 'scheduler'
+    LEASE_SECONDS = 60
+    HEARTBEAT_SECONDS = 15
+    
+    SOURCE_JOB_PREFIX = 'collect_'
+    
+    # Manutenção semanal: remove os textos comprimidos que nenhuma decisão ou sentença
+    # referencia mais (ex.: inteiro teor substituído numa nova coleta)
+    TEXT_CLEANUP_JOB_ID = 'cleanup_textos'
+    TEXT_CLEANUP_SCHEDULE = {'type': 'cron', 'day_of_week': 'sun', 'hour': 3, 'minute': 0}
+    
+    # Agendamento padrão de cada fonte (alterável via /schedule-config)
+    SOURCE_SCHEDULES = {
+        'STF': {'type': 'cron', 'hour': 9, 'minute': 0},
+        'STJ': {'type': 'cron', 'hour': 9, 'minute': 0},
+        'TJSP': {'type': 'cron', 'hour': 9, 'minute': 0},
+        'ENUNCIADOS': {'type': 'cron', 'day_of_week': 'mon', 'hour': 9, 'minute': 0}
+    }
+    
+    # Limites (em minutos) do modo adaptativo de cada fonte
+    ADAPTIVE_BOUNDS = {
+        'STF': (1440, 10080),
+        'STJ': (1440, 10080),
+        'TJSP': (1440, 10080),
+        'ENUNCIADOS': (4320, 43200)
+    }
+    
+    # Limite global de coletas simultâneas (cada fonte também tem max_instances=1)
+    MAX_CONCURRENT_CRAWLS = 2
+    
+    # Janela de coleta dos jobs agendados
+    SCHEDULED_DAYS_BACK = 1
+    
+    # Lease por fonte entre processos, renovado a cada lote salvo; expira sozinho se o
+    # processo morrer no meio da coleta
+    SOURCE_LOCK_SECONDS = 900
     
     def __init__(self, app=None):
         self.logger = logging.getLogger(__name__)
         self.scheduler = None
         self.app = app
         self.timezone = pytz.timezone('America/Sao_Paulo')  # Horário de Brasília
+        self.leader_lock = None
+        self.is_leader = False
+        self._heartbeat_stop = threading.Event()
+        self._heartbeat_thread = None
+        self._crawl_slots = threading.BoundedSemaphore(self.MAX_CONCURRENT_CRAWLS)
+        self.executor_pool = None
+        self.source_locks = {}
+        self.runs = CollectionProgressRegistry()
+        self.backfill_service = None
         
         if app:
             self.init_app(app)
@@ -20,85 +107,401 @@ class SchedulerService:
     def init_app(self, app):
         """Inicializa o scheduler com a aplicação Flask"""
         self.app = app
+        SchedulerService.instance = self
         
-        # Configura o scheduler
-        self.scheduler = BackgroundScheduler(timezone=self.timezone)
+        with app.app_context():
+            engine = db.engine
         
-        # Adiciona job de coleta diária
-        self.add_daily_jurisprudence_job()
+        # Pool de threads usado tanto pelos jobs agendados quanto pelas coletas manuais
+        self.executor_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(JurisprudenciaService.SCRAPER_CLASSES) + 2, thread_name_prefix='collector'
+        )
         
-        # Inicia o scheduler
+        # Configura o scheduler com job store persistente no banco da aplicação
+        self.scheduler = BackgroundScheduler(
+            jobstores={'default': SQLAlchemyJobStore(engine=engine, tablename='apscheduler_jobs')},
+            executors={'default': SharedPoolExecutor(self.executor_pool)},
+            job_defaults={'coalesce': True, 'misfire_grace_time': 3600},
+            timezone=self.timezone
+        )
+        self.leader_lock = LeaderLock(engine, self.LOCK_NAME, ttl_seconds=self.LEASE_SECONDS)
+        self.source_locks = {
+            source: LeaderLock(engine, f'collect:{source}', ttl_seconds=self.SOURCE_LOCK_SECONDS)
+            for source in JurisprudenciaService.SCRAPER_CLASSES
+        }
+        SourceState.__table__.create(bind=engine, checkfirst=True)
+        self.backfill_service = BackfillService(app, engine, crawl_slots=self._crawl_slots)
+        
+        # Inicia pausado; o scheduler só processa jobs depois de eleito líder
         self.start_scheduler()
         
+        # Adiciona um job por fonte (mantém os horários já persistidos, se houver)
+        self.add_source_jobs()
+        self.add_maintenance_jobs()
+        
+        self._elect()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name='scheduler-leader', daemon=True)
+        self._heartbeat_thread.start()
+        
         # Registra função de limpeza ao encerrar a aplicação
         import atexit
         atexit.register(self.shutdown_scheduler)
     
-    def add_daily_jurisprudence_job(self):
-        """Adiciona job para coleta diária de jurisprudência às 9h"""
+    def _elect(self):
+        """Tenta obter/renovar a liderança e pausa ou retoma o scheduler conforme o resultado"""
+        acquired = self.leader_lock.acquire()
+        
+        if acquired and not self.is_leader:
+            self.is_leader = True
+            self.scheduler.resume()
+            self.logger.info(f"Processo {self.leader_lock.owner_id} eleito líder do scheduler")
+        elif not acquired and self.is_leader:
+            self.is_leader = False
+            self.scheduler.pause()
+            self.logger.warning(f"Processo {self.leader_lock.owner_id} perdeu a liderança do scheduler")
+        elif acquired:
+            # Recarrega o job store para aplicar alterações feitas por outros workers
+            self.scheduler.wakeup()
+    
+    def _heartbeat_loop(self):
+        """Renova o lease do líder (ou tenta assumir) periodicamente"""
+        while not self._heartbeat_stop.wait(self.HEARTBEAT_SECONDS):
+            try:
+                self._elect()
+            except Exception as e:
+                self.logger.error(f"Erro no heartbeat do scheduler: {e}")
+    
+    def add_source_jobs(self):
+        """Adiciona um job de coleta para cada fonte do JurisprudenciaService"""
+        # Job monolítico das versões anteriores, substituído pelos jobs por fonte
+        if self.scheduler.get_job('daily_jurisprudence'):
+            self.scheduler.remove_job('daily_jurisprudence')
+        
+        # Jobs persistidos de fontes que saíram da coleta (ex.: especificação desabilitada)
+        for job in self.scheduler.get_jobs():
+            if job.id.startswith(self.SOURCE_JOB_PREFIX) and self.source_for_job(job.id) is None:
+                self.scheduler.remove_job(job.id)
+        
+        for source in JurisprudenciaService.SCRAPER_CLASSES:
+            # Mantém o agendamento persistido, se houver
+            if not self.scheduler.get_job(self.source_job_id(source)):
+                self.add_source_job(source, self.SOURCE_SCHEDULES.get(source, {'type': 'cron', 'hour': 9, 'minute': 0}))
+    
+    def add_maintenance_jobs(self):
+        """Agenda os jobs de manutenção do banco (mantém os horários já persistidos, se houver)"""
+        if not self.scheduler.get_job(self.TEXT_CLEANUP_JOB_ID):
+            self.scheduler.add_job(
+                func=run_text_cleanup,
+                trigger=self._build_trigger(self.TEXT_CLEANUP_SCHEDULE),
+                id=self.TEXT_CLEANUP_JOB_ID,
+                name='Limpeza de textos comprimidos órfãos',
+                replace_existing=True,
+                max_instances=1
+            )
+    
+    def cleanup_orphan_texts(self):
+        """Remove os textos comprimidos sem referência; retorna {'success', 'removed'}"""
+        try:
+            with self.app.app_context():
+                removed = TextoComprimido.delete_orphans()
+                db.session.commit()
+            self.logger.info(f"Limpeza de textos comprimidos: {removed} órfãos removidos")
+            return {'success': True, 'removed': removed}
+        
+        except Exception as e:
+            self.logger.error(f"Erro na limpeza de textos comprimidos: {e}")
+            return {'success': False, 'error': str(e)}
+    
+    def source_job_id(self, source):
+        return f'{self.SOURCE_JOB_PREFIX}{source.lower()}'
+    
+    def source_for_job(self, job_id):
+        """Retorna a fonte de um job de coleta, ou None se não for um job de fonte"""
+        for source in JurisprudenciaService.SCRAPER_CLASSES:
+            if self.source_job_id(source) == job_id:
+                return source
+        return None
+    
+    def _build_trigger(self, trigger_config):
+        """Cria o trigger a partir de {'type': 'cron', hour, minute, day_of_week} ou {'type': 'interval', minutes}"""
+        if trigger_config['type'] == 'cron':
+            return CronTrigger(
+                day_of_week=trigger_config.get('day_of_week'),
+                hour=trigger_config.get('hour', 0),
+                minute=trigger_config.get('minute', 0),
+                timezone=self.timezone
+            )
+        if trigger_config['type'] == 'interval':
+            return IntervalTrigger(
+                minutes=trigger_config.get('minutes', 0),
+                hours=trigger_config.get('hours', 0),
+                timezone=self.timezone
+            )
+        raise ValueError(f"Tipo de trigger não suportado: {trigger_config['type']}")
+    
+    def add_source_job(self, source, trigger_config):
+        """Agenda (ou reagenda) a coleta de uma fonte"""
         try:
-            # Remove job existente se houver
-            if self.scheduler.get_job('daily_jurisprudence'):
-                self.scheduler.remove_job('daily_jurisprudence')
-            
-            # Adiciona novo job
             self.scheduler.add_job(
-                func=self.collect_daily_jurisprudence,
-                trigger=CronTrigger(hour=9, minute=0, timezone=self.timezone),
-                id='daily_jurisprudence',
-                name='Coleta Diária de Jurisprudência',
+                func=run_source_collection,
+                args=[source],
+                trigger=self._build_trigger(trigger_config),
+                id=self.source_job_id(source),
+                name=f'Coleta de Jurisprudência - {source}',
                 replace_existing=True,
                 max_instances=1,
                 misfire_grace_time=3600  # 1 hora de tolerância
             )
             
-            self.logger.info("Job de coleta diária configurado para 9h (horário de Brasília)")
+            self.logger.info(f"Job de coleta do {source} configurado: {trigger_config}")
+            
+        except Exception as e:
+            self.logger.error(f"Erro ao configurar job do {source}: {e}")
+            raise
+    
+    def update_source_schedule(self, source, trigger_config):
+        """Altera o agendamento de uma fonte no job store compartilhado (desativa o modo adaptativo)"""
+        self._set_fixed_mode(source)
+        self.add_source_job(source, trigger_config)
+        self._wakeup_if_leader()
+    
+    def enable_adaptive_schedule(self, source, min_minutes=None, max_minutes=None):
+        """Passa a fonte para o modo adaptativo, começando pelo menor intervalo"""
+        default_min, default_max = self.ADAPTIVE_BOUNDS.get(source, (1440, 10080))
+        policy = AdaptivePollingPolicy(min_minutes or default_min, max_minutes or default_max)
+        
+        with self.app.app_context():
+            state = db.session.get(SourceState, source) or SourceState(fonte=source)
+            state.modo = 'adaptive'
+            state.intervalo_min = policy.min_minutes
+            state.intervalo_max = policy.max_minutes
+            state.intervalo_atual = policy.min_minutes
+            state.execucoes_vazias = 0
+            db.session.add(state)
+            db.session.commit()
+        
+        self.add_source_job(source, {'type': 'interval', 'minutes': policy.min_minutes})
+        self._wakeup_if_leader()
+        return {'min_minutes': policy.min_minutes, 'max_minutes': policy.max_minutes}
+    
+    def _set_fixed_mode(self, source):
+        with self.app.app_context():
+            state = db.session.get(SourceState, source)
+            if state and state.modo == 'adaptive':
+                state.modo = 'fixed'
+                db.session.commit()
+    
+    def _adapt_schedule(self, source, result):
+        """Recalcula o intervalo de uma fonte em modo adaptativo após uma execução"""
+        if result.get('error') or result.get('skipped'):
+            return  # Falhas não dizem nada sobre a taxa de publicação
+        
+        try:
+            state = db.session.get(SourceState, source)
+            if not state or state.modo != 'adaptive':
+                return
+            
+            policy = AdaptivePollingPolicy(state.intervalo_min, state.intervalo_max)
+            previous = state.intervalo_atual
+            state.intervalo_atual = policy.next_interval(previous, result['collected'])
+            state.execucoes_vazias = 0 if result['collected'] else (state.execucoes_vazias or 0) + 1
+            db.session.commit()
+            
+            if state.intervalo_atual != previous:
+                self.scheduler.reschedule_job(
+                    self.source_job_id(source),
+                    trigger=self._build_trigger({'type': 'interval', 'minutes': state.intervalo_atual})
+                )
+                self._wakeup_if_leader()
             
+            self.logger.info(
+                f"Intervalo adaptativo do {source}: {previous:.0f} -> {state.intervalo_atual:.0f} min "
+                f"({result['collected']} itens novos)"
+            )
         except Exception as e:
-            self.logger.error(f"Erro ao configurar job diário: {e}")
+            db.session.rollback()
+            self.logger.error(f"Erro ao ajustar intervalo adaptativo do {source}: {e}")
+    
+    def update_daily_schedule(self, hour, minute):
+        """Altera o horário de todas as fontes com agendamento cron, mantendo o dia da semana"""
+        for source in JurisprudenciaService.SCRAPER_CLASSES:
+            current = self.get_source_schedule(source) or {}
+            config = {'type': 'cron', 'hour': hour, 'minute': minute}
+            if current.get('type') == 'cron' and current.get('day_of_week') not in (None, '*'):
+                config['day_of_week'] = current['day_of_week']
+            self._set_fixed_mode(source)
+            self.add_source_job(source, config)
+        self._wakeup_if_leader()
+    
+    def get_source_schedule(self, source):
+        """Retorna a configuração do trigger persistido de uma fonte"""
+        job = self.scheduler.get_job(self.source_job_id(source)) if self.scheduler else None
+        if not job:
+            return None
+        
+        if isinstance(job.trigger, IntervalTrigger):
+            return {'type': 'interval', 'minutes': int(job.trigger.interval.total_seconds() // 60)}
+        
+        fields = {field.name: str(field) for field in job.trigger.fields}
+        return {
+            'type': 'cron',
+            'hour': int(fields['hour']) if fields['hour'].isdigit() else fields['hour'],
+            'minute': int(fields['minute']) if fields['minute'].isdigit() else fields['minute'],
+            'day_of_week': fields['day_of_week']
+        }
+    
+    def get_daily_schedule(self):
+        """Retorna (hora, minuto) do agendamento cron da primeira fonte"""
+        for source in JurisprudenciaService.SCRAPER_CLASSES:
+            schedule = self.get_source_schedule(source)
+            if schedule and schedule['type'] == 'cron' and isinstance(schedule['hour'], int):
+                return schedule['hour'], schedule['minute']
+        return None
+    
+    def _wakeup_if_leader(self):
+        """Faz o líder recalcular o próximo disparo após uma alteração de agendamento"""
+        if self.is_leader:
+            self.scheduler.wakeup()
+    
+    def collect_source(self, source, days_back=None):
+        """Coleta uma fonte de forma síncrona (usado pelos jobs agendados)"""
+        days_back = days_back or self.SCHEDULED_DAYS_BACK
+        
+        progress, busy = self.runs.create([source], days_back, trigger='scheduled')
+        if not progress:
+            self.logger.warning(f"Coleta do {source} ignorada: execução {busy[source]} em andamento")
+            return self._skipped_result(source, f"{source}: coleta já em andamento ({busy[source]})")
+        
+        return self._run_source(source, progress)
+    
+    def start_collection(self, sources=None, days_back=1):
+        """Enfileira uma coleta no pool do scheduler e retorna (progresso, fontes ocupadas) sem aguardar
+        
+        Fontes que já têm uma execução em andamento neste processo ficam de fora;
+        se todas estiverem ocupadas, o progresso retornado é None.
+        """
+        sources = list(sources or JurisprudenciaService.SCRAPER_CLASSES)
+        progress, busy = self.runs.create(sources, days_back)
+        if not progress:
+            return None, busy
+        
+        for source in progress.sources:
+            self.executor_pool.submit(self._run_source, source, progress)
+        
+        self.logger.info(f"Coleta {progress.run_id} enfileirada: {', '.join(progress.sources)}")
+        return progress, busy
     
-    def collect_daily_jurisprudence(self):
-        """Função executada diariamente para coletar jurisprudência"""
+    def _run_source(self, source, progress):
+        """Executa a coleta de uma fonte com lease entre processos e limite global de coletas"""
+        result = None
         try:
-            self.logger.info("Iniciando coleta diária de jurisprudência")
+            lock = self.source_locks.get(source)
+            if lock and not lock.acquire():
+                result = self._skipped_result(source, f"{source}: coleta em andamento em outro processo")
+                return result
             
-            # Cria contexto da aplicação Flask
-            with self.app.app_context():
-                service = JurisprudenciaService()
-                results = service.collect_all_recent_jurisprudence(days_back=1)
-                
-                self.logger.info(f"Coleta diária concluída: {results['total_collected']} itens coletados")
+            try:
+                with self._crawl_slots:
+                    progress.source_started(source)
+                    started_at = datetime.utcnow()
+                    start = time.monotonic()
+                    self.logger.info(f"Iniciando coleta do {source} ({progress.trigger})")
+                    
+                    with self.app.app_context():
+                        service = JurisprudenciaService()
+                        result = service.collect_source(
+                            source, progress.days_back, run_id=progress.run_id,
+                            heartbeat=(lambda: self._renew_source_lock(source, lock)) if lock else None
+                        )
+                        result['duration'] = round(time.monotonic() - start, 2)
+                        self._record_source_run(source, started_at, result['duration'], result)
+                        self._adapt_schedule(source, result)
                 
-                # Log dos resultados
-                for success_msg in results['success']:
-                    self.logger.info(success_msg)
-                
-                for error_msg in results['errors']:
-                    self.logger.error(error_msg)
-                
-                return results
+                if result['error']:
+                    self.logger.error(result['error'])
+                else:
+                    self.logger.info(result['message'])
                 
+                return result
+            finally:
+                if lock:
+                    lock.release()
+        
         except Exception as e:
-            self.logger.error(f"Erro na coleta diária: {e}")
-            return {'error': str(e)}
+            self.logger.error(f"Erro na coleta do {source}: {e}")
+            result = {'source': source, 'collected': 0, 'message': None, 'error': f"Erro na coleta do {source}: {str(e)}"}
+            return result
+        
+        finally:
+            self.runs.release(source, progress.run_id)
+            progress.source_finished(source, result)
+    
+    @staticmethod
+    def _renew_source_lock(source, lock):
+        """Renova o lease da fonte durante a coleta; se outro processo o assumiu, interrompe a coleta"""
+        if not lock.acquire():
+            raise RuntimeError(f"lease da coleta do {source} perdido para outro processo")
+    
+    def start_backfill(self, backfill_id, workers_per_tribunal=None):
+        """Executa (ou retoma) um backfill no pool do scheduler sem bloquear a requisição"""
+        def run():
+            try:
+                self.backfill_service.run(backfill_id, workers_per_tribunal)
+            except Exception as e:
+                self.logger.error(f"Backfill {backfill_id} interrompido: {e}")
+        
+        self.executor_pool.submit(run)
+        self.logger.info(f"Backfill {backfill_id} enfileirado")
+    
+    @staticmethod
+    def _skipped_result(source, message):
+        return {'source': source, 'collected': 0, 'message': message, 'error': None, 'skipped': True}
+    
+    def _record_source_run(self, source, started_at, duration, result):
+        """Grava a duração e o resultado da última execução da fonte"""
+        try:
+            state = db.session.get(SourceState, source) or SourceState(fonte=source)
+            state.ultimo_inicio = started_at
+            state.ultimo_fim = datetime.utcnow()
+            state.ultima_duracao = duration
+            state.ultimo_status = 'error' if result['error'] else 'success'
+            state.ultimos_coletados = result['collected']
+            state.ultimo_erro = result['error']
+            db.session.add(state)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Erro ao registrar execução do {source}: {e}")
+    
+    def get_source_states(self):
+        """Retorna o estado da última execução de cada fonte"""
+        with self.app.app_context():
+            return {state.fonte: state.to_dict() for state in SourceState.query.all()}
     
     def start_scheduler(self):
-        """Inicia o scheduler"""
+        """Inicia o scheduler (pausado até a eleição de líder)"""
         try:
             if self.scheduler and not self.scheduler.running:
-                self.scheduler.start()
+                self.scheduler.start(paused=True)
                 self.logger.info("Scheduler iniciado com sucesso")
             
         except Exception as e:
             self.logger.error(f"Erro ao iniciar scheduler: {e}")
     
     def shutdown_scheduler(self):
-        """Para o scheduler"""
+        """Para o scheduler e libera a liderança"""
         try:
+            self._heartbeat_stop.set()
+            
             if self.scheduler and self.scheduler.running:
+                # Também encerra o pool compartilhado com as coletas manuais
                 self.scheduler.shutdown(wait=False)
                 self.logger.info("Scheduler encerrado")
             
+            if self.leader_lock and self.is_leader:
+                self.leader_lock.release()
+                self.is_leader = False
+            
         except Exception as e:
             self.logger.error(f"Erro ao encerrar scheduler: {e}")
     
@@ -108,6 +511,8 @@ class SchedulerService:
             if not self.scheduler:
                 return []
             
+            states = self.get_source_states()
+            
             jobs = []
             for job in self.scheduler.get_jobs():
                 job_info = {
@@ -117,6 +522,18 @@ class SchedulerService:
                     'trigger': str(job.trigger),
                     'func': job.func.__name__ if job.func else None
                 }
+                source = self.source_for_job(job.id)
+                if source:
+                    state = states.get(source, {})
+                    job_info['source'] = source
+                    job_info['last_run'] = state.get('ultimo_inicio')
+                    job_info['last_duration'] = state.get('ultima_duracao')
+                    job_info['last_status'] = state.get('ultimo_status')
+                    job_info['last_collected'] = state.get('ultimos_coletados')
+                    job_info['mode'] = state.get('modo', 'fixed')
+                    if job_info['mode'] == 'adaptive':
+                        job_info['interval_minutes'] = state.get('intervalo_atual')
+                        job_info['empty_runs'] = state.get('execucoes_vazias')
                 jobs.append(job_info)
             
             return jobs
@@ -135,11 +552,21 @@ class SchedulerService:
             if not job:
                 return {'success': False, 'message': 'Job não encontrado'}
             
-            # Executa o job
-            if job_id == 'daily_jurisprudence':
-                with self.app.app_context():
-                    results = self.collect_daily_jurisprudence()
-                    return {'success': True, 'results': results}
+            # Enfileira a coleta da fonte sem bloquear a requisição
+            source = self.source_for_job(job_id)
+            if source:
+                progress, busy = self.start_collection([source], self.SCHEDULED_DAYS_BACK)
+                if not progress:
+                    return {
+                        'success': False,
+                        'message': f'Coleta do {source} já em andamento',
+                        'run_id': busy[source],
+                        'conflict': True
+                    }
+                return {'success': True, 'run_id': progress.run_id, 'run': progress.to_dict()}
+            
+            if job_id == self.TEXT_CLEANUP_JOB_ID:
+                return self.cleanup_orphan_texts()
             
             return {'success': False, 'message': 'Job não suportado para execução manual'}
             
@@ -155,14 +582,7 @@ class SchedulerService:
                 self.scheduler.remove_job(job_id)
             
             # Configura trigger baseado no tipo
-            if trigger_config['type'] == 'cron':
-                trigger = CronTrigger(
-                    hour=trigger_config.get('hour', 0),
-                    minute=trigger_config.get('minute', 0),
-                    timezone=self.timezone
-                )
-            else:
-                raise ValueError(f"Tipo de trigger não suportado: {trigger_config['type']}")
+            trigger = self._build_trigger(trigger_config)
             
             # Adiciona job
             self.scheduler.add_job(
@@ -214,7 +634,15 @@ class SchedulerService:
                 'jobs_count': len(self.scheduler.get_jobs()),
                 'timezone': str(self.timezone),
                 'current_time': datetime.now(self.timezone).isoformat(),
-                'next_daily_collection': self._get_next_daily_collection_time()
+                'next_daily_collection': self._get_next_daily_collection_time(),
+                'active_collections': self.runs.active_sources(),
+                'is_leader': self.is_leader,
+                'process_id': self.leader_lock.owner_id if self.leader_lock else None,
+                'leader': self.leader_lock.current() if self.leader_lock else None,
+                'scrapers_loaded': scraper_registry.loaded(),
+                'http_pools': shared_adapters.stats(),
+                'circuit_breakers': circuit_breakers.states(),
+                'database': database_status(self.app, db)
             }
             
         except Exception as e:
@@ -222,12 +650,13 @@ class SchedulerService:
             return {'error': str(e)}
     
     def _get_next_daily_collection_time(self):
-        """Retorna o próximo horário de coleta diária"""
+        """Retorna o próximo horário de coleta entre todas as fontes"""
         try:
-            job = self.scheduler.get_job('daily_jurisprudence')
-            if job and job.next_run_time:
-                return job.next_run_time.isoformat()
-            return None
+            next_runs = [
+                job.next_run_time for job in self.scheduler.get_jobs()
+                if self.source_for_job(job.id) and job.next_run_time
+            ]
+            return min(next_runs).isoformat() if next_runs else None
             
         except Exception as e:
             self.logger.error(f"Erro ao obter próximo horário: {e}")
@@ -1,19 +1,35 @@
 import os
 import json
 import logging
+import threading
 from datetime import datetime
-from src.models.jurisprudencia import SentencaUsuario
-from src.models.user import db
+from flask import current_app, has_app_context
+from src.models.jurisprudencia import SentencaUsuario, TextoComprimido, VersaoDados
+from src.models.database import db
 from src.services.pdf_processor import PDFProcessor
 from src.services.style_analyzer import StyleAnalyzer
 
+# Perfil de estilo mantido em memória no processo, identificado pela versão das sentenças
+# em data_versions. A versão é incrementada no commit de cada upload, reanálise e remoção,
+# por qualquer worker, e é também o ETag do perfil.
+_style_profile_cache = {'version': None, 'result': None}
+_style_profile_lock = threading.Lock()
+
 class SentenceService:
     """Serviço para gerenciar sentenças do usuário e aprendizado de estilo"""
     
-    def __init__(self):
+    # Linha de data_versions das sentenças do usuário
+    VERSION_TABLE = 'sentencas'
+    
+    def __init__(self, paragraph_index=None):
         self.logger = logging.getLogger(__name__)
         self.pdf_processor = PDFProcessor()
         self.style_analyzer = StyleAnalyzer()
+        
+        # Índice de parágrafos compartilhado pela aplicação (ver main.py)
+        if paragraph_index is None and has_app_context():
+            paragraph_index = getattr(current_app, 'paragraph_index', None)
+        self.paragraph_index = paragraph_index
     
     def process_pdf_sentence(self, pdf_path, filename):
         """Processa um PDF de sentença e extrai características de estilo"""
@@ -38,8 +54,12 @@ class SentenceService:
             )
             
             db.session.add(sentenca)
+            VersaoDados.bump(self.VERSION_TABLE)
             db.session.commit()
             
+            # Indexa os parágrafos para a busca por similaridade
+            self._index_sentence(sentenca.id, text)
+            
             self.logger.info(f"Sentença processada com sucesso: {filename}")
             
             return {
@@ -100,10 +120,46 @@ class SentenceService:
         return results
     
     def get_user_style_profile(self):
+        """Retorna o perfil de estilo do usuário, reaproveitando o perfil em memória"""
+        try:
+            # Lida antes de montar o perfil: uma alteração no meio só faz o próximo acesso remontá-lo
+            version, _ = self._sentences_version()
+            
+            with _style_profile_lock:
+                if _style_profile_cache['version'] == version:
+                    return _style_profile_cache['result']
+            
+            result = self._build_user_style_profile()
+            
+            if result.get('success'):
+                with _style_profile_lock:
+                    _style_profile_cache['version'] = version
+                    _style_profile_cache['result'] = result
+            
+            return result
+        
+        except Exception as e:
+            self.logger.error(f"Erro ao obter perfil de estilo: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def get_style_profile_version(self):
+        """Validadores HTTP do perfil de estilo (ETag e Last-Modified), iguais em todos os processos"""
+        version, updated_at = self._sentences_version()
+        return {'etag': f'{self.VERSION_TABLE}:{version}', 'last_modified': updated_at}
+    
+    def _sentences_version(self):
+        """(versão, data da última alteração) das sentenças em data_versions"""
+        row = db.session.get(VersaoDados, self.VERSION_TABLE)
+        return (row.versao, row.atualizado_em) if row else (0, None)
+    
+    def _build_user_style_profile(self):
         """Cria um perfil de estilo baseado em todas as sentenças do usuário"""
         try:
             # Busca todas as sentenças do usuário
-            sentencas = SentencaUsuario.query.all()
+            sentencas = SentencaUsuario.query.options(db.selectinload(SentencaUsuario.texto_extraido_texto)).all()
             
             if not sentencas:
                 return {
@@ -147,7 +203,7 @@ class SentenceService:
     def get_sentences_summary(self):
         """Retorna resumo das sentenças processadas"""
         try:
-            sentencas = SentencaUsuario.query.all()
+            sentencas = SentencaUsuario.query.options(db.selectinload(SentencaUsuario.texto_extraido_texto)).all()
             
             summary = {
                 'total_sentences': len(sentencas),
@@ -181,9 +237,16 @@ class SentenceService:
                 }
             
             filename = sentenca.nome_arquivo
+            text_hash = sentenca.texto_extraido_hash
             db.session.delete(sentenca)
+            db.session.flush()
+            TextoComprimido.delete_orphans([text_hash])
+            VersaoDados.bump(self.VERSION_TABLE)
             db.session.commit()
             
+            if self.paragraph_index:
+                self.paragraph_index.remove_sentence(sentence_id)
+            
             self.logger.info(f"Sentença removida: {filename}")
             
             return {
@@ -214,6 +277,7 @@ class SentenceService:
             
             # Atualiza no banco
             sentenca.caracteristicas_estilo = json.dumps(style_analysis, ensure_ascii=False)
+            VersaoDados.bump(self.VERSION_TABLE)
             db.session.commit()
             
             self.logger.info(f"Sentença reanalisada: {sentenca.nome_arquivo}")
@@ -231,3 +295,96 @@ class SentenceService:
                 'error': str(e)
             }
 
+    def _index_sentence(self, sentenca_id, text):
+        """Indexa os parágrafos de uma sentença sem interromper o upload em caso de erro"""
+        if not self.paragraph_index:
+            return
+        
+        try:
+            self.paragraph_index.add_sentence(sentenca_id, text)
+        except Exception as e:
+            self.logger.error(f"Erro ao indexar parágrafos da sentença {sentenca_id}: {e}")
+    
+    def find_similar_paragraphs(self, text, top_k=5, exclude_sentence_id=None):
+        """Busca nas sentenças do usuário os parágrafos mais parecidos com um trecho"""
+        try:
+            if not self.paragraph_index:
+                return {
+                    'success': False,
+                    'message': 'Índice de parágrafos não inicializado'
+                }
+            
+            if not text or not text.strip():
+                return {
+                    'success': False,
+                    'message': 'Texto de consulta é obrigatório'
+                }
+            
+            results = self.paragraph_index.search(text, top_k, exclude_sentence_id)
+            
+            return {
+                'success': True,
+                'results': results,
+                'count': len(results)
+            }
+        
+        except Exception as e:
+            self.logger.error(f"Erro na busca de parágrafos similares: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def rebuild_paragraph_index(self):
+        """Reconstrói o índice de parágrafos a partir das sentenças do banco"""
+        try:
+            if not self.paragraph_index:
+                return {
+                    'success': False,
+                    'message': 'Índice de parágrafos não inicializado'
+                }
+            
+            total = self.paragraph_index.rebuild()
+            
+            return {
+                'success': True,
+                'message': f'Índice reconstruído com {total} parágrafos',
+                'total_paragraphs': total
+            }
+        
+        except Exception as e:
+            self.logger.error(f"Erro ao reconstruir índice de parágrafos: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def compare_draft_to_profile(self, text):
+        """Compara um rascunho (parágrafo ou texto completo) com o perfil de estilo"""
+        try:
+            if not text or not text.strip():
+                return {
+                    'success': False,
+                    'message': 'Texto do rascunho é obrigatório'
+                }
+            
+            profile_result = self.get_user_style_profile()
+            if not profile_result.get('success'):
+                return profile_result
+            
+            analysis = self.style_analyzer.analyze_text_style(text, fast=True)
+            deviations = self.style_analyzer.compare_to_profile(analysis, profile_result['profile'])
+            
+            return {
+                'success': True,
+                'deviations': deviations,
+                'draft_analysis': analysis,
+                'based_on_sentences': profile_result['based_on_sentences']
+            }
+        
+        except Exception as e:
+            self.logger.error(f"Erro ao comparar rascunho com o perfil: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
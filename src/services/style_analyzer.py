@@ -2,6 +2,7 @@ import re
 import json
 import logging
 from collections import Counter
+from functools import lru_cache
 import textstat
 import nltk
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -24,12 +25,41 @@ try:
 except LookupError:
     nltk.download('averaged_perceptron_tagger')
 
+@lru_cache(maxsize=1)
+def _portuguese_stopwords():
+    """Carrega as stopwords uma única vez por processo"""
+    return frozenset(nltk.corpus.stopwords.words('portuguese'))
+
 class StyleAnalyzer:
     """Serviço para análise de estilo de escrita jurídica"""
     
+    CONNECTIVES = [
+        'portanto', 'contudo', 'entretanto', 'todavia', 'assim', 'dessa forma',
+        'por conseguinte', 'ademais', 'outrossim', 'destarte'
+    ]
+    
+    FORMAL_INDICATORS = [
+        'vossa excelência', 'meritíssimo', 'ilustríssimo', 'egrégio',
+        'colendo', 'respeitosamente', 'cordialmente'
+    ]
+    
+    ARGUMENT_INDICATORS = [
+        'porque', 'pois', 'uma vez que', 'visto que', 'considerando',
+        'tendo em vista', 'diante do exposto', 'ante o exposto'
+    ]
+    
+    # Expressões pré-compiladas para o modo rápido (sem NLTK punkt e sem textstat)
+    FAST_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+    FAST_TOKEN = re.compile(r'\w+|[^\w\s]')
+    FAST_PASSIVE = re.compile(r'\b(foi|foram|será|serão|sendo|sido)\s+\w+[ado|ida]')
+    FAST_CONNECTIVES = re.compile(r'\b(?:' + '|'.join(CONNECTIVES) + r')\b')
+    FAST_FORMAL = re.compile(r'\b(?:' + '|'.join(FORMAL_INDICATORS) + r')\b')
+    FAST_CONTRACTIONS = re.compile(r'\b(não|num|numa|nuns|numas|do|da|dos|das)\b')
+    FAST_ARGUMENTS = re.compile(r'\b(?:' + '|'.join(ARGUMENT_INDICATORS) + r')\b')
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.stopwords = set(nltk.corpus.stopwords.words('portuguese'))
+        self.stopwords = _portuguese_stopwords()
         
         # Termos jurídicos comuns
         self.legal_terms = {
@@ -42,9 +72,21 @@ class StyleAnalyzer:
             'decisorios': ['julgo', 'decido', 'determino', 'defiro', 'indefiro', 'homologo',
                          'condeno', 'absolvo', 'reconheço', 'declaro']
         }
+        self._fast_legal_terms = {
+            category: re.compile(r'\b(?:' + '|'.join(terms) + r')\b')
+            for category, terms in self.legal_terms.items()
+        }
     
-    def analyze_text_style(self, text):
-        """Analisa o estilo de escrita de um texto"""
+    def analyze_text_style(self, text, fast=False):
+        """Analisa o estilo de escrita de um texto
+        
+        Com fast=True calcula apenas as características agregadas por
+        create_style_profile, usando expressões pré-compiladas, e aceita
+        trechos curtos (ex.: um parágrafo de rascunho).
+        """
+        if fast:
+            return self._analyze_fast(text)
+        
         if not text or len(text.strip()) < 100:
             return {}
         
@@ -65,6 +107,55 @@ class StyleAnalyzer:
             self.logger.error(f"Erro na análise de estilo: {e}")
             return {}
     
+    def _analyze_fast(self, text):
+        """Análise rápida, restrita às características usadas no perfil de estilo"""
+        if not text or not text.strip():
+            return {}
+        
+        try:
+            text_lower = text.lower()
+            sentences = [s for s in self.FAST_SENTENCE_SPLIT.split(text.strip()) if s]
+            tokens = self.FAST_TOKEN.findall(text)
+            words = [t for t in self.FAST_TOKEN.findall(text_lower) if t.isalpha() and t not in self.stopwords]
+            
+            formality_score = len(self.FAST_FORMAL.findall(text_lower))
+            argumentation_count = len(self.FAST_ARGUMENTS.findall(text_lower))
+            
+            return {
+                'readability': {
+                    'avg_sentence_length': round(len(tokens) / len(sentences), 2) if sentences else 0,
+                    'avg_word_length': round(sum(len(t) for t in tokens) / len(tokens), 2) if tokens else 0,
+                    'total_sentences': len(sentences),
+                    'total_words': len(tokens)
+                },
+                'vocabulary': {
+                    'lexical_diversity': round(len(set(words)) / len(words), 3) if words else 0
+                },
+                'legal_language': {
+                    'legal_terms_usage': {
+                        category: len(pattern.findall(text_lower))
+                        for category, pattern in self._fast_legal_terms.items()
+                    }
+                },
+                'writing_patterns': {
+                    'passive_voice_usage': len(self.FAST_PASSIVE.findall(text_lower)),
+                    'connectives_usage': len(self.FAST_CONNECTIVES.findall(text_lower))
+                },
+                'formality': {
+                    'formality_score': formality_score,
+                    'contractions': len(self.FAST_CONTRACTIONS.findall(text_lower)),
+                    'formality_level': 'high' if formality_score > 5 else 'medium' if formality_score > 2 else 'low'
+                },
+                'argumentation': {
+                    'argumentation_density': argumentation_count,
+                    'argumentation_style': 'analytical' if argumentation_count > 10 else 'direct'
+                }
+            }
+        
+        except Exception as e:
+            self.logger.error(f"Erro na análise rápida de estilo: {e}")
+            return {}
+    
     def _analyze_readability(self, text):
         """Analisa a legibilidade do texto"""
         try:
@@ -199,11 +290,7 @@ class StyleAnalyzer:
             first_person = len(re.findall(r'\b(eu|meu|minha|meus|minhas|comigo)\b', text.lower()))
             
             # Uso de conectivos
-            connectives = [
-                'portanto', 'contudo', 'entretanto', 'todavia', 'assim', 'dessa forma',
-                'por conseguinte', 'ademais', 'outrossim', 'destarte'
-            ]
-            connective_count = sum(len(re.findall(rf'\b{conn}\b', text.lower())) for conn in connectives)
+            connective_count = sum(len(re.findall(rf'\b{conn}\b', text.lower())) for conn in self.CONNECTIVES)
             
             # Uso de advérbios de modo
             adverbs = len(re.findall(r'\w+mente\b', text.lower()))
@@ -223,13 +310,8 @@ class StyleAnalyzer:
         """Analisa o nível de formalidade"""
         try:
             # Indicadores de formalidade
-            formal_indicators = [
-                'vossa excelência', 'meritíssimo', 'ilustríssimo', 'egrégio',
-                'colendo', 'respeitosamente', 'cordialmente'
-            ]
-            
             formality_score = sum(len(re.findall(rf'\b{indicator}\b', text.lower())) 
-                                for indicator in formal_indicators)
+                                for indicator in self.FORMAL_INDICATORS)
             
             # Contrações (indicam informalidade)
             contractions = len(re.findall(r'\b(não|num|numa|nuns|numas|do|da|dos|das)\b', text.lower()))
@@ -248,13 +330,8 @@ class StyleAnalyzer:
         """Analisa o estilo de argumentação"""
         try:
             # Palavras que indicam argumentação
-            argument_indicators = [
-                'porque', 'pois', 'uma vez que', 'visto que', 'considerando',
-                'tendo em vista', 'diante do exposto', 'ante o exposto'
-            ]
-            
             argumentation_count = sum(len(re.findall(rf'\b{indicator}\b', text.lower())) 
-                                    for indicator in argument_indicators)
+                                    for indicator in self.ARGUMENT_INDICATORS)
             
             # Uso de precedentes
             precedent_indicators = [
@@ -290,7 +367,12 @@ class StyleAnalyzer:
                 'argumentation_style': Counter([a.get('argumentation', {}).get('argumentation_style', 'direct') for a in analyses]).most_common(1)[0][0],
                 'legal_language_intensity': np.mean([sum(a.get('legal_language', {}).get('legal_terms_usage', {}).values()) for a in analyses]),
                 'passive_voice_tendency': np.mean([a.get('writing_patterns', {}).get('passive_voice_usage', 0) for a in analyses]),
-                'connectives_usage': np.mean([a.get('writing_patterns', {}).get('connectives_usage', 0) for a in analyses])
+                'connectives_usage': np.mean([a.get('writing_patterns', {}).get('connectives_usage', 0) for a in analyses]),
+                # Densidades por 1000 palavras, comparáveis entre textos de tamanhos diferentes
+                'connectives_per_1000_words': self._mean_rate(analyses, lambda a: a.get('writing_patterns', {}).get('connectives_usage', 0)),
+                'passive_voice_per_1000_words': self._mean_rate(analyses, lambda a: a.get('writing_patterns', {}).get('passive_voice_usage', 0)),
+                'legal_terms_per_1000_words': self._mean_rate(analyses, lambda a: sum(a.get('legal_language', {}).get('legal_terms_usage', {}).values())),
+                'formality_per_1000_words': self._mean_rate(analyses, lambda a: a.get('formality', {}).get('formality_score', 0))
             }
             
             return profile
@@ -298,4 +380,52 @@ class StyleAnalyzer:
         except Exception as e:
             self.logger.error(f"Erro ao criar perfil de estilo: {e}")
             return {}
-
+    
+    def _mean_rate(self, analyses, count_getter):
+        """Média da taxa por 1000 palavras de uma contagem entre várias análises"""
+        rates = [
+            self._rate(count_getter(a), a.get('readability', {}).get('total_words', 0))
+            for a in analyses if a.get('readability', {}).get('total_words')
+        ]
+        return round(float(np.mean(rates)), 3) if rates else 0.0
+    
+    def _rate(self, count, total_words):
+        """Converte uma contagem absoluta em ocorrências por 1000 palavras"""
+        return count * 1000 / total_words if total_words else 0.0
+    
+    def compare_to_profile(self, analysis, profile):
+        """Compara a análise de um rascunho com o perfil de estilo do usuário"""
+        if not analysis or not profile:
+            return {}
+        
+        total_words = analysis.get('readability', {}).get('total_words', 0)
+        draft_values = {
+            'avg_sentence_length': analysis.get('readability', {}).get('avg_sentence_length', 0),
+            'avg_word_length': analysis.get('readability', {}).get('avg_word_length', 0),
+            'lexical_diversity': analysis.get('vocabulary', {}).get('lexical_diversity', 0),
+            'connectives_per_1000_words': self._rate(analysis.get('writing_patterns', {}).get('connectives_usage', 0), total_words),
+            'passive_voice_per_1000_words': self._rate(analysis.get('writing_patterns', {}).get('passive_voice_usage', 0), total_words),
+            'legal_terms_per_1000_words': self._rate(sum(analysis.get('legal_language', {}).get('legal_terms_usage', {}).values()), total_words),
+            'formality_per_1000_words': self._rate(analysis.get('formality', {}).get('formality_score', 0), total_words)
+        }
+        
+        deviations = {}
+        for feature, draft_value in draft_values.items():
+            profile_value = float(profile.get(feature, 0) or 0)
+            difference = draft_value - profile_value
+            deviations[feature] = {
+                'draft': round(draft_value, 3),
+                'profile': round(profile_value, 3),
+                'difference': round(difference, 3),
+                'relative_difference': round(difference / profile_value, 3) if profile_value else None
+            }
+        
+        for feature, section in (('formality_level', 'formality'), ('argumentation_style', 'argumentation')):
+            draft_value = analysis.get(section, {}).get(feature)
+            deviations[feature] = {
+                'draft': draft_value,
+                'profile': profile.get(feature),
+                'matches': draft_value == profile.get(feature)
+            }
+        
+        return deviations
@@ -0,0 +1,480 @@
+import os
+import re
+import json
+import math
+import time
+import uuid
+import shutil
+import zlib
+import logging
+import threading
+import contextlib
+from collections import Counter
+import numpy as np
+
+# Lock de arquivo entre processos para as gravações; sem fcntl (ex.: Windows), só entre threads
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+class HashingVectorizer:
+    """Vetoriza textos com unigramas e bigramas de palavras via hashing (sem vocabulário)"""
+    
+    TOKEN_PATTERN = re.compile(r'\w{2,}', re.UNICODE)
+    
+    def __init__(self, n_features=2 ** 18, ngram_range=(1, 2)):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self._mask = n_features - 1
+        self._cache = {}
+    
+    def tokenize(self, text):
+        """Quebra o texto em tokens minúsculos"""
+        return self.TOKEN_PATTERN.findall(text.lower()) if text else []
+    
+    def _feature(self, term):
+        """Retorna o índice da coluna de um termo (crc32 é estável entre processos)"""
+        index = self._cache.get(term)
+        if index is None:
+            index = zlib.crc32(term.encode('utf-8')) & self._mask
+            if len(self._cache) < 200000:
+                self._cache[term] = index
+        return index
+    
+    def transform(self, text):
+        """Retorna (índices, pesos) do vetor esparso normalizado (L2) de um texto"""
+        tokens = self.tokenize(text)
+        counts = Counter()
+        
+        min_n, max_n = self.ngram_range
+        for n in range(min_n, max_n + 1):
+            for i in range(len(tokens) - n + 1):
+                counts[self._feature(' '.join(tokens[i:i + n]))] += 1
+        
+        if not counts:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        
+        indices = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+        # tf sublinear
+        weights = np.fromiter((1.0 + math.log(c) for c in counts.values()), dtype=np.float32, count=len(counts))
+        weights /= np.linalg.norm(weights)
+        
+        order = np.argsort(indices)
+        return indices[order], weights[order]
+
+class SparseVectorIndex:
+    """Índice vetorial esparso persistido em disco e aberto via memory-map
+    
+    Os vetores são guardados em layout invertido (ordenados por coluna), de modo que
+    uma consulta só percorre as listas dos termos presentes nela. Cada documento
+    indexado carrega uma chave numérica de largura fixa (ex.: id da sentença e offsets).
+    
+    O índice é um conjunto de segmentos imutáveis listados num manifesto, apontado
+    pelo arquivo CURRENT e trocado de forma atômica; outros processos percebem a
+    troca e reabrem só os segmentos novos. Cada add grava apenas um segmento delta
+    com os documentos novos, e cada remove, a lista de linhas removidas dos segmentos
+    afetados. Quando os segmentos se acumulam, uma thread em segundo plano funde os
+    deltas. As gravações são serializadas entre processos por um lock de arquivo.
+    """
+    
+    # Segmentos a partir dos quais um add dispara a fusão em segundo plano
+    MAX_SEGMENTS = 8
+    
+    # Os deltas são fundidos entre si enquanto somarem menos que esta fração do segmento base
+    MERGE_BASE_RATIO = 0.25
+    
+    # Diretórios temporários de fusões interrompidas são removidos depois deste tempo (s)
+    TMP_MAX_AGE = 3600
+    
+    SEGMENT_FILES = ('col_ptr', 'cols', 'rows', 'vals', 'keys')
+    
+    def __init__(self, path, key_width=1, vectorizer=None):
+        self.path = path
+        self.key_width = key_width
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._current = None
+        self._segments = []
+        self._merging = False
+        
+        os.makedirs(self.path, exist_ok=True)
+        self._load()
+    
+    # Persistência
+    
+    def _current_file(self):
+        return os.path.join(self.path, 'CURRENT')
+    
+    def _read_current(self):
+        try:
+            with open(self._current_file(), 'r') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+    
+    @contextlib.contextmanager
+    def _write_lock(self):
+        """Serializa as gravações entre threads (RLock) e entre processos (flock no arquivo LOCK)
+        
+        Não é reentrante entre processos: os métodos públicos o adquirem uma única vez.
+        """
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.path, 'LOCK'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _read_manifest(self, current):
+        """Segmentos ([{'name', 'deleted'}]) do manifesto apontado por CURRENT"""
+        if current is None:
+            return []
+        if not current.endswith('.json'):
+            # Formato anterior: CURRENT aponta direto para o diretório de uma versão
+            return [{'name': current, 'deleted': None}]
+        with open(os.path.join(self.path, current), 'r') as f:
+            return json.load(f)['segments']
+    
+    def _open_segment(self, name, deleted, arrays=None):
+        if arrays is None:
+            directory = os.path.join(self.path, name)
+            arrays = {
+                file: np.load(os.path.join(directory, f'{file}.npy'), mmap_mode='r')
+                for file in self.SEGMENT_FILES if os.path.exists(os.path.join(directory, f'{file}.npy'))
+            }
+        alive = np.ones(len(arrays['keys']), dtype=bool)
+        if deleted:
+            alive[np.load(os.path.join(self.path, deleted))] = False
+        return {'name': name, 'deleted': deleted, 'arrays': arrays, 'alive': alive, 'size': int(alive.sum())}
+    
+    def _load(self):
+        """Abre (memory-map) os segmentos do manifesto atual, reaproveitando os já abertos"""
+        with self._lock:
+            current = self._read_current()
+            opened = {segment['name']: segment for segment in self._segments}
+            try:
+                segments = []
+                for entry in self._read_manifest(current):
+                    segment = opened.get(entry['name'])
+                    if segment is None or segment['deleted'] != entry['deleted']:
+                        segment = self._open_segment(entry['name'], entry['deleted'], segment and segment['arrays'])
+                    segments.append(segment)
+                self._segments = segments
+                self._current = current
+            except (OSError, ValueError, KeyError) as e:
+                self.logger.error(f"Erro ao abrir índice vetorial {self.path}: {e}")
+                self._segments = []
+                self._current = None
+    
+    def _refresh(self):
+        """Reabre o índice se outro processo (ou thread) gravou um novo manifesto"""
+        if self._read_current() != self._current:
+            self._load()
+    
+    def _entries(self):
+        return [{'name': segment['name'], 'deleted': segment['deleted']} for segment in self._segments]
+    
+    def _write_segment(self, rows, cols, vals, keys, compact, directory=None):
+        """Grava um segmento a partir de triplas (linha, coluna, valor); retorna o nome
+        
+        Deltas (`compact`) guardam as colunas ordenadas; segmentos grandes guardam o
+        ponteiro por coluna (col_ptr), de tamanho fixo n_features + 1.
+        """
+        order = np.argsort(cols, kind='stable')
+        rows, cols, vals = rows[order], cols[order], vals[order]
+        
+        name = f's{uuid.uuid4().hex[:12]}'
+        segment_dir = os.path.join(self.path, directory or name)
+        os.makedirs(segment_dir)
+        
+        arrays = {
+            'rows': rows.astype(np.int32, copy=False),
+            'vals': vals.astype(np.float32, copy=False),
+            'keys': keys.astype(np.int64, copy=False).reshape(-1, self.key_width)
+        }
+        if compact:
+            arrays['cols'] = cols.astype(np.int32, copy=False)
+        else:
+            counts = np.bincount(cols, minlength=self.vectorizer.n_features)
+            arrays['col_ptr'] = np.zeros(self.vectorizer.n_features + 1, dtype=np.int64)
+            np.cumsum(counts, out=arrays['col_ptr'][1:])
+        for file, array in arrays.items():
+            np.save(os.path.join(segment_dir, f'{file}.npy'), array)
+        return name
+    
+    def _commit(self, entries):
+        """Grava o manifesto com `entries`, troca CURRENT e remove os arquivos sem uso (com o write lock)"""
+        previous = self._current
+        manifest = f'm{uuid.uuid4().hex[:12]}.json'
+        for file, content in ((manifest, json.dumps({'segments': entries})), ('CURRENT', manifest)):
+            tmp_file = os.path.join(self.path, f'{file}.tmp')
+            with open(tmp_file, 'w') as f:
+                f.write(content)
+            os.replace(tmp_file, os.path.join(self.path, file))
+        
+        self._load()
+        self._collect_garbage(previous)
+    
+    def _collect_garbage(self, previous):
+        """Remove segmentos, remoções e manifestos que nem o manifesto atual nem o anterior usam
+        
+        Os arquivos do anterior ficam para os leitores que ainda não perceberam a troca.
+        """
+        manifests = {current for current in (self._current, previous) if current}
+        used = set(manifests)
+        try:
+            for current in manifests:
+                for entry in self._read_manifest(current):
+                    used.add(entry['name'])
+                    if entry['deleted']:
+                        used.add(entry['deleted'])
+        except (OSError, ValueError, KeyError):
+            return
+        
+        for name in os.listdir(self.path):
+            path = os.path.join(self.path, name)
+            if name in ('CURRENT', 'LOCK') or name.endswith('.tmp'):
+                continue
+            if name.startswith('tmp-'):
+                # Fusão em andamento (ou interrompida há muito tempo)
+                if time.time() - os.path.getmtime(path) > self.TMP_MAX_AGE:
+                    shutil.rmtree(path, ignore_errors=True)
+            elif name not in used:
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+            elif os.path.isdir(path):
+                for file in os.listdir(path):
+                    if file.startswith('deleted-') and f'{name}/{file}' not in used:
+                        os.remove(os.path.join(path, file))
+    
+    @staticmethod
+    def _triples(arrays):
+        """Triplas (linha, coluna, valor) de um segmento, em memória"""
+        if 'cols' in arrays:
+            cols = np.array(arrays['cols'])
+        else:
+            col_ptr = np.asarray(arrays['col_ptr'])
+            cols = np.repeat(np.arange(len(col_ptr) - 1, dtype=np.int32), np.diff(col_ptr))
+        return np.array(arrays['rows']), cols, np.array(arrays['vals'])
+    
+    @staticmethod
+    def _ranges(arrays, indices):
+        """Início e fim das listas de postings das colunas `indices` no segmento"""
+        if 'cols' in arrays:
+            cols = arrays['cols']
+            return np.searchsorted(cols, indices, 'left'), np.searchsorted(cols, indices, 'right')
+        col_ptr = arrays['col_ptr']
+        return np.asarray(col_ptr[indices]), np.asarray(col_ptr[indices + 1])
+    
+    def _vectorize(self, items):
+        """Triplas e chaves dos documentos de `items` ([(chave, texto)]), com linhas a partir de 0"""
+        new_rows, new_cols, new_vals, new_keys = [], [], [], []
+        for key, text in items:
+            indices, weights = self.vectorizer.transform(text)
+            if not len(indices):
+                continue
+            new_rows.append(np.full(len(indices), len(new_keys), dtype=np.int32))
+            new_cols.append(indices)
+            new_vals.append(weights)
+            new_keys.append(np.asarray(key, dtype=np.int64).reshape(self.key_width))
+        
+        if not new_keys:
+            return None
+        return np.concatenate(new_rows), np.concatenate(new_cols), np.concatenate(new_vals), np.vstack(new_keys)
+    
+    # Manutenção
+    
+    def __len__(self):
+        return sum(segment['size'] for segment in self._segments)
+    
+    def add(self, items):
+        """Adiciona documentos ao índice num novo segmento delta; items é uma lista de (chave, texto)"""
+        vectors = self._vectorize(items)
+        if vectors is None:
+            return 0
+        
+        with self._write_lock():
+            self._refresh()
+            name = self._write_segment(*vectors, compact=True)
+            self._commit(self._entries() + [{'name': name, 'deleted': None}])
+            segments = len(self._segments)
+        
+        if segments >= self.MAX_SEGMENTS:
+            self._merge_in_background()
+        return len(vectors[3])
+    
+    def remove(self, key_prefix):
+        """Remove os documentos cuja chave começa com key_prefix"""
+        prefix = np.asarray(key_prefix, dtype=np.int64).reshape(-1)
+        
+        with self._write_lock():
+            self._refresh()
+            entries, removed = [], 0
+            for segment in self._segments:
+                entry = {'name': segment['name'], 'deleted': segment['deleted']}
+                keys = np.asarray(segment['arrays']['keys'])
+                matches = np.all(keys[:, :len(prefix)] == prefix, axis=1) & segment['alive']
+                if matches.any():
+                    entry['deleted'] = f"{segment['name']}/deleted-{uuid.uuid4().hex[:12]}.npy"
+                    np.save(os.path.join(self.path, entry['deleted']), np.flatnonzero(~segment['alive'] | matches).astype(np.int32))
+                    removed += int(matches.sum())
+                entries.append(entry)
+            
+            if removed:
+                self._commit(entries)
+            return removed
+    
+    def rebuild(self, items):
+        """Reconstrói o índice do zero, num único segmento; items é um iterável de (chave, texto)"""
+        vectors = self._vectorize(items)
+        if vectors is None:
+            empty = np.empty(0, dtype=np.int32)
+            vectors = (empty, empty, np.empty(0, dtype=np.float32), np.empty((0, self.key_width), dtype=np.int64))
+        
+        with self._write_lock():
+            self._refresh()
+            name = self._write_segment(*vectors, compact=False)
+            self._commit([{'name': name, 'deleted': None}])
+        return len(vectors[3])
+    
+    def _merge_in_background(self):
+        with self._lock:
+            if self._merging:
+                return
+            self._merging = True
+        
+        def run():
+            try:
+                self.merge()
+            except Exception as e:
+                self.logger.error(f"Erro na fusão dos segmentos do índice vetorial {self.path}: {e}")
+            finally:
+                self._merging = False
+        
+        threading.Thread(target=run, name='fusao-indice-vetorial', daemon=True).start()
+    
+    def merge(self):
+        """Funde segmentos aplicando as remoções; retorna quantos segmentos foram fundidos
+        
+        Os deltas são fundidos entre si enquanto forem pequenos perto do segmento base;
+        depois disso, tudo vira um novo segmento base. O segmento fundido é gravado
+        fora do write lock (adds e removes continuam); remoções feitas durante a fusão
+        são reaplicadas a ele, e a fusão é descartada se o índice foi reconstruído.
+        """
+        with self._write_lock():
+            self._refresh()
+            snapshot = list(self._segments)
+        if not snapshot:
+            return 0
+        
+        base_postings = len(snapshot[0]['arrays']['rows'])
+        delta_postings = sum(len(segment['arrays']['rows']) for segment in snapshot[1:])
+        group = snapshot[1:] if delta_postings < base_postings * self.MERGE_BASE_RATIO else snapshot
+        if len(group) < 2 and not any(segment['deleted'] for segment in group):
+            return 0
+        
+        all_rows, all_cols, all_vals, all_keys, origins = [], [], [], [], []
+        next_row = 0
+        for position, segment in enumerate(group):
+            rows, cols, vals = self._triples(segment['arrays'])
+            alive = segment['alive']
+            new_ids = next_row + np.cumsum(alive, dtype=np.int64) - 1
+            mask = alive[rows]
+            all_rows.append(new_ids[rows[mask]])
+            all_cols.append(cols[mask])
+            all_vals.append(vals[mask])
+            all_keys.append(np.asarray(segment['arrays']['keys'])[alive])
+            origins.append((position, np.flatnonzero(alive)))
+            next_row += segment['size']
+        
+        tmp_dir = f'tmp-{uuid.uuid4().hex[:12]}'
+        name = self._write_segment(
+            np.concatenate(all_rows), np.concatenate(all_cols), np.concatenate(all_vals),
+            np.concatenate(all_keys).reshape(-1, self.key_width), compact=group is not snapshot, directory=tmp_dir
+        )
+        
+        with self._write_lock():
+            self._refresh()
+            current = {segment['name']: segment for segment in self._segments}
+            if any(segment['name'] not in current for segment in group):
+                shutil.rmtree(os.path.join(self.path, tmp_dir), ignore_errors=True)
+                return 0
+            os.rename(os.path.join(self.path, tmp_dir), os.path.join(self.path, name))
+            
+            # Linhas removidas dos segmentos do grupo enquanto a fusão era gravada
+            removed = np.concatenate([
+                ~current[group[position]['name']]['alive'][rows] for position, rows in origins
+            ]) if origins else np.empty(0, dtype=bool)
+            deleted = None
+            if removed.any():
+                deleted = f'{name}/deleted-{uuid.uuid4().hex[:12]}.npy'
+                np.save(os.path.join(self.path, deleted), np.flatnonzero(removed).astype(np.int32))
+            
+            group_names = {segment['name'] for segment in group}
+            entries = self._entries()
+            first = next(i for i, entry in enumerate(entries) if entry['name'] in group_names)
+            entries = [entry for entry in entries if entry['name'] not in group_names]
+            entries.insert(first, {'name': name, 'deleted': deleted})
+            self._commit(entries)
+        
+        self.logger.info(f"Índice vetorial {self.path}: {len(group)} segmentos fundidos")
+        return len(group)
+    
+    # Consulta
+    
+    def search(self, text, top_k=10, exclude=None):
+        """Retorna [(chave, score)] dos documentos mais similares (cosseno ponderado por idf)"""
+        with self._lock:
+            self._refresh()
+            segments = self._segments
+        
+        n_docs = sum(segment['size'] for segment in segments)
+        indices, weights = self.vectorizer.transform(text)
+        if not n_docs or not len(indices) or top_k <= 0:
+            return []
+        
+        # Postings dos termos da consulta em cada segmento, sem as linhas removidas
+        gathered = []
+        df = np.zeros(len(indices), dtype=np.int64)
+        for segment in segments:
+            starts, ends = self._ranges(segment['arrays'], indices)
+            counts = ends - starts
+            if not counts.any():
+                continue
+            postings = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends) if e > s])
+            terms = np.repeat(np.arange(len(indices)), counts)
+            rows = np.asarray(segment['arrays']['rows'][postings])
+            alive = segment['alive'][rows]
+            gathered.append((segment, rows[alive], terms[alive], np.asarray(segment['arrays']['vals'][postings])[alive]))
+            df += np.bincount(terms[alive], minlength=len(indices))
+        
+        present = df > 0
+        if not present.any():
+            return []
+        
+        query = np.where(present, weights * (np.log((n_docs + 1) / (df + 1)) + 1.0), 0.0).astype(np.float32)
+        query /= np.linalg.norm(query)
+        
+        prefix = np.asarray(exclude, dtype=np.int64).reshape(-1) if exclude is not None else None
+        candidates = []
+        for segment, rows, terms, vals in gathered:
+            keys = segment['arrays']['keys']
+            scores = np.bincount(rows, weights=vals * query[terms], minlength=len(keys))
+            if prefix is not None:
+                scores[np.all(np.asarray(keys)[:, :len(prefix)] == prefix, axis=1)] = 0.0
+            
+            k = min(top_k, len(scores))
+            for row in np.argpartition(-scores, k - 1)[:k]:
+                if scores[row] > 0:
+                    candidates.append((float(scores[row]), tuple(int(value) for value in keys[row])))
+        
+        candidates.sort(key=lambda candidate: -candidate[0])
+        return [(key, round(score, 4)) for score, key in candidates[:top_k]]
@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from src.services.citation_extractor import CitationExtractor
+
+def articles(text):
+    return sorted(key for key, kind in CitationExtractor().extract(text) if kind == 'artigo')
+
+@pytest.mark.parametrize('text, expected', [
+    ('art. 6º do CDC', ['LEI-8078-1990:ART-6']),
+    ('arts. 186 e 927 do CC', ['LEI-10406-2002:ART-186', 'LEI-10406-2002:ART-927']),
+    ('art. 5º, X, da CF/88', ['CF-1988:ART-5']),
+    ('art. 6º, inciso VIII, do Código de Defesa do Consumidor', ['LEI-8078-1990:ART-6']),
+    ('art. 1º, § 2º, da Lei nº 9.099/95', ['LEI-9099-1995:ART-1']),
+    ('art. 14, caput, do CDC', ['LEI-8078-1990:ART-14']),
+    ('CDC, art. 6º', ['LEI-8078-1990:ART-6']),
+    ('Lei 8.078/90, art. 14', ['LEI-8078-1990:ART-14'])
+])
+def test_article_statute(text, expected):
+    assert articles(text) == expected
+
+@pytest.mark.parametrize('text, expected', [
+    # Lei seguinte em outra cláusula: vale a citada logo antes do artigo
+    ('Nos termos da Lei 8.078/90, art. 14, responde o fornecedor; a Lei 9.099/95 rege o rito.', ['LEI-8078-1990:ART-14']),
+    # Lei seguinte depois do fim da frase
+    ('CDC, art. 6º. Aplicação da Lei 9.099/95', ['LEI-8078-1990:ART-6']),
+    # Nenhuma lei associável
+    ('O art. 14 foi aplicado. A Lei 9.099/95 rege o rito.', []),
+    ('Lei 9.099/95. O art. 14 foi aplicado.', [])
+])
+def test_article_statute_does_not_cross_clauses(text, expected):
+    assert articles(text) == expected
@@ -0,0 +1,88 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.models.database import db, init_db
+from src.routes.user import user_bp
+from src.routes.jurisprudencia import jurisprudencia_bp
+from src.routes.sentences import sentences_bp
+from src.routes.scheduler import scheduler_bp
+from src.services.scheduler_service import SchedulerService
+
+BLUEPRINTS = [
+    (user_bp, '/api'),
+    (jurisprudencia_bp, '/api/jurisprudencia'),
+    (sentences_bp, '/api/sentences'),
+    (scheduler_bp, '/api/scheduler')
+]
+
+# Uma leitura e uma escrita por blueprint
+REQUESTS = [
+    ('get', '/api/users', {}),
+    ('post', '/api/users', {'json': {'username': 'juiz', 'email': 'juiz@example.invalid'}}),
+    ('get', '/api/jurisprudencia/recent', {}),
+    ('post', '/api/jurisprudencia/duplicates/rebuild', {}),
+    ('get', '/api/sentences/list', {}),
+    ('delete', '/api/sentences/clear-all', {}),
+    ('get', '/api/scheduler/status', {}),
+    ('put', '/api/scheduler/schedule-config', {'json': {'source': 'STF', 'mode': 'adaptive'}})
+]
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'app.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    for blueprint, url_prefix in BLUEPRINTS:
+        app.register_blueprint(blueprint, url_prefix=url_prefix)
+    init_db(app)
+    
+    with app.app_context():
+        db.create_all()
+    app.scheduler_service = SchedulerService(app)
+    
+    yield app
+    
+    app.scheduler_service.shutdown_scheduler()
+    with app.app_context():
+        db.engine.dispose()
+    app.extensions['sqlite_read_engines'][id(db)].dispose()
+
+@pytest.fixture
+def checkouts():
+    """Pools de onde cada conexão foi retirada (de qualquer engine do processo), na ordem"""
+    pools = []
+    
+    def on_connect(connection):
+        pools.append(connection.engine.pool)
+    
+    event.listen(Engine, 'engine_connect', on_connect)
+    yield pools
+    event.remove(Engine, 'engine_connect', on_connect)
+
+def test_single_engine_for_all_models(app):
+    with app.app_context():
+        assert len(db.engines) == 1
+        tables = set(db.metadata.tables)
+    
+    assert {'user', 'jurisprudencia', 'enunciados', 'scheduler_locks', 'source_states'} <= tables
+
+@pytest.mark.parametrize('method, url, kwargs', REQUESTS)
+def test_requests_use_only_the_app_pools(app, checkouts, method, url, kwargs):
+    with app.app_context():
+        write_pool = db.engine.pool
+    read_pool = app.extensions['sqlite_read_engines'][id(db)].pool
+    
+    checkouts.clear()
+    response = getattr(app.test_client(), method)(url, **kwargs)
+    
+    assert response.status_code < 500
+    assert checkouts
+    assert set(checkouts) <= {write_pool, read_pool}
+    if method != 'get':
+        assert read_pool not in checkouts